@@ -0,0 +1,18 @@
+"""
+Throughput benchmarks for the graph classes
+
+    python -m benchmarks.run --sizes 1000 100000 --output results.json
+    python -m benchmarks.run --baseline results.json
+    python -m benchmarks.fibonacci
+
+The modules of the repository aren't installed as packages, so the folders
+they live in are put on the import path here, ahead of any benchmark import.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for folder in (os.path.join(ROOT, 'challenges'), os.path.join(ROOT, 'useful_classes'), ROOT):
+    if folder not in sys.path:
+        sys.path.insert(0, folder)
@@ -0,0 +1,111 @@
+import argparse
+import json
+import platform
+import sys
+import time
+
+from challenge_4 import fib, fib_doubling, fib_many, fib_memo
+
+"""
+Fibonacci strategies of challenge_4
+
+    python -m benchmarks.fibonacci --output fib.json
+
+Times the naive recursion, the memoized recursion (from a cold cache every run) and fast
+doubling at growing positions, each only up to where it stays practical, plus fib_many
+against one fib_doubling call per position. Results are JSON like benchmarks.run.
+"""
+
+# Largest position timed for each strategy, the naive one doubles its time with every step
+# and the memoized one keeps every number up to n, about n^2 / 23 bytes
+LIMITS = {'naive': 25, 'memo': 10 ** 4, 'doubling': 10 ** 6}
+
+POSITIONS = (10, 20, 25, 100, 400, 10 ** 4, 10 ** 5, 10 ** 6)
+
+STRATEGIES = {
+    'naive': fib,
+    'memo': fib_memo,
+    'doubling': fib_doubling,
+}
+
+
+def _best_time(function, repeat):
+    """Return the fastest wall time of repeat calls of the function"""
+    best = None
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+
+    return best
+
+
+def _memo_run(num):
+    """Compute fib_memo(num) from an empty cache"""
+    fib_memo.cache_clear()
+    return fib_memo(num)
+
+
+def run(positions=POSITIONS, repeat=3, batch=100, log=None):
+    """
+    Return the list of result dictionaries {'strategy', 'n', 'seconds'}, with the batch
+    results as 'many' and 'separate' over batch positions spread just above the largest one
+    log: function called with a line of progress for every result, None for silence
+    """
+    results = []
+
+    def record(strategy, num, seconds):
+        results.append({'strategy': strategy, 'n': num, 'seconds': seconds})
+        if log is not None:
+            log('{:>10} {:>10} {:12.6f}s'.format(strategy, num, seconds))
+
+    for num in positions:
+        for strategy, function in STRATEGIES.items():
+            if num > LIMITS[strategy]:
+                continue
+
+            if strategy == 'memo':
+                record(strategy, num, _best_time(lambda: _memo_run(num), repeat))
+            else:
+                record(strategy, num, _best_time(lambda: function(num), repeat))
+
+    top = max(positions)
+    batch_positions = [top + 1000 * index for index in range(batch)]
+
+    record('many', top, _best_time(lambda: fib_many(batch_positions), 1))
+    record('separate', top, _best_time(lambda: [fib_doubling(num) for num in batch_positions], 1))
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Time the fibonacci strategies of challenge_4')
+    parser.add_argument('--positions', nargs='+', type=int, default=list(POSITIONS))
+    parser.add_argument('--repeat', type=int, default=3, help='runs per position, the fastest is kept')
+    parser.add_argument('--batch', type=int, default=100, help='positions of the fib_many comparison')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    args = parser.parse_args(argv)
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'repeat': args.repeat,
+        },
+        'results': run(args.positions, args.repeat, args.batch, log=lambda line: print(line, file=sys.stderr)),
+    }
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+import random
+
+"""
+Synthetic graph generators
+
+Every generator returns (number of vertices, iterator of (from, to) edges) over the
+vertex ids 0 .. n - 1, streaming the edges so they are never built up as a list of
+tuples. grid and chain keep nothing, while erdos_renyi remembers every edge to skip
+repeats and barabasi_albert both endpoints of every edge, so those two still hold
+O(E) ints or pairs. write_graph_file turns them into the graph_data.txt format.
+"""
+
+# Most vertex keys written on one vertex line
+KEYS_PER_LINE = 10000
+
+
+def erdos_renyi(num_vertices, num_edges, seed=0):
+    """
+    Return a G(n, m) random graph: num_edges distinct edges picked uniformly
+    Runtime: O(m) expected while m is well under n^2 / 2
+    Memory: O(m), the edges handed out are kept in a set to skip repeats
+    """
+    if num_edges > num_vertices * (num_vertices - 1) // 2:
+        raise ValueError('{} vertices can only hold {} edges'.format(num_vertices, num_vertices * (num_vertices - 1) // 2))
+
+    def edges():
+        rng = random.Random(seed)
+        seen = set()
+
+        while len(seen) < num_edges:
+            u, v = rng.randrange(num_vertices), rng.randrange(num_vertices)
+            if u == v:
+                continue
+
+            pair = (u, v) if u < v else (v, u)
+            if pair not in seen:
+                seen.add(pair)
+                yield pair
+
+    return num_vertices, edges()
+
+
+def barabasi_albert(num_vertices, edges_per_vertex, seed=0):
+    """
+    Return a preferential attachment graph: every new vertex links to edges_per_vertex
+    existing ones picked in proportion to their degree, giving a few very popular hubs
+    Runtime: O(n * m)
+    Memory: O(n * m), two endpoints for every edge handed out
+    """
+    if not 1 <= edges_per_vertex < num_vertices:
+        raise ValueError('Need 1 <= edges_per_vertex < num_vertices')
+
+    def edges():
+        rng = random.Random(seed)
+        endpoints = []  # Every vertex once per edge it has, so picking uniformly here favors hubs
+
+        # Start from a star so every early vertex has a degree
+        for v in range(1, edges_per_vertex + 1):
+            endpoints.extend((0, v))
+            yield 0, v
+
+        for u in range(edges_per_vertex + 1, num_vertices):
+            targets = set()
+            while len(targets) < edges_per_vertex:
+                targets.add(endpoints[rng.randrange(len(endpoints))])
+
+            for v in sorted(targets):
+                endpoints.extend((u, v))
+                yield u, v
+
+    return num_vertices, edges()
+
+
+def grid(width, height):
+    """
+    Return a width by height grid, every vertex linked to its right and lower neighbor
+    Runtime: O(width * height)
+    """
+    def edges():
+        for y in range(height):
+            for x in range(width):
+                vertex = y * width + x
+                if x + 1 < width:
+                    yield vertex, vertex + 1
+                if y + 1 < height:
+                    yield vertex, vertex + width
+
+    return width * height, edges()
+
+
+def chain(num_vertices):
+    """
+    Return a path 0 - 1 - ... - n - 1, the deepest graph for its size
+    Runtime: O(n)
+    """
+    return num_vertices, ((vertex, vertex + 1) for vertex in range(num_vertices - 1))
+
+
+def generate(name, num_edges, seed=0):
+    """
+    Return (number of vertices, edges) of the named generator scaled to about num_edges edges:
+    'erdos-renyi' with an average degree of 10, 'barabasi-albert' with 5 edges per vertex,
+    'grid' as square as possible, or 'chain'
+    """
+    if name == 'erdos-renyi':
+        return erdos_renyi(max(num_edges // 5, 5), num_edges, seed)
+
+    elif name == 'barabasi-albert':
+        return barabasi_albert(num_edges // 5 + 6, 5, seed)
+
+    elif name == 'grid':
+        side = max(int((num_edges / 2) ** 0.5), 2)
+        return grid(side, max(num_edges // (2 * side), 2))
+
+    elif name == 'chain':
+        return chain(num_edges + 1)
+
+    raise ValueError('Unknown generator: {}'.format(name))
+
+
+GENERATORS = ('erdos-renyi', 'barabasi-albert', 'grid', 'chain')
+
+
+def write_graph_file(path, num_vertices, edges, header='D', weights=None, seed=0):
+    """
+    Write the graph in the graph_data.txt format: the header line, the vertex keys on
+    lines of up to KEYS_PER_LINE, then one (from,to) line per edge, and return the number of edges.
+    The challenge graphs read a 'D' header as undirected and a 'G' header as directed.
+    weights: (low, high) to give every edge a random integer cost in that range, None for no costs
+    Runtime: O(V + E)
+    """
+    rng = random.Random(seed)
+    count = 0
+
+    with open(path, 'w') as file:
+        file.write(header + '\n')
+
+        for start in range(0, num_vertices, KEYS_PER_LINE):
+            file.write(','.join(map(str, range(start, min(start + KEYS_PER_LINE, num_vertices)))) + '\n')
+
+        lines = []
+        for u, v in edges:
+            if weights is None:
+                lines.append('({},{})\n'.format(u, v))
+            else:
+                lines.append('({},{},{})\n'.format(u, v, rng.randint(*weights)))
+
+            if len(lines) >= KEYS_PER_LINE:
+                count += len(lines)
+                file.writelines(lines)
+                lines = []
+
+        count += len(lines)
+        file.writelines(lines)
+
+    return count
@@ -0,0 +1,50 @@
+import os
+import tempfile
+import unittest
+
+from benchmarks.generators import GENERATORS, generate, write_graph_file
+from benchmarks.run import compare
+from challenge_2 import Graph
+
+
+class GeneratorsTest(unittest.TestCase):
+
+    def test_sizes(self):
+        for name in GENERATORS:
+            num_vertices, edges = generate(name, 1000, seed=1)
+            edges = list(edges)
+
+            self.assertAlmostEqual(len(edges), 1000, delta=100, msg=name)
+            self.assertEqual(len(set(edges)), len(edges), name)
+            for u, v in edges:
+                self.assertNotEqual(u, v)
+                self.assertTrue(0 <= u < num_vertices and 0 <= v < num_vertices)
+
+    def test_same_seed_same_graph(self):
+        for name in GENERATORS:
+            self.assertEqual(list(generate(name, 500, seed=3)[1]), list(generate(name, 500, seed=3)[1]))
+
+    def test_write_graph_file(self):
+        num_vertices, edges = generate('grid', 200)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'grid.txt')
+            num_edges = write_graph_file(path, num_vertices, edges, weights=(1, 9))
+
+            graph = Graph()
+            graph.read_file(path)
+
+        self.assertEqual(len(graph.get_vertices()), num_vertices)
+        self.assertEqual(graph.num_edges, num_edges)
+
+    def test_compare(self):
+        baseline = [{'generator': 'chain', 'edges': 10, 'scenario': 'load', 'per_second': 100.0},
+                    {'generator': 'chain', 'edges': 10, 'scenario': 'dfs', 'per_second': 100.0}]
+        results = [{'generator': 'chain', 'edges': 10, 'scenario': 'load', 'per_second': 90.0},
+                   {'generator': 'chain', 'edges': 10, 'scenario': 'dfs', 'per_second': 50.0},
+                   {'generator': 'grid', 'edges': 10, 'scenario': 'dfs', 'per_second': 1.0}]
+
+        regressions = compare(results, baseline, tolerance=0.2)
+
+        self.assertEqual([regression['scenario'] for regression in regressions], ['dfs'])
+        self.assertAlmostEqual(regressions[0]['change'], -0.5)
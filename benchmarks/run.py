@@ -0,0 +1,149 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+from benchmarks.generators import GENERATORS, generate, write_graph_file
+from benchmarks.scenarios import SCENARIOS
+
+"""
+Benchmark runner
+
+Times every scenario on every generator at every size and writes the results as JSON:
+
+    {"meta": {"python": ..., "platform": ..., "started": ...},
+     "results": [{"generator": "grid", "edges": 1000, "vertices": 484, "scenario": "bfs-path",
+                  "operations": 100, "seconds": 0.0123, "per_second": 8130.1}, ...]}
+
+Given a baseline file from an earlier run, the scenarios that slowed down by more than
+the tolerance are reported and the exit status is 1.
+"""
+
+
+def run(generators, sizes, scenarios, queries=100, repeat=3, seed=0, log=None):
+    """
+    Return the list of result dictionaries, keeping the fastest of repeat runs of every scenario
+    log: function called with a line of progress for every result, None for silence
+    """
+    results = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name in generators:
+            for size in sizes:
+                path = os.path.join(directory, '{}-{}.txt'.format(name, size))
+                num_vertices, edges = generate(name, size, seed)
+                num_edges = write_graph_file(path, num_vertices, edges)
+
+                def make_edges():
+                    return generate(name, size, seed)[1]
+
+                for scenario in scenarios:
+                    best = None
+
+                    for _ in range(repeat):
+                        operations, seconds = SCENARIOS[scenario](path, num_vertices, make_edges, queries, seed)
+                        if best is None or seconds < best[1]:
+                            best = (operations, seconds)
+
+                    operations, seconds = best
+                    result = {
+                        'generator': name,
+                        'edges': num_edges,
+                        'vertices': num_vertices,
+                        'scenario': scenario,
+                        'operations': operations,
+                        'seconds': seconds,
+                        'per_second': operations / seconds if seconds > 0 else 0.0,
+                    }
+                    results.append(result)
+
+                    if log is not None:
+                        log('{generator:>16} {edges:>10} {scenario:>10} {seconds:10.4f}s '
+                            '{per_second:14.1f}/s'.format(**result))
+
+    return results
+
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    Return a dictionary for every result at least tolerance slower per operation than the
+    baseline result of the same generator, size and scenario, with both rates and the change
+    """
+    def key(result):
+        return result['generator'], result['edges'], result['scenario']
+
+    previous = {key(result): result for result in baseline}
+    regressions = []
+
+    for result in results:
+        before = previous.get(key(result))
+        if before is None or not before['per_second'] or not result['per_second']:
+            continue
+
+        change = result['per_second'] / before['per_second'] - 1
+        if change < -tolerance:
+            regressions.append({
+                'generator': result['generator'],
+                'edges': result['edges'],
+                'scenario': result['scenario'],
+                'baseline': before['per_second'],
+                'current': result['per_second'],
+                'change': change,
+            })
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Time the graph classes on synthetic graphs')
+    parser.add_argument('--generators', nargs='+', choices=GENERATORS, default=list(GENERATORS))
+    parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000, 100000],
+                        help='approximate number of edges of the graphs, up to 10^7')
+    parser.add_argument('--scenarios', nargs='+', choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--queries', type=int, default=100, help='queries per query scenario')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per scenario, the fastest is kept')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='slowdown per operation reported as a regression, 0.2 for 20%%')
+    args = parser.parse_args(argv)
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'queries': args.queries,
+            'repeat': args.repeat,
+            'seed': args.seed,
+        },
+        'results': run(args.generators, args.sizes, args.scenarios, args.queries, args.repeat, args.seed,
+                       log=lambda line: print(line, file=sys.stderr)),
+    }
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)['results']
+
+        regressions = compare(report['results'], baseline, args.tolerance)
+        for regression in regressions:
+            print('REGRESSION {generator} {edges} {scenario}: {baseline:.1f}/s -> {current:.1f}/s '
+                  '({change:+.0%})'.format(**regression), file=sys.stderr)
+
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
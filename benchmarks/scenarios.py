@@ -0,0 +1,104 @@
+import random
+import time
+
+from challenge_2 import Graph as PathGraph
+from challenge_3 import Graph as SearchGraph
+
+"""
+Timed scenarios
+
+Every scenario is called as scenario(path, num_vertices, make_edges, queries, seed) with the
+graph file written by the generator and a function returning a fresh iterator of its edges,
+and returns (operations, seconds) for the timed part only: setup such as loading the graph
+for a query scenario isn't counted.
+"""
+
+
+def _query_pairs(num_vertices, queries, seed):
+    """Return queries (from, to) key pairs of distinct vertices, the same for the same seed"""
+    rng = random.Random(seed)
+    pairs = []
+
+    while len(pairs) < queries and num_vertices > 1:
+        u, v = rng.randrange(num_vertices), rng.randrange(num_vertices)
+        if u != v:
+            pairs.append((str(u), str(v)))
+
+    return pairs
+
+
+def load(path, num_vertices, make_edges, queries, seed):
+    """Parse the graph file and build the graph, one operation per edge"""
+    graph = PathGraph()
+
+    start = time.perf_counter()
+    graph.read_file(path)
+    seconds = time.perf_counter() - start
+
+    return graph.num_edges, seconds
+
+
+def add_edge(path, num_vertices, make_edges, queries, seed):
+    """Build the graph one add_vertex and add_edge call at a time, one operation per edge"""
+    graph = PathGraph(undirected=True)
+    edges = [(str(u), str(v)) for u, v in make_edges()]
+
+    start = time.perf_counter()
+    for key in range(num_vertices):
+        graph.add_vertex(str(key))
+    for u, v in edges:
+        graph.add_edge(u, v)
+    seconds = time.perf_counter() - start
+
+    return len(edges), seconds
+
+
+def bfs_path(path, num_vertices, make_edges, queries, seed):
+    """Shortest path queries between random pairs with find_path_bfs"""
+    graph = PathGraph()
+    graph.read_file(path)
+    pairs = _query_pairs(num_vertices, queries, seed)
+
+    start = time.perf_counter()
+    for u, v in pairs:
+        graph.find_path_bfs(u, v)
+    seconds = time.perf_counter() - start
+
+    return len(pairs), seconds
+
+
+def k_hop(path, num_vertices, make_edges, queries, seed):
+    """Friends of friends of random vertices with breadth_first_search_length"""
+    graph = PathGraph()
+    graph.read_file(path)
+    pairs = _query_pairs(num_vertices, queries, seed)
+
+    start = time.perf_counter()
+    for u, _ in pairs:
+        graph.breadth_first_search_length(u, 2)
+    seconds = time.perf_counter() - start
+
+    return len(pairs), seconds
+
+
+def dfs(path, num_vertices, make_edges, queries, seed):
+    """Depth first searches between random pairs with depth_first_search_iter"""
+    graph = SearchGraph()
+    graph.read_file(path)
+    pairs = _query_pairs(num_vertices, queries, seed)
+
+    start = time.perf_counter()
+    for u, v in pairs:
+        graph.depth_first_search_iter(u, v)
+    seconds = time.perf_counter() - start
+
+    return len(pairs), seconds
+
+
+SCENARIOS = {
+    'load': load,
+    'add_edge': add_edge,
+    'bfs-path': bfs_path,
+    'k-hop': k_hop,
+    'dfs': dfs,
+}
@@ -1,5 +1,16 @@
+import os
 import sys
 
+# Helpers shared with the graphs of the repository root are only kept in useful_classes
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'useful_classes'))
+
+from build_report import BuildReport
+from edge_index import EdgeIndex
+from graph_reader import GraphReader
+from memory_report import adjacency_usage, edge_index_usage, memory_report, structure_size
+from scc import Condensation
+from snapshot import Snapshot, write_snapshot
+
 
 class Vertex(object):
 
@@ -15,6 +26,10 @@ class Vertex(object):
         """add a neighbor along a weighted edge"""
         self.neighbors[vertex] = weight
 
+    def remove_neighbor(self, vertex):
+        """remove a neighbor and return the weight of its edge"""
+        return self.neighbors.pop(vertex, None)
+
     def __str__(self):
         """output the list of neighbors of this vertex"""
         return str(self.data) + " adjacent to: " + ', '.join([x for x in self.neighbors.keys()])
@@ -36,10 +51,11 @@ class Graph:
 
     def __init__(self, undirected=False):
         self.vertices_dict = {}
-        self.edges_list = []
+        self.edges_list = EdgeIndex()
         self.num_vertices = 0
         self.num_edges = 0
         self.undirected = undirected
+        self.condensed = None  # Condensation of the strongly connected components, built on demand
 
     def __iter__(self):
         """
@@ -62,6 +78,7 @@ class Graph:
 
         self.vertices_dict[key] = new_vertex
         self.num_vertices += 1
+        self.condensed = None
 
         return new_vertex
 
@@ -71,33 +88,146 @@ class Graph:
         Runtime: O(1) since the graph store vertices as a dictionary and
                 the Vertex class store neighbors in a dictionary.
         """
+        error = self._insert_edge(from_vert, to_vert, cost)
+
+        if error is not None:
+            print(error)
+
+    def _insert_edge(self, from_vert, to_vert, cost=0):
+        """
+        Add an edge from one to another vertex with a cost,
+        return an error message instead if the edge is rejected
+        """
         # Handle bad inputs and edge cases
         if from_vert == to_vert:
-            print('Both from vertex and to vertex are the same')
-            return
+            return 'Both from vertex and to vertex are the same'
 
         # If one of the inputted vertices doesn't exist in the graph
         elif from_vert not in self.vertices_dict or to_vert not in self.vertices_dict:
-            print('{} or {} are not in dictionary of vertices'.format(from_vert, to_vert))
-            return
+            return '{} or {} are not in dictionary of vertices'.format(from_vert, to_vert)
 
-        reversed_edge = (to_vert, from_vert, cost)
-
-        # Prevent duplicate edges in simple graph
-        if reversed_edge in self.edges_list and self.undirected:
+        # Prevent duplicate edges, in either direction for a simple graph, whatever their cost
+        if self.has_edge(from_vert, to_vert):
             return
 
         # Add to_vertex as neighbor to from_vertex
         home_vertex = self.vertices_dict[from_vert]
         home_vertex.add_neighbor(to_vert, cost)
-        self.edges_list.append((from_vert, to_vert, cost))
+        self.edges_list.add(from_vert, to_vert, cost)
         self.num_edges += 1
+        self.condensed = None
 
         # Add from_vertex as neighbor to to_vertex is it a simple graph
         if self.undirected:
             neighbor_vertex = self.vertices_dict[to_vert]
             neighbor_vertex.add_neighbor(from_vert, cost)
 
+    def add_vertices_from(self, keys):
+        """
+        Add a vertex for every key of the given iterable or NumPy array without printing,
+        and return a BuildReport listing the duplicate keys that were skipped
+        Runtime: O(n) where n is the number of keys
+        """
+        report = BuildReport()
+
+        if hasattr(keys, 'tolist'):  # NumPy arrays
+            keys = keys.tolist()
+
+        for key in keys:
+            if key in self.vertices_dict:
+                report.reject(key, 'duplicate vertex')
+                continue
+
+            self.vertices_dict[key] = Vertex(key)
+            report.added += 1
+
+        self.num_vertices += report.added
+        self.condensed = None
+
+        return report
+
+    def add_edges_from(self, edges):
+        """
+        Add every (from, to) or (from, to, cost) edge of the given iterable or NumPy array without printing.
+        All the edges are validated in one pass before the adjacency is built, and the self-loops,
+        unknown vertices and duplicates are returned in a BuildReport.
+        Runtime: O(n) where n is the number of edges
+        """
+        report = BuildReport()
+
+        if hasattr(edges, 'tolist'):  # NumPy arrays
+            edges = edges.tolist()
+
+        vertices_dict = self.vertices_dict
+        accepted = EdgeIndex()  # The edges that passed validation
+
+        for edge in edges:
+            from_vert, to_vert = edge[0], edge[1]
+
+            if from_vert == to_vert:
+                report.reject(edge, 'self-loop')
+                continue
+
+            elif from_vert not in vertices_dict or to_vert not in vertices_dict:
+                report.reject(edge, 'unknown vertex')
+                continue
+
+            elif self.has_edge(from_vert, to_vert) or (from_vert, to_vert) in accepted \
+                    or (self.undirected and (to_vert, from_vert) in accepted):
+                report.reject(edge, 'duplicate edge')
+                continue
+
+            accepted.add(from_vert, to_vert, edge[2] if len(edge) > 2 else 0)
+
+        # Build the adjacency in one shot
+        for from_vert, to_vert, cost in accepted:
+            vertices_dict[from_vert].neighbors[to_vert] = cost
+            self.edges_list.add(from_vert, to_vert, cost)
+
+            if self.undirected:
+                vertices_dict[to_vert].neighbors[from_vert] = cost
+
+        report.added = len(accepted)
+        self.num_edges += report.added
+        self.condensed = None
+
+        return report
+
+    def has_edge(self, from_vert, to_vert):
+        """
+        Return True if there's an edge from one vertex to the other,
+        or between them in either direction for a simple graph
+        Runtime: O(1) since the graph index its edges in a dictionary
+        """
+        if (from_vert, to_vert) in self.edges_list:
+            return True
+
+        return self.undirected and (to_vert, from_vert) in self.edges_list
+
+    def remove_edge(self, from_vert, to_vert):
+        """
+        Remove the edge from one vertex to the other and return its cost,
+        or None if there's no such edge
+        Runtime: O(1)
+        """
+        if (from_vert, to_vert) in self.edges_list:
+            cost = self.edges_list.remove(from_vert, to_vert)
+
+        elif self.undirected and (to_vert, from_vert) in self.edges_list:
+            cost = self.edges_list.remove(to_vert, from_vert)
+
+        else:
+            return
+
+        self.vertices_dict[from_vert].remove_neighbor(to_vert)
+        if self.undirected:
+            self.vertices_dict[to_vert].remove_neighbor(from_vert)
+
+        self.num_edges -= 1
+        self.condensed = None
+
+        return cost
+
     def get_vertices(self):
         """
         Return all the vertices in the graph
@@ -107,11 +237,29 @@ class Graph:
 
     def get_edges(self):
         """
-        Return a set of all unique the edges in the graph
-        Runtime: O(1) since the graph store a list of edges
+        Return an ordered view of all unique the edges in the graph, as (from, to, cost)
+        Runtime: O(1) since the graph store an index of edges
         """
         return self.edges_list
 
+    def memory_usage(self, deep=True, sample=None):
+        """
+        Return a report of the bytes the graph uses by structure, with the total and the
+        per vertex and per edge averages, as described in memory_report.memory_report.
+        The structures are those of memory_report.adjacency_usage and edge_index_usage,
+        plus the condensation of the strongly connected components once built.
+        deep: measure the vertex objects, key strings, edge tuples and weights too, not only the tables
+        sample: number of vertices and edges to measure and scale up from, None to measure all of them
+        Runtime: O(V + E), where sampling only measures sample vertices and edges while skipping the rest
+        """
+        sizes = adjacency_usage(self.vertices_dict, 'data', deep, sample)
+        sizes.update(edge_index_usage(self.edges_list, self.vertices_dict, 'data', deep, sample))
+
+        if self.condensed is not None:
+            sizes['condensed'] = structure_size(self.condensed)
+
+        return memory_report(sizes, self.num_vertices, self.num_edges, deep, sample)
+
     def get_vertex(self, key):
         """
         Return the vertex if it exists
@@ -121,81 +269,84 @@ class Graph:
 
     def read_file(self, text_file):
         """
-        Read the given file and add all the vertices and edges
+        Read the given file and add all the vertices and edges, return the read statistics
         Runtime: O(n) where n is the number of character in the text file
         """
-        with open(text_file, 'r') as file:
-            for line in file:
-                if len(line) == 2:
-                    self.undirected = line[0] == 'D'
+        reader = GraphReader()
 
-                elif line[0] != "(":
-                    self._read_vertices(line)
+        for kind, value in reader.read(text_file):
+            if kind == 'header':
+                self.undirected = value == 'D'
 
-                else:
-                    self._read_edge(line)
-
-    def _read_edge(self, text):
-        """
-        Read the text and add the edge to the graph
-        Runtime: O(n) where n is the number of character in the text
-        """
-        cost = 0
-        key = ''
-        from_vertex = ''
-        to_vertex = ''
-        get_from = False
-        get_to = False
+            elif kind == 'vertices':
+                self.add_vertices_from(value)
 
-        for index in range(len(text)):
-            char = text[index]
+            else:
+                reader.stats.rejected += len(self.add_edges_from(value).rejected)
 
-            if char == '(':
-                pass
+        return reader.stats
 
-            # Add the remaining key to the cost once the vertices have been found
-            elif char == ')' and get_from and get_to and key != '':
-                cost = int(key)
+    def save_snapshot(self, path):
+        """
+        Write the graph to a binary snapshot file, see snapshot.py for the layout
+        Runtime: O(V + E)
+        """
+        write_snapshot(self, path)
 
-            elif char == ')' and not get_to and key != '':
-                to_vertex = key
-                break
+    @classmethod
+    def load_snapshot(cls, path, mmap=True):
+        """
+        Load a graph written by save_snapshot.
+        mmap=True maps the file and returns a read-only Snapshot graph whose arrays are views
+        over the file, so it opens in O(1) and pages are only read as traversals touch them.
+        It answers find_path_bfs, breadth_first_search_length, is_reachable, connected,
+        depth_first_search_iter and shortest_path from the file; other methods need mmap=False.
+        mmap=False reads the whole file and rebuilds a regular Graph.
+        """
+        snapshot = Snapshot(path, use_mmap=mmap)
 
-            elif char == ',':
+        if mmap:
+            return snapshot
 
-                if not get_from:
-                    from_vertex = key
-                    get_from = True
-                    key = ''
+        try:
+            return snapshot.to_graph(cls())
+        finally:
+            snapshot.close()
 
-                elif not get_to:
-                    to_vertex = key
-                    get_to = True
-                    key = ''
+    def strongly_connected_components(self):
+        """
+        Return the strongly connected components as lists of vertex keys, in topological order:
+        no edge leads from a component back to an earlier one
+        Runtime: O(V + E) the first time after a change, then O(1)
+        """
+        return self.condensation().components
 
-            else:
-                key += char
+    def condensation(self):
+        """
+        Return the Condensation DAG with every strongly connected component merged into one node
+        Runtime: O(V + E) the first time after a change, then O(1)
+        """
+        if self.condensed is None:
+            self.condensed = Condensation(self.vertices_dict, self._successors)
 
-        self.add_edge(from_vertex, to_vertex, cost)
+        return self.condensed
 
-    def _read_vertices(self, text):
+    def is_reachable(self, from_vert, to_vert):
         """
-        Read the text and add vertices
-        Runtime: O(n) where n is the number of character in the text
+        Return True if there's a directed path from one vertex to the other.
+        Vertices in the same component always are, others are checked on the condensation,
+        which is much smaller than the graph.
+        Runtime: O(C + D) over the components and the edges between them
         """
-        curr_key = ''
+        if from_vert not in self.vertices_dict or to_vert not in self.vertices_dict:
+            return False
 
-        for index in range(len(text) - 1):  # - 1 of the text length to ignore '\n' character
+        condensed = self.condensation()
 
-            char = text[index]
+        return condensed.is_reachable(condensed.component_of(from_vert), condensed.component_of(to_vert))
 
-            if char == ',':
-                self.add_vertex(curr_key)
-                curr_key = ''
-            else:
-                curr_key += char
-                if index == len(text) - 2:
-                    self.add_vertex(curr_key)
+    def _successors(self, key):
+        return self.vertices_dict[key].neighbors
 
 
 if __name__ == "__main__":
@@ -205,7 +356,8 @@ if __name__ == "__main__":
 
     # temp_file = "graph_data.txt"
 
-    graph.read_file(filename)
+    stats = graph.read_file(filename)
+    print(stats)
 
     print("# Vertices: {}".format(graph.num_vertices))
     print("# Edges: {}".format(graph.num_edges))
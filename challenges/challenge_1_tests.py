@@ -1,4 +1,5 @@
 from challenge_1 import Graph, Vertex
+from graph_reader import GraphReader
 import unittest
 
 class VertexTests(unittest.TestCase):
@@ -173,3 +174,153 @@ class GraphTests(unittest.TestCase):
         for edge in expected_edges:
             assert edge in self.graph.edges_list
 
+    def test_reading_weighted_file(self):
+        stats = self.graph.read_file('challenge_3_data.txt')
+
+        assert stats.lines == 8
+        assert stats.vertices == 5
+        assert stats.edges == 6
+        assert stats.rejected == 0
+        assert ('3', '5', 10) in self.graph.edges_list
+        assert self.graph.get_vertex('1').get_edge_weight('4') == 5
+
+    def test_reader_chunks(self):
+        # Lines split across tiny chunks and batches should parse the same
+        reader = GraphReader(chunk_size=3, batch_size=2)
+        events = list(reader.read('challenge_3_data.txt'))
+
+        assert events[0] == ('header', 'D')
+        assert events[1] == ('vertices', ['1', '2', '3', '4', '5'])
+
+        edges = [edge for kind, batch in events[2:] for edge in batch]
+        assert all(kind == 'edges' and len(batch) <= 2 for kind, batch in events[2:])
+        assert edges == [('1', '2', 4), ('1', '4', 5), ('2', '3', 6), ('2', '4', 9), ('2', '5', 6), ('3', '5', 10)]
+
+    def test_has_edge(self):
+        self.graph.add_vertex("A")
+        self.graph.add_vertex("B")
+        self.graph.add_vertex("C")
+        self.graph.add_edge("A", "B", 10)
+
+        # Directed graphs only know the edge one way
+        assert self.graph.has_edge("A", "B")
+        assert not self.graph.has_edge("B", "A")
+        assert not self.graph.has_edge("A", "C")
+
+        self.graph.undirected = True
+        assert self.graph.has_edge("B", "A")
+
+    def test_duplicate_edges(self):
+        self.graph.undirected = True
+        self.graph.add_vertex("5")
+        self.graph.add_vertex("2")
+
+        # The reversed edge is a duplicate even when the cost doesn't match
+        self.graph.add_edge("5", "2", 3)
+        self.graph.add_edge("2", "5", 7)
+        self.graph.add_edge("5", "2", 3)
+
+        assert self.graph.num_edges == 1
+        assert list(self.graph.get_edges()) == [("5", "2", 3)]
+        assert self.graph.get_vertex("2").get_edge_weight("5") == 3
+
+    def test_remove_edge(self):
+        self.graph.undirected = True
+        for key in ["A", "B", "C"]:
+            self.graph.add_vertex(key)
+
+        self.graph.add_edge("A", "B", 10)
+        self.graph.add_edge("B", "C", 5)
+        self.graph.add_edge("C", "A", 1)
+
+        # Undirected edges can be removed from either end
+        assert self.graph.remove_edge("B", "A") == 10
+        assert not self.graph.has_edge("A", "B")
+        assert "B" not in self.graph.get_vertex("A").neighbors
+        assert "A" not in self.graph.get_vertex("B").neighbors
+        assert self.graph.num_edges == 2
+
+        # Test for bad inputs
+        assert self.graph.remove_edge("A", "B") is None
+        assert self.graph.remove_edge("A", "Z") is None
+
+        # The remaining edges keep their order
+        assert list(self.graph.get_edges()) == [("B", "C", 5), ("C", "A", 1)]
+        assert ("C", "A", 1) in self.graph.get_edges()
+        assert ("C", "A", 2) not in self.graph.get_edges()
+
+    def test_add_edges_from(self):
+        report = self.graph.add_vertices_from(["A", "B", "C", "B"])
+        assert report.added == 3
+        assert report.rejected == [("B", 'duplicate vertex')]
+
+        report = self.graph.add_edges_from([
+            ("A", "B", 10),
+            ("A", "A"),
+            ("A", "Z"),
+            ("A", "B", 4),
+            ("B", "A", 3),
+            ("B", "C"),
+        ])
+
+        # Directed graphs keep both directions of an edge
+        assert report.added == 3
+        assert report.reasons() == {'self-loop': 1, 'unknown vertex': 1, 'duplicate edge': 1}
+        assert self.graph.num_edges == 3
+        assert list(self.graph.get_edges()) == [("A", "B", 10), ("B", "A", 3), ("B", "C", 0)]
+        assert self.graph.get_vertex("B").neighbors == {"A": 3, "C": 0}
+
+        # Simple graphs treat the reversed edge as a duplicate
+        simple = Graph(undirected=True)
+        simple.add_vertices_from(["A", "B", "C"])
+        report = simple.add_edges_from([("A", "B", 10), ("B", "A", 3), ("C", "B")])
+        assert report.added == 2
+        assert report.rejected == [(("B", "A", 3), 'duplicate edge')]
+        assert simple.get_vertex("B").neighbors == {"A": 10, "C": 0}
+
+    def test_strongly_connected_components(self):
+        self.graph.add_vertices_from(["A", "B", "C", "D", "E", "F", "G"])
+        # A -> B -> C -> A cycle feeding the D <-> E cycle, then F, and G on its own
+        self.graph.add_edges_from([("A", "B"), ("B", "C"), ("C", "A"), ("C", "D"),
+                                   ("D", "E"), ("E", "D"), ("E", "F")])
+
+        components = self.graph.strongly_connected_components()
+        assert sorted(sorted(component) for component in components) == [["A", "B", "C"], ["D", "E"], ["F"], ["G"]]
+
+        # Every edge of the condensation goes forward in the topological order
+        condensed = self.graph.condensation()
+        assert len(condensed) == 4
+        assert condensed.num_edges() == 2
+        for from_component, to_component in condensed.get_edges():
+            assert from_component < to_component
+
+        assert condensed.component_of("A") == condensed.component_of("C")
+        assert condensed.component_of("Z") is None
+
+        assert self.graph.is_reachable("B", "A")
+        assert self.graph.is_reachable("A", "F")
+        assert not self.graph.is_reachable("F", "A")
+        assert not self.graph.is_reachable("D", "B")
+        assert not self.graph.is_reachable("A", "G")
+        assert not self.graph.is_reachable("A", "Z")
+
+        # The condensation is rebuilt after a change
+        self.graph.add_edge("F", "A")
+        assert self.graph.is_reachable("F", "B")
+        assert len(self.graph.condensation()) == 2
+
+        self.graph.remove_edge("C", "D")
+        assert not self.graph.is_reachable("A", "D")
+
+    def test_deep_strongly_connected_components(self):
+        # One long cycle, far deeper than the recursion limit
+        keys = [str(i) for i in range(20000)]
+        self.graph.add_vertices_from(keys)
+        self.graph.add_edges_from((keys[i], keys[(i + 1) % len(keys)]) for i in range(len(keys)))
+
+        assert len(self.graph.strongly_connected_components()) == 1
+
+        self.graph.remove_edge(keys[-1], keys[0])
+        assert len(self.graph.strongly_connected_components()) == len(keys)
+        assert self.graph.is_reachable(keys[0], keys[-1])
+        assert not self.graph.is_reachable(keys[-1], keys[0])
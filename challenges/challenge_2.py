@@ -1,5 +1,20 @@
+import argparse
+import json
+import multiprocessing
+import os
 import sys
-from linked_queue import LinkedQueue
+
+# Helpers shared with the graphs of the repository root are only kept in useful_classes
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'useful_classes'))
+
+from array_queue import ArrayQueue
+from build_report import BuildReport
+from edge_index import EdgeIndex
+from graph_reader import GraphReader
+from memory_report import adjacency_usage, edge_index_usage, memory_report, structure_size
+from snapshot import Snapshot, write_snapshot
+from traversal_stats import TraversalRecorder
+from union_find import UnionFind
 
 
 class Vertex(object):
@@ -16,6 +31,10 @@ class Vertex(object):
         """add a neighbor along a weighted edge"""
         self.neighbors[vertex] = weight
 
+    def remove_neighbor(self, vertex):
+        """remove a neighbor and return the weight of its edge"""
+        return self.neighbors.pop(vertex, None)
+
     def __str__(self):
         """output the list of neighbors of this vertex"""
         return str(self.data) + " adjacent to:\n " + str([x + '\n' for x in self.neighbors.keys()])
@@ -35,12 +54,18 @@ class Vertex(object):
 
 class Graph:
 
+    # Undirected graphs with at least this many vertices use bidirectional search in find_path_bfs by default
+    BIDIRECTIONAL_MIN_VERTICES = 1000
+
     def __init__(self, undirected=False):
         self.vertices_dict = {}
-        self.edges_list = []
+        self.edges_list = EdgeIndex()
         self.num_vertices = 0
         self.num_edges = 0
         self.undirected = undirected
+        self.components = UnionFind()  # Connected components ignoring direction, rebuilt on demand once None
+        self.predecessors_dict = None  # Reversed edges for backward search, built on demand
+        self.traversal_stats = None  # TraversalRecorder of the breadth first searches, if enabled
 
     def __iter__(self):
         """
@@ -63,6 +88,9 @@ class Graph:
 
         self.vertices_dict[key] = new_vertex
         self.num_vertices += 1
+        if self.components is not None:
+            self.components.add(key)
+        self.predecessors_dict = None
 
         return new_vertex
 
@@ -79,33 +107,197 @@ class Graph:
         Runtime: O(1) since the graph store vertices as a dictionary and
                 the Vertex class store neighbors in a dictionary.
         """
+        error = self._insert_edge(from_vert, to_vert, cost)
+
+        if error is not None:
+            print(error)
+
+    def _insert_edge(self, from_vert, to_vert, cost=0):
+        """
+        Add an edge from one to another vertex with a cost,
+        return an error message instead if the edge is rejected
+        """
         # Handle bad inputs and edge cases
         if from_vert == to_vert:
-            print('Both from vertex and to vertex are the same')
-            return
+            return 'Both from vertex and to vertex are the same'
 
         # If one of the inputted vertices doesn't exist in the graph
         elif from_vert not in self.vertices_dict or to_vert not in self.vertices_dict:
-            print('{} or {} are not in dictionary of vertices'.format(from_vert, to_vert))
-            return
+            return '{} or {} are not in dictionary of vertices'.format(from_vert, to_vert)
 
-        reversed_edge = (to_vert, from_vert, cost)
-
-        # Prevent duplicate edges in simple graph
-        if reversed_edge in self.edges_list and self.undirected:
+        # Prevent duplicate edges, in either direction for a simple graph, whatever their cost
+        if self.has_edge(from_vert, to_vert):
             return
 
         # Add to_vertex as neighbor to from_vertex
         home_vertex = self.vertices_dict[from_vert]
         home_vertex.add_neighbor(to_vert, cost)
-        self.edges_list.append((from_vert, to_vert, cost))
+        self.edges_list.add(from_vert, to_vert, cost)
         self.num_edges += 1
+        if self.components is not None:
+            self.components.union(from_vert, to_vert)
+        self.predecessors_dict = None
 
         # Add from_vertex as neighbor to to_vertex is it a simple graph
         if self.undirected:
             neighbor_vertex = self.vertices_dict[to_vert]
             neighbor_vertex.add_neighbor(from_vert, cost)
 
+    def add_vertices_from(self, keys):
+        """
+        Add a vertex for every key of the given iterable or NumPy array without printing,
+        and return a BuildReport listing the duplicate keys that were skipped
+        Runtime: O(n) where n is the number of keys
+        """
+        report = BuildReport()
+
+        if hasattr(keys, 'tolist'):  # NumPy arrays
+            keys = keys.tolist()
+
+        for key in keys:
+            if key in self.vertices_dict:
+                report.reject(key, 'duplicate vertex')
+                continue
+
+            self.vertices_dict[key] = Vertex(key)
+            if self.components is not None:
+                self.components.add(key)
+            report.added += 1
+
+        self.num_vertices += report.added
+        self.predecessors_dict = None
+
+        return report
+
+    def add_edges_from(self, edges):
+        """
+        Add every (from, to) or (from, to, cost) edge of the given iterable or NumPy array without printing.
+        All the edges are validated in one pass before the adjacency is built, and the self-loops,
+        unknown vertices and duplicates are returned in a BuildReport.
+        Runtime: O(n) where n is the number of edges
+        """
+        report = BuildReport()
+
+        if hasattr(edges, 'tolist'):  # NumPy arrays
+            edges = edges.tolist()
+
+        vertices_dict = self.vertices_dict
+        accepted = EdgeIndex()  # The edges that passed validation
+
+        for edge in edges:
+            from_vert, to_vert = edge[0], edge[1]
+
+            if from_vert == to_vert:
+                report.reject(edge, 'self-loop')
+                continue
+
+            elif from_vert not in vertices_dict or to_vert not in vertices_dict:
+                report.reject(edge, 'unknown vertex')
+                continue
+
+            elif self.has_edge(from_vert, to_vert) or (from_vert, to_vert) in accepted \
+                    or (self.undirected and (to_vert, from_vert) in accepted):
+                report.reject(edge, 'duplicate edge')
+                continue
+
+            accepted.add(from_vert, to_vert, edge[2] if len(edge) > 2 else 0)
+
+        # Build the adjacency in one shot
+        for from_vert, to_vert, cost in accepted:
+            vertices_dict[from_vert].neighbors[to_vert] = cost
+            self.edges_list.add(from_vert, to_vert, cost)
+            if self.components is not None:
+                self.components.union(from_vert, to_vert)
+
+            if self.undirected:
+                vertices_dict[to_vert].neighbors[from_vert] = cost
+
+        report.added = len(accepted)
+        self.num_edges += report.added
+        self.predecessors_dict = None
+
+        return report
+
+    def has_edge(self, from_vert, to_vert):
+        """
+        Return True if there's an edge from one vertex to the other,
+        or between them in either direction for a simple graph
+        Runtime: O(1) since the graph index its edges in a dictionary
+        """
+        if (from_vert, to_vert) in self.edges_list:
+            return True
+
+        return self.undirected and (to_vert, from_vert) in self.edges_list
+
+    def remove_edge(self, from_vert, to_vert):
+        """
+        Remove the edge from one vertex to the other and return its cost,
+        or None if there's no such edge
+        Runtime: O(1)
+        """
+        if (from_vert, to_vert) in self.edges_list:
+            cost = self.edges_list.remove(from_vert, to_vert)
+
+        elif self.undirected and (to_vert, from_vert) in self.edges_list:
+            cost = self.edges_list.remove(to_vert, from_vert)
+
+        else:
+            return
+
+        self.vertices_dict[from_vert].remove_neighbor(to_vert)
+        if self.undirected:
+            self.vertices_dict[to_vert].remove_neighbor(from_vert)
+
+        self.num_edges -= 1
+        self.components = None  # Union-find can't split a component, rebuild it when next needed
+        self.predecessors_dict = None
+
+        return cost
+
+    @property
+    def num_components(self):
+        """Return the number of connected components, ignoring the direction of the edges"""
+        return self._get_components().num_components
+
+    def connected(self, from_vert, to_vert):
+        """
+        Return True if the two vertices are connected, ignoring the direction of the edges.
+        A directed path needs them connected, so False rules one out without a traversal.
+        Runtime: O(α(V)) amortized, O(V + E) once after an edge was removed
+        """
+        if from_vert not in self.vertices_dict or to_vert not in self.vertices_dict:
+            return False
+
+        return self._get_components().connected(from_vert, to_vert)
+
+    def component_of(self, key):
+        """
+        Return the representative vertex key of the component the vertex is in, or None.
+        Two vertices are connected when their components have the same representative.
+        Runtime: O(α(V)) amortized
+        """
+        return self._get_components().find(key) if key in self.vertices_dict else None
+
+    def component_sizes(self):
+        """
+        Return a dictionary of representative vertex key -> number of vertices in its component
+        Runtime: O(c) where c is the number of components
+        """
+        return self._get_components().component_sizes()
+
+    def _get_components(self):
+        """
+        Return the union-find structure of the connected components,
+        rebuilding it if an edge was removed since it was last used
+        """
+        if self.components is None:
+            self.components = UnionFind(self.vertices_dict)
+
+            for from_vert, to_vert, _ in self.edges_list:
+                self.components.union(from_vert, to_vert)
+
+        return self.components
+
     def get_vertices(self):
         """
         Return all the vertices in the graph
@@ -115,92 +307,156 @@ class Graph:
 
     def get_edges(self):
         """
-        Return a set of all unique the edges in the graph
-        Runtime: O(1) since the graph store a list of edges
+        Return an ordered view of all unique the edges in the graph, as (from, to, cost)
+        Runtime: O(1) since the graph store an index of edges
         """
         return self.edges_list
 
+    def memory_usage(self, deep=True, sample=None):
+        """
+        Return a report of the bytes the graph uses by structure, with the total and the
+        per vertex and per edge averages, as described in memory_report.memory_report.
+        The structures are those of memory_report.adjacency_usage and edge_index_usage,
+        plus the components, the reversed edges and the traversal recorder when they exist.
+        deep: measure the vertex objects, key strings, edge tuples and weights too, not only the tables
+        sample: number of vertices and edges to measure and scale up from, None to measure all of them
+        Runtime: O(V + E), where sampling only measures sample vertices and edges while skipping the rest
+        """
+        sizes = adjacency_usage(self.vertices_dict, 'data', deep, sample)
+        sizes.update(edge_index_usage(self.edges_list, self.vertices_dict, 'data', deep, sample))
+
+        if self.components is not None:
+            sizes['components'] = structure_size(self.components)
+
+        if self.predecessors_dict is not None:
+            sizes['predecessors'] = sys.getsizeof(self.predecessors_dict) + sum(
+                sys.getsizeof(keys) for keys in self.predecessors_dict.values())
+
+        if self.traversal_stats is not None:
+            sizes['traversal_stats'] = structure_size(self.traversal_stats)
+
+        return memory_report(sizes, self.num_vertices, self.num_edges, deep, sample)
+
     def read_file(self, text_file):
         """
-        Read the given file and add all the vertices and edges
+        Read the given file and add all the vertices and edges, return the read statistics
         Runtime: O(n) where n is the number of character in the text file
         """
-        with open(text_file, 'r') as file:
-            for line in file:
-                if len(line) == 2:
-                    self.undirected = line[0] == 'D'
+        reader = GraphReader()
+
+        for kind, value in reader.read(text_file):
+            if kind == 'header':
+                self.undirected = value == 'D'
+
+            elif kind == 'vertices':
+                self.add_vertices_from(value)
 
-                elif line[0] != "(":
-                    self._read_vertices(line)
+            else:
+                reader.stats.rejected += len(self.add_edges_from(value).rejected)
 
-                else:
-                    self._read_edge(line)
+        return reader.stats
 
-    def _read_edge(self, text):
+    def save_snapshot(self, path):
         """
-        Read the text and add the edge to the graph
-        Runtime: O(n) where n is the number of character in the text
+        Write the graph to a binary snapshot file, see snapshot.py for the layout
+        Runtime: O(V + E)
         """
-        cost = 0
-        key = ''
-        from_vertex = ''
-        to_vertex = ''
-        get_from = False
-        get_to = False
+        write_snapshot(self, path)
 
-        for index in range(len(text)):
-            char = text[index]
+    @classmethod
+    def load_snapshot(cls, path, mmap=True):
+        """
+        Load a graph written by save_snapshot.
+        mmap=True maps the file and returns a read-only Snapshot graph whose arrays are views
+        over the file, so it opens in O(1) and pages are only read as traversals touch them.
+        It answers find_path_bfs, breadth_first_search_length, is_reachable, connected,
+        depth_first_search_iter and shortest_path from the file; other methods need mmap=False.
+        mmap=False reads the whole file and rebuilds a regular Graph.
+        """
+        snapshot = Snapshot(path, use_mmap=mmap)
 
-            if char == '(':
-                continue
+        if mmap:
+            return snapshot
 
-            # Add the remaining key to the cost once the vertices have been found
-            elif char == ')' and get_from and get_to and key != '':
-                cost = int(key)
+        try:
+            return snapshot.to_graph(cls())
+        finally:
+            snapshot.close()
 
-            elif char == ')' and not get_to and key != '':
-                to_vertex = key
+    def enable_stats(self, callback=None, keep=1000):
+        """
+        Count the vertices, edges, frontier size, visited map size and wall time of every
+        breadth first search, and return the TraversalRecorder holding them
+        callback: function called with the TraversalStats of every finished search
+        """
+        self.traversal_stats = TraversalRecorder(callback, keep)
+        return self.traversal_stats
+
+    def disable_stats(self):
+        """Stop counting the breadth first searches"""
+        self.traversal_stats = None
+
+    def breadth_first_search_length(self, vertex, length):
+        """
+        Perform breadth first search along the direction of the edges and return
+        all the vertices exactly length edges away from the inputted vertex
+        Runtime: O(V + E)
+        """
+        if vertex not in self.vertices_dict:
+            return
+
+        if length < 1:
+            return []
+
+        visited = {vertex}
+        frontier = [vertex]
+
+        stats = self.traversal_stats.start('breadth_first_search_length') if self.traversal_stats else None
+
+        # Expand one level at a time, the last frontier is the answer
+        for _ in range(length):
+            # Nothing is any further away, the answer is empty however long the length
+            if not frontier:
                 break
 
-            elif char == ',':
+            if stats is not None:
+                self._count_frontier(stats, frontier, len(frontier))
 
-                if not get_from:
-                    from_vertex = key
-                    get_from = True
-                    key = ''
+            next_frontier = []
 
-                elif not get_to:
-                    to_vertex = key
-                    get_to = True
-                    key = ''
+            for key in frontier:
+                for neighbor in self.vertices_dict[key].neighbors:
+                    if neighbor not in visited:
+                        visited.add(neighbor)
+                        next_frontier.append(neighbor)
 
-            else:
-                key += char
+            frontier = next_frontier
+
+        if stats is not None:
+            self.traversal_stats.finish(stats, len(visited))
 
-        self.add_edge(from_vertex, to_vertex, cost)
+        return [self.vertices_dict[key] for key in frontier]
 
-    def _read_vertices(self, text):
+    def path_keys(self, from_vert, to_vert):
         """
-        Read the text and add vertices
-        Runtime: O(n) where n is the number of character in the text
+        Return the keys on a shortest path from one vertex to another, or None if there's no path,
+        like find_path_bfs but without printing about bad input
+        Runtime: O(V + E)
         """
-        curr_key = ''
-
-        for index in range(len(text) - 1):  # - 1 of the text length to ignore '\n' character
+        if from_vert not in self.vertices_dict or to_vert not in self.vertices_dict:
+            return
 
-            char = text[index]
+        elif from_vert == to_vert:
+            return [from_vert]
 
-            if char == ',':
-                self.add_vertex(curr_key)
-                curr_key = ''
-            else:
-                curr_key += char
-                if index == len(text) - 2:
-                    self.add_vertex(curr_key)
+        path = self.find_path_bfs(from_vert, to_vert)
+        return [x.data for x in path] if path is not None else None
 
-    def find_path_bfs(self, from_vert, to_vert):
+    def find_path_bfs(self, from_vert, to_vert, bidirectional=None):
         """
         Return a list of vertex that represent a path from one vertex to another
+        bidirectional: True to grow frontiers from both ends, False to search from from_vert only,
+                       None to pick bidirectional for undirected graphs of BIDIRECTIONAL_MIN_VERTICES or more
         Runtime: O(V + E)
         """
         if from_vert not in self.vertices_dict or to_vert not in self.vertices_dict:
@@ -211,12 +467,24 @@ class Graph:
             print('Both from vertex and to vertex are the same')
             return [self.vertices_dict[from_vert]]
 
-        queue = LinkedQueue()
+        # Cover case for disjointed graph without searching anything
+        elif not self.connected(from_vert, to_vert):
+            return
+
+        if bidirectional is None:
+            bidirectional = self.undirected and self.num_vertices >= self.BIDIRECTIONAL_MIN_VERTICES
+
+        if bidirectional:
+            return self._find_path_bidirectional(from_vert, to_vert)
+
+        queue = ArrayQueue()
         queue.enqueue((self.vertices_dict[from_vert], None))   # Enqueue the from vertex
 
         # A dictionary to keep track of the visited vertices along with their predecessor
         visited_dict = {self.vertices_dict[from_vert].data: None}
 
+        stats = self.traversal_stats.start('find_path_bfs') if self.traversal_stats else None
+
         while not queue.is_empty():
 
             value = queue.dequeue()  # curr_vertex = (Vertex,  Parent Vertex)
@@ -226,6 +494,9 @@ class Graph:
             if curr_vertex.data == to_vert:
                 break
 
+            if stats is not None:
+                stats.expand(curr_vertex.neighbors, len(queue) + 1)
+
             for neighbor in curr_vertex.get_neighbors():
 
                 if neighbor not in visited_dict:
@@ -236,6 +507,9 @@ class Graph:
                     # Add the neighbor to the visited dictionary
                     visited_dict[new_value[0].data] = new_value[1]
 
+        if stats is not None:
+            self.traversal_stats.finish(stats, len(visited_dict))
+
         # Cover case for disjointed graph
         if to_vert not in visited_dict:
             return
@@ -252,17 +526,223 @@ class Graph:
 
         return path
 
+    def _find_path_bidirectional(self, from_vert, to_vert):
+        """
+        Return a list of vertex that represent a shortest path from one vertex to another,
+        growing one frontier from each end and always expanding the smaller one.
+        Directed graphs search backwards along the reversed edges.
+        Runtime: O(V + E), but usually only explores around the two ends
+        """
+        forward_neighbors = self._successors
+        backward_neighbors = self._successors if self.undirected else self._get_predecessors().__getitem__
+
+        # Predecessor of every vertex reached from from_vert, and successor of every vertex reached from to_vert
+        forward_dict = {from_vert: None}
+        backward_dict = {to_vert: None}
+
+        forward_frontier = [from_vert]
+        backward_frontier = [to_vert]
+        meeting = None
+
+        stats = self.traversal_stats.start('find_path_bfs') if self.traversal_stats else None
+
+        while forward_frontier and backward_frontier and meeting is None:
+            if len(forward_frontier) <= len(backward_frontier):
+                if stats is not None:
+                    self._count_frontier(stats, forward_frontier, len(forward_frontier) + len(backward_frontier),
+                                         forward_neighbors)
+
+                forward_frontier, meeting = self._expand_frontier(forward_frontier, forward_dict,
+                                                                  backward_dict, forward_neighbors)
+            else:
+                if stats is not None:
+                    self._count_frontier(stats, backward_frontier, len(forward_frontier) + len(backward_frontier),
+                                         backward_neighbors)
+
+                backward_frontier, meeting = self._expand_frontier(backward_frontier, backward_dict,
+                                                                   forward_dict, backward_neighbors)
+
+        if stats is not None:
+            self.traversal_stats.finish(stats, len(forward_dict) + len(backward_dict))
+
+        # Cover case for disjointed graph
+        if meeting is None:
+            return
+
+        # Stitch the two halves together at the meeting vertex
+        path = []
+        key = meeting
+        while key is not None:
+            path.append(self.vertices_dict[key])
+            key = forward_dict[key]
+
+        path.reverse()
+
+        key = backward_dict[meeting]
+        while key is not None:
+            path.append(self.vertices_dict[key])
+            key = backward_dict[key]
+
+        return path
+
+    def _expand_frontier(self, frontier, visited_dict, other_dict, neighbors_of):
+        """
+        Visit every unvisited neighbor of the frontier one level out, and return the new frontier
+        along with the first vertex the other search has already visited, if any.
+        Runtime: O(E) of the frontier
+        """
+        next_frontier = []
+
+        for key in frontier:
+            for neighbor in neighbors_of(key):
+                if neighbor not in visited_dict:
+                    visited_dict[neighbor] = key
+
+                    if neighbor in other_dict:
+                        return next_frontier, neighbor
+
+                    next_frontier.append(neighbor)
+
+        return next_frontier, None
+
+    def _count_frontier(self, stats, frontier, frontier_size, neighbors_of=None):
+        """Count a frontier about to be expanded one level into the traversal stats"""
+        neighbors_of = neighbors_of or self._successors
+
+        stats.dequeued += len(frontier)
+        stats.edges_scanned += sum(len(neighbors_of(key)) for key in frontier)
+        stats.peak_frontier = max(stats.peak_frontier, frontier_size)
+
+    def _successors(self, key):
+        """Return the keys the given vertex has an edge to"""
+        return self.vertices_dict[key].get_neighbors()
+
+    def _get_predecessors(self):
+        """
+        Return a dictionary of key -> keys of the vertices with an edge to it,
+        built once and reused until the next add_edge
+        Runtime: O(V + E) to build, O(1) afterwards
+        """
+        if self.predecessors_dict is None:
+            self.predecessors_dict = {key: [] for key in self.vertices_dict}
+
+            for vertex in self:
+                for neighbor in vertex.get_neighbors():
+                    self.predecessors_dict[neighbor].append(vertex.data)
+
+        return self.predecessors_dict
+
+
+# Graph the batch workers answer queries on, inherited from the parent or loaded once per worker
+_worker_graph = None
+
+
+def _init_worker(filename):
+    global _worker_graph
+
+    if _worker_graph is None:
+        _worker_graph = Graph()
+        _worker_graph.read_file(filename)
+
+
+def _answer_query(pair):
+    return pair[0], pair[1], _worker_graph.path_keys(pair[0], pair[1])
+
+
+def read_queries(lines):
+    """
+    Generate the (from, to) pairs of query lines, the two keys split by
+    whitespace or a comma, skipping blank lines and # comments
+    """
+    for line in lines:
+        line = line.strip()
+
+        if not line or line.startswith('#'):
+            continue
+
+        keys = line.replace(',', ' ').split()
+        if len(keys) != 2:
+            print('Skipping query line: {}'.format(line), file=sys.stderr)
+            continue
+
+        yield keys[0], keys[1]
+
+
+def format_answer(from_vert, to_vert, path, output_format):
+    """Return the output line for the answer to one query, without the line break"""
+    edges = len(path) - 1 if path is not None else None
+
+    if output_format == 'tsv':
+        return '\t'.join([from_vert, to_vert, str(edges) if path is not None else '', ','.join(path or [])])
+
+    return json.dumps({'from': from_vert, 'to': to_vert, 'edges': edges, 'path': path})
+
+
+def run_batch(graph, filename, queries, output, output_format='jsonl', workers=1, flush_every=256):
+    """
+    Answer every (from, to) query and write one line per answer to output, in query order,
+    as they are computed. With more than one worker the queries are spread over a process pool;
+    forked workers share the loaded graph, others load filename once each.
+    Return the number of queries answered.
+    """
+    global _worker_graph
+    _worker_graph = graph
+
+    if workers > 1:
+        pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(filename,))
+        answers = pool.imap(_answer_query, queries, chunksize=flush_every)
+    else:
+        pool = None
+        answers = (_answer_query(pair) for pair in queries)
+
+    count = 0
+
+    try:
+        for from_vert, to_vert, path in answers:
+            output.write(format_answer(from_vert, to_vert, path, output_format) + '\n')
+            count += 1
+
+            if count % flush_every == 0:
+                output.flush()
+
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    output.flush()
+
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Find shortest paths in a graph file')
+    parser.add_argument('filename', help='graph file to load')
+    parser.add_argument('from_vertex', nargs='?', help='vertex the path starts at')
+    parser.add_argument('to_vertex', nargs='?', help='vertex the path ends at')
+    parser.add_argument('--batch', metavar='QUERIES',
+                        help='answer every "from to" line of this file, - for stdin, instead of one query')
+    parser.add_argument('--format', choices=['jsonl', 'tsv'], default='jsonl', help='output format of batch mode')
+    parser.add_argument('--workers', type=int, default=1, help='processes answering batch queries')
+    args = parser.parse_args(argv)
+
+    if args.batch is None and (args.from_vertex is None or args.to_vertex is None):
+        parser.error('give a from and to vertex, or --batch')
 
-if __name__ == "__main__":
     # Create a graph
     graph = Graph()
-    filename = sys.argv[1]
-    from_vertex = sys.argv[2]
-    to_vertex = sys.argv[3]
+    graph.read_file(args.filename)
+
+    if args.batch is not None:
+        queries = sys.stdin if args.batch == '-' else open(args.batch)
 
-    # temp_file = "graph_data.txt"
+        try:
+            run_batch(graph, args.filename, read_queries(queries), sys.stdout, args.format, args.workers)
+        finally:
+            if queries is not sys.stdin:
+                queries.close()
 
-    graph.read_file(filename)
+        return
 
     print("# Vertices: {}".format(graph.num_vertices))
     print("# Edges: {}".format(graph.num_edges))
@@ -270,9 +750,14 @@ if __name__ == "__main__":
     for edge in graph.get_edges():
         print(edge)
 
-    path = graph.find_path_bfs(from_vertex, to_vertex)
+    path = graph.find_path_bfs(args.from_vertex, args.to_vertex)
+    if path is None:
+        print('No path from vertex {} to vertex {}'.format(args.from_vertex, args.to_vertex))
+        return
+
     print('Vertices in shortest path: ' + ', '.join([x.data for x in path]))
     print('Number of edges in shortest path: {}'.format(len(path) - 1))
 
 
-
+if __name__ == "__main__":
+    main()
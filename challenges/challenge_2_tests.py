@@ -1,4 +1,9 @@
-from challenge_2 import Graph, Vertex
+from challenge_2 import Graph, Vertex, read_queries, run_batch
+import io
+import json
+import os
+import sys
+import tempfile
 import unittest
 
 class VertexTests(unittest.TestCase):
@@ -195,3 +200,167 @@ class GraphTests(unittest.TestCase):
         # Add disjointed vertices
         self.graph.add_vertex('6')
         assert self.graph.find_path_bfs('1', '6') is None
+
+    def test_connectivity(self):
+        self.graph.read_file('graph_data.txt')
+        self.graph.add_vertex('6')
+
+        assert self.graph.num_components == 2
+        assert self.graph.connected('1', '5')
+        assert not self.graph.connected('1', '6')
+        assert self.graph.component_sizes()[self.graph.component_of('3')] == 5
+
+        # Removing edges rebuilds the components when they are next needed
+        self.graph.remove_edge('1', '2')
+        self.graph.remove_edge('1', '4')
+        assert not self.graph.connected('1', '5')
+        assert self.graph.find_path_bfs('1', '5') is None
+        assert self.graph.num_components == 3
+
+    def test_shortest_path_bidirectional(self):
+        filename = 'graph_data.txt'
+        self.graph.read_file(filename)
+
+        shortest_path = [x.data for x in self.graph.find_path_bfs('1', '5', bidirectional=True)]
+        assert shortest_path == ['1', '2', '5']
+
+        # Directed graphs search backwards along the reversed edges
+        directed = Graph()
+        for key in ['A', 'B', 'C', 'D', 'E']:
+            directed.add_vertex(key)
+        directed.add_edge('A', 'B')
+        directed.add_edge('B', 'C')
+        directed.add_edge('C', 'D')
+        directed.add_edge('E', 'D')
+        directed.add_edge('A', 'E')
+
+        shortest_path = [x.data for x in directed.find_path_bfs('A', 'D', bidirectional=True)]
+        assert shortest_path == ['A', 'E', 'D']
+        assert directed.find_path_bfs('D', 'A', bidirectional=True) is None
+
+        # New edges are seen by the next backward search
+        directed.add_edge('B', 'D')
+        shortest_path = [x.data for x in directed.find_path_bfs('B', 'D', bidirectional=True)]
+        assert shortest_path == ['B', 'D']
+
+    def test_traversal_stats(self):
+        self.graph.read_file('graph_data.txt')
+        recorder = self.graph.enable_stats()
+
+        # Levels [1] and [2, 4] are expanded to reach [3, 5]
+        self.graph.breadth_first_search_length('1', 2)
+        stats = recorder.last()
+        assert stats.method == 'breadth_first_search_length'
+        assert stats.dequeued == 3
+        assert stats.edges_scanned == 8
+        assert stats.peak_frontier == 2
+        assert stats.visited == 5
+
+        # The search stops once no vertex is left to reach, however long the length
+        assert self.graph.breadth_first_search_length('1', 10 ** 7) == []
+        assert recorder.last().dequeued == 5
+
+        self.graph.find_path_bfs('1', '5')
+        assert recorder.last().dequeued == 4
+        assert recorder.last().peak_frontier == 3
+
+        # The bidirectional search expands one vertex from each end before they meet
+        self.graph.find_path_bfs('1', '5', bidirectional=True)
+        assert recorder.last().dequeued == 2
+        assert recorder.last().visited == 5
+        assert recorder.totals['find_path_bfs']['calls'] == 2
+
+        self.graph.disable_stats()
+        self.graph.find_path_bfs('1', '5')
+        assert len(recorder.calls) == 4
+
+    def test_memory_usage(self):
+        self.graph.read_file('graph_data.txt')
+
+        report = self.graph.memory_usage()
+        structures = report['structures']
+        assert report['total'] == sum(structures.values())
+        assert report['per_edge'] == report['total'] / 6
+        assert structures['edge_tuples'] == 6 * sys.getsizeof(('1', '2'))
+        assert structures['components'] > 0
+
+        # The reversed edges are counted once a backward search built them
+        assert 'predecessors' not in structures
+        self.graph.find_path_bfs('1', '5', bidirectional=True)
+        assert 'predecessors' not in self.graph.memory_usage()['structures']
+
+        directed = Graph()
+        for key in ['A', 'B', 'C']:
+            directed.add_vertex(key)
+        directed.add_edge('A', 'B')
+        directed.add_edge('B', 'C')
+        directed.find_path_bfs('A', 'C', bidirectional=True)
+        assert directed.memory_usage(deep=False)['structures']['predecessors'] > 0
+
+        sampled = self.graph.memory_usage(sample=2)
+        assert not sampled['exact']
+        assert sampled['structures']['edges_list'] == structures['edges_list']
+
+    def test_snapshot(self):
+        self.graph.read_file('challenge_3_data.txt')
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'graph.snapshot')
+            self.graph.save_snapshot(path)
+
+            # Memory mapped snapshots answer queries straight from the file
+            with Graph.load_snapshot(path) as snapshot:
+                assert snapshot.undirected is True
+                assert snapshot.num_vertices == 5
+                assert snapshot.num_edges == 6
+                assert list(snapshot.get_vertices()) == ['1', '2', '3', '4', '5']
+                assert sorted(snapshot.get_edges()) == sorted(self.graph.get_edges())
+                assert snapshot.get_vertex('2').neighbors == self.graph.get_vertex('2').neighbors
+                assert snapshot.get_vertex('9') is None
+
+                shortest_path = [x.data for x in snapshot.find_path_bfs('1', '5')]
+                assert shortest_path == ['1', '2', '5']
+
+            # Loading without mmap rebuilds a regular graph
+            loaded = Graph.load_snapshot(path, mmap=False)
+            assert isinstance(loaded, Graph)
+            assert loaded.undirected is True
+            assert loaded.num_edges == 6
+            assert sorted(loaded.get_edges()) == sorted(self.graph.get_edges())
+
+            # Files cut short or grown past what their header describes are rejected,
+            # even when the cut lands between two items
+            with open(path, 'rb') as file:
+                data = file.read()
+            for damaged in (data[:-1], data[:-8], data[:-24], data + b'\0' * 8):
+                with open(path, 'wb') as file:
+                    file.write(damaged)
+                self.assertRaises(ValueError, Graph.load_snapshot, path)
+                self.assertRaises(ValueError, Graph.load_snapshot, path, mmap=False)
+
+            # Anything else is rejected
+            with open(path, 'wb') as file:
+                file.write(b'not a snapshot at all, just some text')
+            self.assertRaises(ValueError, Graph.load_snapshot, path)
+
+    def test_batch_queries(self):
+        self.graph.read_file('graph_data.txt')
+
+        queries = list(read_queries(['1 5', '# comment', '', '1,3', '1 9', 'too many keys']))
+        assert queries == [('1', '5'), ('1', '3'), ('1', '9')]
+
+        output = io.StringIO()
+        assert run_batch(self.graph, 'graph_data.txt', queries, output) == 3
+
+        answers = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert answers[0] == {'from': '1', 'to': '5', 'edges': 2, 'path': ['1', '2', '5']}
+        assert answers[2] == {'from': '1', 'to': '9', 'edges': None, 'path': None}
+
+        # Worker processes answer in the same order
+        output = io.StringIO()
+        run_batch(self.graph, 'graph_data.txt', queries * 50, output, 'tsv', workers=2, flush_every=16)
+
+        lines = output.getvalue().splitlines()
+        assert len(lines) == 150
+        assert lines[:3] == ['1\t5\t2\t1,2,5', '1\t3\t2\t1,2,3', '1\t9\t\t']
+        assert lines[147:] == lines[:3]
@@ -1,4 +1,17 @@
+import os
 import sys
+
+# Helpers shared with the graphs of the repository root are only kept in useful_classes
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'useful_classes'))
+
+from build_report import BuildReport
+from edge_index import EdgeIndex
+from graph_reader import GraphReader
+from memory_report import adjacency_usage, edge_index_usage, memory_report, structure_size
+from indexed_heap import IndexedHeap
+from snapshot import Snapshot, write_snapshot
+from traversal_stats import TraversalRecorder
+from union_find import UnionFind
 # from linked_queue import LinkedQueue
 
 
@@ -16,6 +29,10 @@ class Vertex(object):
         """add a neighbor along a weighted edge"""
         self.neighbors[vertex] = weight
 
+    def remove_neighbor(self, vertex):
+        """remove a neighbor and return the weight of its edge"""
+        return self.neighbors.pop(vertex, None)
+
     def __str__(self):
         """output the list of neighbors of this vertex"""
         return str(self.data) + " adjacent to:\n " + str([x + '\n' for x in self.neighbors.keys()])
@@ -37,10 +54,12 @@ class Graph:
 
     def __init__(self, undirected=False):
         self.vertices_dict = {}
-        self.edges_list = []
+        self.edges_list = EdgeIndex()
         self.num_vertices = 0
         self.num_edges = 0
         self.undirected = undirected
+        self.components = UnionFind()  # Connected components ignoring direction, rebuilt on demand once None
+        self.traversal_stats = None  # TraversalRecorder of the depth first and Dijkstra searches, if enabled
 
     def __iter__(self):
         """
@@ -63,6 +82,8 @@ class Graph:
 
         self.vertices_dict[key] = new_vertex
         self.num_vertices += 1
+        if self.components is not None:
+            self.components.add(key)
 
         return new_vertex
 
@@ -79,33 +100,193 @@ class Graph:
         Runtime: O(1) since the graph store vertices as a dictionary and
                 the Vertex class store neighbors in a dictionary.
         """
+        error = self._insert_edge(from_vert, to_vert, cost)
+
+        if error is not None:
+            print(error)
+
+    def _insert_edge(self, from_vert, to_vert, cost=0):
+        """
+        Add an edge from one to another vertex with a cost,
+        return an error message instead if the edge is rejected
+        """
         # Handle bad inputs and edge cases
         if from_vert == to_vert:
-            print('Both from vertex and to vertex are the same')
-            return
+            return 'Both from vertex and to vertex are the same'
 
         # If one of the inputted vertices doesn't exist in the graph
         elif from_vert not in self.vertices_dict or to_vert not in self.vertices_dict:
-            print('{} or {} are not in dictionary of vertices'.format(from_vert, to_vert))
-            return
+            return '{} or {} are not in dictionary of vertices'.format(from_vert, to_vert)
 
-        reversed_edge = (to_vert, from_vert, cost)
-
-        # Prevent duplicate edges in simple graph
-        if reversed_edge in self.edges_list and self.undirected:
+        # Prevent duplicate edges, in either direction for a simple graph, whatever their cost
+        if self.has_edge(from_vert, to_vert):
             return
 
         # Add to_vertex as neighbor to from_vertex
         home_vertex = self.vertices_dict[from_vert]
         home_vertex.add_neighbor(to_vert, cost)
-        self.edges_list.append((from_vert, to_vert, cost))
+        self.edges_list.add(from_vert, to_vert, cost)
         self.num_edges += 1
+        if self.components is not None:
+            self.components.union(from_vert, to_vert)
 
         # Add from_vertex as neighbor to to_vertex is it a simple graph
         if self.undirected:
             neighbor_vertex = self.vertices_dict[to_vert]
             neighbor_vertex.add_neighbor(from_vert, cost)
 
+    def add_vertices_from(self, keys):
+        """
+        Add a vertex for every key of the given iterable or NumPy array without printing,
+        and return a BuildReport listing the duplicate keys that were skipped
+        Runtime: O(n) where n is the number of keys
+        """
+        report = BuildReport()
+
+        if hasattr(keys, 'tolist'):  # NumPy arrays
+            keys = keys.tolist()
+
+        for key in keys:
+            if key in self.vertices_dict:
+                report.reject(key, 'duplicate vertex')
+                continue
+
+            self.vertices_dict[key] = Vertex(key)
+            if self.components is not None:
+                self.components.add(key)
+            report.added += 1
+
+        self.num_vertices += report.added
+
+        return report
+
+    def add_edges_from(self, edges):
+        """
+        Add every (from, to) or (from, to, cost) edge of the given iterable or NumPy array without printing.
+        All the edges are validated in one pass before the adjacency is built, and the self-loops,
+        unknown vertices and duplicates are returned in a BuildReport.
+        Runtime: O(n) where n is the number of edges
+        """
+        report = BuildReport()
+
+        if hasattr(edges, 'tolist'):  # NumPy arrays
+            edges = edges.tolist()
+
+        vertices_dict = self.vertices_dict
+        accepted = EdgeIndex()  # The edges that passed validation
+
+        for edge in edges:
+            from_vert, to_vert = edge[0], edge[1]
+
+            if from_vert == to_vert:
+                report.reject(edge, 'self-loop')
+                continue
+
+            elif from_vert not in vertices_dict or to_vert not in vertices_dict:
+                report.reject(edge, 'unknown vertex')
+                continue
+
+            elif self.has_edge(from_vert, to_vert) or (from_vert, to_vert) in accepted \
+                    or (self.undirected and (to_vert, from_vert) in accepted):
+                report.reject(edge, 'duplicate edge')
+                continue
+
+            accepted.add(from_vert, to_vert, edge[2] if len(edge) > 2 else 0)
+
+        # Build the adjacency in one shot
+        for from_vert, to_vert, cost in accepted:
+            vertices_dict[from_vert].neighbors[to_vert] = cost
+            self.edges_list.add(from_vert, to_vert, cost)
+            if self.components is not None:
+                self.components.union(from_vert, to_vert)
+
+            if self.undirected:
+                vertices_dict[to_vert].neighbors[from_vert] = cost
+
+        report.added = len(accepted)
+        self.num_edges += report.added
+
+        return report
+
+    def has_edge(self, from_vert, to_vert):
+        """
+        Return True if there's an edge from one vertex to the other,
+        or between them in either direction for a simple graph
+        Runtime: O(1) since the graph index its edges in a dictionary
+        """
+        if (from_vert, to_vert) in self.edges_list:
+            return True
+
+        return self.undirected and (to_vert, from_vert) in self.edges_list
+
+    def remove_edge(self, from_vert, to_vert):
+        """
+        Remove the edge from one vertex to the other and return its cost,
+        or None if there's no such edge
+        Runtime: O(1)
+        """
+        if (from_vert, to_vert) in self.edges_list:
+            cost = self.edges_list.remove(from_vert, to_vert)
+
+        elif self.undirected and (to_vert, from_vert) in self.edges_list:
+            cost = self.edges_list.remove(to_vert, from_vert)
+
+        else:
+            return
+
+        self.vertices_dict[from_vert].remove_neighbor(to_vert)
+        if self.undirected:
+            self.vertices_dict[to_vert].remove_neighbor(from_vert)
+
+        self.num_edges -= 1
+        self.components = None  # Union-find can't split a component, rebuild it when next needed
+
+        return cost
+
+    @property
+    def num_components(self):
+        """Return the number of connected components, ignoring the direction of the edges"""
+        return self._get_components().num_components
+
+    def connected(self, from_vert, to_vert):
+        """
+        Return True if the two vertices are connected, ignoring the direction of the edges.
+        A directed path needs them connected, so False rules one out without a traversal.
+        Runtime: O(α(V)) amortized, O(V + E) once after an edge was removed
+        """
+        if from_vert not in self.vertices_dict or to_vert not in self.vertices_dict:
+            return False
+
+        return self._get_components().connected(from_vert, to_vert)
+
+    def component_of(self, key):
+        """
+        Return the representative vertex key of the component the vertex is in, or None.
+        Two vertices are connected when their components have the same representative.
+        Runtime: O(α(V)) amortized
+        """
+        return self._get_components().find(key) if key in self.vertices_dict else None
+
+    def component_sizes(self):
+        """
+        Return a dictionary of representative vertex key -> number of vertices in its component
+        Runtime: O(c) where c is the number of components
+        """
+        return self._get_components().component_sizes()
+
+    def _get_components(self):
+        """
+        Return the union-find structure of the connected components,
+        rebuilding it if an edge was removed since it was last used
+        """
+        if self.components is None:
+            self.components = UnionFind(self.vertices_dict)
+
+            for from_vert, to_vert, _ in self.edges_list:
+                self.components.union(from_vert, to_vert)
+
+        return self.components
+
     def get_vertices(self):
         """
         Return all the vertices in the graph
@@ -115,160 +296,296 @@ class Graph:
 
     def get_edges(self):
         """
-        Return a set of all unique the edges in the graph
-        Runtime: O(1) since the graph store a list of edges
+        Return an ordered view of all unique the edges in the graph, as (from, to, cost)
+        Runtime: O(1) since the graph store an index of edges
         """
         return self.edges_list
 
-    def read_file(self, text_file):
+    def memory_usage(self, deep=True, sample=None):
         """
-        Read the given file and add all the vertices and edges
-        Runtime: O(n) where n is the number of character in the text file
+        Return a report of the bytes the graph uses by structure, with the total and the
+        per vertex and per edge averages, as described in memory_report.memory_report.
+        The structures are those of memory_report.adjacency_usage and edge_index_usage,
+        plus the components and the traversal recorder when they exist.
+        deep: measure the vertex objects, key strings, edge tuples and weights too, not only the tables
+        sample: number of vertices and edges to measure and scale up from, None to measure all of them
+        Runtime: O(V + E), where sampling only measures sample vertices and edges while skipping the rest
         """
-        with open(text_file, 'r') as file:
-            for line in file:
-                if len(line) == 2:
-                    self.undirected = line[0] == 'D'
+        sizes = adjacency_usage(self.vertices_dict, 'data', deep, sample)
+        sizes.update(edge_index_usage(self.edges_list, self.vertices_dict, 'data', deep, sample))
+
+        if self.components is not None:
+            sizes['components'] = structure_size(self.components)
 
-                elif line[0] != "(":
-                    self._read_vertices(line)
+        if self.traversal_stats is not None:
+            sizes['traversal_stats'] = structure_size(self.traversal_stats)
 
-                else:
-                    self._read_edge(line)
+        return memory_report(sizes, self.num_vertices, self.num_edges, deep, sample)
 
-    def _read_edge(self, text):
+    def read_file(self, text_file):
         """
-        Read the text and add the edge to the graph
-        Runtime: O(n) where n is the number of character in the text
+        Read the given file and add all the vertices and edges, return the read statistics
+        Runtime: O(n) where n is the number of character in the text file
         """
-        cost = 0
-        key = ''
-        from_vertex = ''
-        to_vertex = ''
-        get_from = False
-        get_to = False
+        reader = GraphReader()
 
-        for index in range(len(text)):
-            char = text[index]
+        for kind, value in reader.read(text_file):
+            if kind == 'header':
+                self.undirected = value == 'D'
 
-            if char == '(':
-                continue
+            elif kind == 'vertices':
+                self.add_vertices_from(value)
 
-            # Add the remaining key to the cost once the vertices have been found
-            elif char == ')' and get_from and get_to and key != '':
-                cost = int(key)
+            else:
+                reader.stats.rejected += len(self.add_edges_from(value).rejected)
 
-            elif char == ')' and not get_to and key != '':
-                to_vertex = key
-                break
+        return reader.stats
 
-            elif char == ',':
+    def save_snapshot(self, path):
+        """
+        Write the graph to a binary snapshot file, see snapshot.py for the layout
+        Runtime: O(V + E)
+        """
+        write_snapshot(self, path)
 
-                if not get_from:
-                    from_vertex = key
-                    get_from = True
-                    key = ''
+    @classmethod
+    def load_snapshot(cls, path, mmap=True):
+        """
+        Load a graph written by save_snapshot.
+        mmap=True maps the file and returns a read-only Snapshot graph whose arrays are views
+        over the file, so it opens in O(1) and pages are only read as traversals touch them.
+        It answers find_path_bfs, breadth_first_search_length, is_reachable, connected,
+        depth_first_search_iter and shortest_path from the file; other methods need mmap=False.
+        mmap=False reads the whole file and rebuilds a regular Graph.
+        """
+        snapshot = Snapshot(path, use_mmap=mmap)
 
-                elif not get_to:
-                    to_vertex = key
-                    get_to = True
-                    key = ''
+        if mmap:
+            return snapshot
 
-            else:
-                key += char
+        try:
+            return snapshot.to_graph(cls())
+        finally:
+            snapshot.close()
 
-        self.add_edge(from_vertex, to_vertex, cost)
+    def enable_stats(self, callback=None, keep=1000):
+        """
+        Count the vertices, edges, stack or heap size, visited map size and wall time of every
+        depth first search and shortest path search, and return the TraversalRecorder holding them
+        callback: function called with the TraversalStats of every finished search
+        """
+        self.traversal_stats = TraversalRecorder(callback, keep)
+        return self.traversal_stats
+
+    def disable_stats(self):
+        """Stop counting the searches"""
+        self.traversal_stats = None
 
-    def _read_vertices(self, text):
+    def dfs_events(self, start_vertex=None, method='dfs_events'):
         """
-        Read the text and add vertices
-        Runtime: O(n) where n is the number of character in the text
+        Walk the graph depth first with an explicit stack, generating the events
+        ('pre', key) when a vertex is first reached, ('post', key) once all of its
+        neighbors are done, and ('back', (from, to)) for every edge leading back to a
+        vertex still on the stack. On undirected graphs the edge back to the parent is skipped.
+        :param start_vertex: The string key of the vertex to start from, None to cover every vertex
+        :param method: Name the walk is recorded under when traversal stats are enabled,
+                       until the walk ends or the generator is closed
+        Runtime: O(V + E), each neighbor iterator is advanced once per edge
         """
-        curr_key = ''
+        if start_vertex is None:
+            roots = self.vertices_dict
+        elif start_vertex in self.vertices_dict:
+            roots = [start_vertex]
+        else:
+            return
 
-        for index in range(len(text) - 1):  # - 1 of the text length to ignore '\n' character
+        on_stack = {}  # key -> True while on the stack, False once finished
 
-            char = text[index]
+        stats = self.traversal_stats.start(method) if self.traversal_stats else None
 
-            if char == ',':
-                self.add_vertex(curr_key)
-                curr_key = ''
-            else:
-                curr_key += char
-                if index == len(text) - 2:
-                    self.add_vertex(curr_key)
+        try:
+            for root in roots:
+                if root in on_stack:
+                    continue
+
+                on_stack[root] = True
+                if stats is not None:
+                    stats.expand(self.vertices_dict[root].neighbors, 1)
+
+                yield 'pre', root
+
+                # (key, parent key, iterator over the neighbors left to look at)
+                stack = [(root, None, iter(self.vertices_dict[root].neighbors))]
+
+                while stack:
+                    key, parent, neighbors = stack[-1]
+
+                    for neighbor in neighbors:
+                        if neighbor not in on_stack:
+                            on_stack[neighbor] = True
+                            if stats is not None:
+                                stats.expand(self.vertices_dict[neighbor].neighbors, len(stack) + 1)
+
+                            yield 'pre', neighbor
+
+                            stack.append((neighbor, key, iter(self.vertices_dict[neighbor].neighbors)))
+                            break
+
+                        if on_stack[neighbor] and not (self.undirected and neighbor == parent):
+                            yield 'back', (key, neighbor)
+
+                    else:
+                        # Every neighbor is done, resume the vertex below
+                        stack.pop()
+                        on_stack[key] = False
+                        yield 'post', key
+        finally:
+            if stats is not None:
+                self.traversal_stats.finish(stats, len(on_stack))
 
     def depth_first_search(self, start_vertex, target):
         """
         :param start_vertex:
         :param target:
-        :return: Boolean value determine if there's a path between the two vertices
+        :return: Dictionary of every visited vertex key -> the vertex it was reached from,
+                 stopping once the target is reached, or False for bad input
         """
 
         if start_vertex not in self.vertices_dict or target not in self.vertices_dict:
             return False
 
         visit_dict = {}
+        path = []
 
-        self._dfs(self.vertices_dict[start_vertex], target, None, visit_dict)
-
-        return visit_dict
+        for event, key in self.dfs_events(start_vertex, 'depth_first_search'):
+            if event == 'pre':
+                visit_dict[key] = self.vertices_dict[path[-1]] if path else None
+                if key == target:
+                    break
 
-    def _dfs(self, vertex, target, parent, visit):
-        visit[vertex.data] = parent
+                path.append(key)
 
-        for neighbor in vertex.get_neighbors():
-            if neighbor not in visit:
-                if neighbor == target:
-                    visit[neighbor] = vertex
-                    return
+            elif event == 'post':
+                path.pop()
 
-                self._dfs(self.vertices_dict[neighbor], target, vertex, visit)
+        return visit_dict
 
     def depth_first_search_iter(self, start_vertex, target):
         """
         :param start_vertex: The string key of the starting vertex
         :param target: The string key of the target vertex as a end point
-        :return Boolean,
+        :return Boolean, list of the keys on the path
+        Runtime: O(V + E)
         """
 
-        if start_vertex not in self.vertices_dict:
+        # Can't find a path for a disjointed graph, no need to search
+        if not self.connected(start_vertex, target):
             return False, []
 
-        stack = []
-        stack.append(self.vertices_dict[start_vertex])
+        # The vertices on the stack are always the path from the start to the current vertex
+        path = []
+
+        for event, key in self.dfs_events(start_vertex, 'depth_first_search_iter'):
+            if event == 'pre':
+                path.append(key)
+                if key == target:
+                    return True, path
+
+            elif event == 'post':
+                path.pop()
+
+        return False, []
 
-        visited = {}
-        visited[start_vertex] = (self.vertices_dict[start_vertex], None)
+    def shortest_path(self, start_vertex, target, max_cost=None):
+        """
+        Find the cheapest path by the edge costs with Dijkstra's algorithm,
+        stopping as soon as every target is settled.
+        :param start_vertex: The string key of the starting vertex
+        :param target: The key of the target vertex, or a list or set of them; a vertex key
+                       always counts as one target, even a tuple or another iterable one
+        :param max_cost: Ignore paths that cost more than this, None for no budget
+        :return (list of the keys on the path, total cost), or ([], None) if the target
+                can't be reached; a dictionary of target -> (path, cost) for several targets
+        Runtime: O((V + E) log V)
+        """
+        single = self._is_single_target(target)
+        targets = [target] if single else list(target)
 
-        while len(stack) != 0:
+        distances, parents = self._dijkstra(start_vertex, set(targets), max_cost)
 
-            vertex = stack.pop()
+        results = {}
+        for key in targets:
+            if key not in distances:
+                results[key] = ([], None)
+                continue
 
-            if vertex.data == target:
-                path = []
-                key = target
-                while True:
-                    vert = visited[key]
-                    path.append(vert[0].data)
+            path = [key]
+            while parents[path[-1]] is not None:
+                path.append(parents[path[-1]])
+            path.reverse()
 
-                    if vert[1] is not None:
-                        key = vert[1].data
+            results[key] = (path, distances[key])
 
-                    else:
-                        break
-                path.reverse()
-                return True, path
+        return results[target] if single else results
 
-            for neighbor in vertex.get_neighbors():
-                if neighbor not in visited:
-                    visited[neighbor] = (self.vertices_dict[neighbor], vertex)
-                    stack.append(self.vertices_dict[vertex.data])
-                    stack.append(self.vertices_dict[neighbor])
+    def _is_single_target(self, target):
+        """Return True if target is one vertex key rather than a collection of them"""
+        try:
+            if target in self.vertices_dict:
+                return True
+        except TypeError:  # Unhashable, so a list or set of keys
+            return False
 
-                    break
+        # Unknown keys are still one target, unless they can only be a collection
+        return isinstance(target, str) or not hasattr(target, '__iter__')
 
-        return False, []
+    def _dijkstra(self, start_vertex, targets, max_cost):
+        """
+        Return the dictionaries of settled key -> cost and key -> parent key,
+        settling vertices until every target is reached or nothing is left within max_cost
+        """
+        distances = {}
+        parents = {}
+
+        if start_vertex not in self.vertices_dict:
+            return distances, parents
+
+        # Targets in other components can't be reached, stop without settling the whole component
+        remaining = set(key for key in targets if self.connected(start_vertex, key))
+
+        heap = IndexedHeap()
+        heap.push(start_vertex, 0)
+        parents[start_vertex] = None
+
+        stats = self.traversal_stats.start('shortest_path') if self.traversal_stats else None
+
+        while remaining and not heap.is_empty():
+            key, cost = heap.pop()
+            distances[key] = cost
+            remaining.discard(key)
+
+            if stats is not None:
+                stats.expand(self.vertices_dict[key].neighbors, len(heap) + 1)
+
+            for neighbor, weight in self.vertices_dict[key].neighbors.items():
+                if neighbor in distances:
+                    continue
+
+                if weight < 0:
+                    raise ValueError('Shortest paths need non-negative costs, got {} on ({}, {})'.format(
+                        weight, key, neighbor))
+
+                new_cost = cost + weight
+                if max_cost is not None and new_cost > max_cost:
+                    continue
+
+                if heap.push(neighbor, new_cost):
+                    parents[neighbor] = key
+
+        if stats is not None:
+            self.traversal_stats.finish(stats, len(parents))
+
+        return distances, parents
 
 
 if __name__ == "__main__":
@@ -294,3 +611,6 @@ if __name__ == "__main__":
     if found:
         print('Depth first search path: ' + ', '.join([x for x in path]))
 
+    path, cost = graph.shortest_path('1', '3')
+    if path:
+        print('Cheapest path: {} with cost {}'.format(', '.join(path), cost))
@@ -1,4 +1,7 @@
 from challenge_3 import Graph, Vertex
+from traversal_stats import instrument
+import os
+import tempfile
 import unittest
 
 class VertexTests(unittest.TestCase):
@@ -218,3 +221,183 @@ class GraphTests(unittest.TestCase):
         assert len(path) is 0
 
 
+
+    def test_dfs_events(self):
+        events = list(self.populated_graph.dfs_events('A'))
+
+        assert events == [('pre', 'A'), ('pre', 'B'), ('pre', 'C'), ('pre', 'D'), ('post', 'D'),
+                          ('pre', 'E'), ('post', 'E'), ('pre', 'F'), ('post', 'F'), ('post', 'C'),
+                          ('post', 'B'), ('post', 'A')]
+
+        # A cycle shows up as a back edge to a vertex still on the stack
+        self.populated_graph.add_edge("E", "A")
+        assert ('back', ('E', 'A')) in self.populated_graph.dfs_events('A')
+
+        # Without a start vertex every vertex is covered
+        self.populated_graph.add_vertex('O')
+        pre_order = [key for event, key in self.populated_graph.dfs_events() if event == 'pre']
+        assert sorted(pre_order) == ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'O']
+
+        assert list(self.populated_graph.dfs_events('R')) == []
+
+    def test_dfs_events_undirected(self):
+        graph = Graph(undirected=True)
+        graph.add_vertices_from(['A', 'B', 'C', 'D'])
+        graph.add_edges_from([('A', 'B', 0), ('B', 'C', 0), ('C', 'D', 0)])
+
+        # The edge back to the parent isn't a cycle
+        events = list(graph.dfs_events('A'))
+        assert not [event for event in events if event[0] == 'back']
+
+        graph.add_edge('D', 'B')
+        back_edges = [edge for event, edge in graph.dfs_events('A') if event == 'back']
+        assert back_edges == [('D', 'B')]
+
+    def test_deep_depth_first_search(self):
+        # Far deeper than the recursion limit
+        graph = Graph()
+        keys = [str(i) for i in range(20000)]
+        graph.add_vertices_from(keys)
+        graph.add_edges_from((keys[i], keys[i + 1], 0) for i in range(len(keys) - 1))
+
+        found, path = graph.depth_first_search_iter('0', '19999')
+        assert found is True
+        assert path == keys
+
+        visit = graph.depth_first_search('0', '19999')
+        assert visit['19999'].data == '19998'
+        assert visit['0'] is None
+
+    def test_shortest_path(self):
+        # A -> C -> E costs 7, cheaper than A -> B -> C -> E
+        path, cost = self.populated_graph.shortest_path('A', 'E')
+        assert path == ['A', 'C', 'E']
+        assert cost == 7
+
+        # Cheaper through more edges
+        self.populated_graph.add_edge("B", "F", 1)
+        path, cost = self.populated_graph.shortest_path('A', 'F')
+        assert path == ['A', 'B', 'F']
+        assert cost == 5
+
+        path, cost = self.populated_graph.shortest_path('A', 'A')
+        assert path == ['A'] and cost == 0
+
+        # Unreachable and bad input
+        assert self.populated_graph.shortest_path('A', 'G') == ([], None)
+        assert self.populated_graph.shortest_path('A', 'R') == ([], None)
+        assert self.populated_graph.shortest_path('R', 'A') == ([], None)
+
+    def test_shortest_path_targets_and_budget(self):
+        results = self.populated_graph.shortest_path('A', ['D', 'E', 'G'])
+        assert results['D'] == (['A', 'C', 'D'], 15)
+        assert results['E'] == (['A', 'C', 'E'], 7)
+        assert results['G'] == ([], None)
+
+        # Paths over the budget aren't found
+        assert self.populated_graph.shortest_path('A', 'D', max_cost=14) == ([], None)
+        assert self.populated_graph.shortest_path('A', 'D', max_cost=15) == (['A', 'C', 'D'], 15)
+
+        self.populated_graph.add_edge("E", "G", -1)
+        with self.assertRaises(ValueError):
+            self.populated_graph.shortest_path('A', 'G')
+
+    def test_shortest_path_other_keys(self):
+        # Keys of any hashable type are single targets, not collections to split
+        graph = Graph()
+        graph.add_vertices_from([1, 2, (3, 4), 'xy'])
+        graph.add_edges_from([(1, 2, 5), (2, (3, 4), 1), ((3, 4), 'xy', 2)])
+
+        assert graph.shortest_path(1, 2) == ([1, 2], 5)
+        assert graph.shortest_path(1, (3, 4)) == ([1, 2, (3, 4)], 6)
+        assert graph.shortest_path(1, 'xy') == ([1, 2, (3, 4), 'xy'], 8)
+        assert graph.shortest_path(1, 9) == ([], None)
+
+        # Collections of them still give one result per target
+        results = graph.shortest_path(1, [(3, 4), 2, 9])
+        assert results == {(3, 4): ([1, 2, (3, 4)], 6), 2: ([1, 2], 5), 9: ([], None)}
+        assert graph.shortest_path(1, {2}) == {2: ([1, 2], 5)}
+
+    def test_shortest_path_file(self):
+        graph = Graph(undirected=True)
+        graph.read_file('challenge_3_data.txt')
+
+        path, cost = graph.shortest_path('1', '3')
+        assert path == ['1', '2', '3']
+        assert cost == 10
+
+        path, cost = graph.shortest_path('4', '5')
+        assert path == ['4', '2', '5']
+        assert cost == 15
+
+    def test_traversal_stats(self):
+        seen = []
+
+        with instrument(self.populated_graph, callback=seen.append) as recorder:
+            # A, B, C, D and E are reached, the walk stops at E
+            assert self.populated_graph.depth_first_search_iter('A', 'E')[0]
+            stats = recorder.last()
+            assert stats.method == 'depth_first_search_iter'
+            assert stats.dequeued == 5
+            assert stats.edges_scanned == 7
+            assert stats.peak_frontier == 4
+            assert stats.visited == 5
+
+            # Dijkstra settles A, B, C and E, D and F are queued but never settled
+            self.populated_graph.shortest_path('A', 'E')
+            assert recorder.last().method == 'shortest_path'
+            assert recorder.last().dequeued == 4
+            assert recorder.last().visited == 6
+
+        assert self.populated_graph.traversal_stats is None
+        assert [stats.method for stats in seen] == ['depth_first_search_iter', 'shortest_path']
+
+    def test_connectivity(self):
+        # Direction is ignored, G is on its own
+        assert self.populated_graph.num_components == 2
+        assert self.populated_graph.connected('E', 'A')
+        assert not self.populated_graph.connected('A', 'G')
+        assert self.populated_graph.component_of('D') == self.populated_graph.component_of('B')
+        assert sorted(self.populated_graph.component_sizes().values()) == [1, 6]
+
+        assert self.populated_graph.depth_first_search_iter('A', 'G') == (False, [])
+        assert self.populated_graph.shortest_path('A', 'G') == ([], None)
+
+        # Removing a bridge splits a component
+        self.populated_graph.remove_edge('C', 'D')
+        assert not self.populated_graph.connected('A', 'D')
+        assert self.populated_graph.num_components == 3
+
+        self.populated_graph.add_edge('G', 'D')
+        self.populated_graph.add_vertices_from(['H'])
+        self.populated_graph.add_edges_from([('H', 'A')])
+        assert self.populated_graph.connected('D', 'G')
+        assert self.populated_graph.connected('H', 'F')
+        assert self.populated_graph.num_components == 2
+
+    def test_snapshot_queries(self):
+        self.populated_graph.add_edge("B", "F", 1)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'graph.snapshot')
+            self.populated_graph.save_snapshot(path)
+
+            # The mapped snapshot answers the same queries as the graph it was saved from
+            with Graph.load_snapshot(path) as snapshot:
+                for start, target in [('A', 'E'), ('A', 'F'), ('A', 'A'), ('A', 'G'), ('E', 'A'), ('A', 'R')]:
+                    assert snapshot.connected(start, target) == self.populated_graph.connected(start, target)
+                    assert (snapshot.depth_first_search_iter(start, target) ==
+                            self.populated_graph.depth_first_search_iter(start, target))
+                    assert snapshot.shortest_path(start, target) == self.populated_graph.shortest_path(start, target)
+
+                # Direction counts for paths but not for connectivity
+                assert snapshot.connected('E', 'A') and not snapshot.is_reachable('E', 'A')
+                assert snapshot.is_reachable('A', 'E')
+
+                assert snapshot.shortest_path('A', ['D', 'E', 'G']) == \
+                    self.populated_graph.shortest_path('A', ['D', 'E', 'G'])
+                assert snapshot.shortest_path('A', 'D', max_cost=14) == ([], None)
+
+                assert [x.data for x in snapshot.breadth_first_search_length('A', 2)] == ['D', 'E']
+                assert snapshot.breadth_first_search_length('A', 50) == []
+                assert snapshot.breadth_first_search_length('R', 1) is None
@@ -1,3 +1,17 @@
+import sys
+import threading
+from collections import OrderedDict
+from functools import update_wrapper
+
+# Separates the positional from the keyword arguments in a cache key
+_KWARGS_MARK = object()
+
+POLICIES = ('lru', 'lfu')
+
+# fib_many steps from one position to the next by adding when they are at most this far apart
+STEP_LIMIT = 64
+
+
 def fib(num):
     """
     :param num: Position of the fibonacci sequence
@@ -13,23 +27,209 @@ def fib(num):
     return fib(num - 1) + fib(num - 2)
 
 
-def memoize(func):
-    memo = {0: 0, 1: 1}
+class MemoCache(object):
+    """
+    Bounded cache of function results, evicting the least recently used (lru)
+    or the least frequently used (lfu) entry, ties going to the least recent.
+    Every operation holds a re-entrant lock, so threads can share one cache.
+    """
+
+    def __init__(self, maxsize=128, max_bytes=None, policy='lru'):
+        """
+        :param maxsize: Most results kept at once, None for no limit
+        :param max_bytes: Budget for the estimated size of the keys and results, None for no budget
+        :param policy: 'lru' or 'lfu'
+        """
+        if policy not in POLICIES:
+            raise ValueError('Unknown policy {!r}, expected one of {}'.format(policy, ', '.join(POLICIES)))
+
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.lock = threading.RLock()
+
+        self.entries = OrderedDict()  # key -> (value, size), least recently used first
+        self.counts = {}  # key -> number of uses, for lfu
+        self.buckets = {}  # number of uses -> OrderedDict of the keys used that often, least recent first
+        self.min_count = 0  # Fewest uses of any key, whose bucket holds the next lfu victim
+        self.bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __repr__(self):
+        """Return a string representation of this cache."""
+        return 'MemoCache({}, {} entries, {} bytes)'.format(self.policy, len(self.entries), self.bytes)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        """Return True if a result is cached for the key, without counting it as a use"""
+        with self.lock:
+            return key in self.entries
+
+    def get(self, key):
+        """
+        Return (True, value) if a result is cached for the key, or (False, None)
+        :runtime: O(1)
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return False, None
+
+            self.hits += 1
+            self._touch(key)
+            return True, entry[0]
+
+    def put(self, key, value):
+        """
+        Cache the value for the key, evicting entries to stay within maxsize and max_bytes.
+        Values bigger than the whole byte budget aren't kept.
+        :runtime: O(1)* amortized over the evictions
+        """
+        size = sys.getsizeof(key) + sys.getsizeof(value) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        with self.lock:
+            if key in self.entries:
+                # Another thread computed it meanwhile, keep the entry and its history
+                return
+
+            while self.entries and (
+                    (self.maxsize is not None and len(self.entries) >= self.maxsize) or
+                    (self.max_bytes is not None and self.bytes + size > self.max_bytes)):
+                self._evict()
+
+            if self.maxsize is not None and self.maxsize <= 0:
+                return
+
+            self.entries[key] = (value, size)
+            self.bytes += size
+
+            if self.policy == 'lfu':
+                self.counts[key] = 1
+                self.buckets.setdefault(1, OrderedDict())[key] = None
+                self.min_count = 1
+
+    def clear(self):
+        """Drop every entry and reset the statistics"""
+        with self.lock:
+            self.entries.clear()
+            self.counts.clear()
+            self.buckets.clear()
+            self.min_count = 0
+            self.bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Return a dictionary of the cache statistics"""
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self.entries),
+                'bytes': self.bytes,
+                'maxsize': self.maxsize,
+                'max_bytes': self.max_bytes,
+                'policy': self.policy,
+            }
+
+    def _touch(self, key):
+        """Record a use of the key"""
+        if self.policy == 'lru':
+            self.entries.move_to_end(key)
+            return
+
+        count = self.counts[key]
+        bucket = self.buckets[count]
+        del bucket[key]
+
+        if not bucket:
+            del self.buckets[count]
+            if self.min_count == count:
+                self.min_count = count + 1
+
+        self.counts[key] = count + 1
+        self.buckets.setdefault(count + 1, OrderedDict())[key] = None
+
+    def _evict(self):
+        """Drop the entry the policy picks"""
+        if self.policy == 'lru':
+            key = next(iter(self.entries))
+        else:
+            bucket = self.buckets[self.min_count]
+            key, _ = bucket.popitem(last=False)
+            if not bucket:
+                del self.buckets[self.min_count]
+            del self.counts[key]
+
+            # The next victim is in the smallest bucket left, found again once this one ran out
+            if self.buckets and self.min_count not in self.buckets:
+                self.min_count = min(self.buckets)
+
+        _, size = self.entries.pop(key)
+        self.bytes -= size
+        self.evictions += 1
+
+
+def memoize(func=None, maxsize=128, max_bytes=None, policy='lru', key=None):
+    """
+    Cache the results of a function by its arguments, as @memoize or @memoize(maxsize=...).
+    Decorating the definition makes the recursive calls of the function go through the
+    cache as well, since they look the name up when they run. Each level of such a recursion
+    takes two frames, the wrapper's and the function's, so a cold call can only go about half
+    of sys.getrecursionlimit() deep unless the function fills the cache bottom up like fib_memo.
+    The wrapper has cache_info() returning the statistics and cache_clear() emptying it.
+    :param maxsize: Most results kept at once, None for no limit
+    :param max_bytes: Budget for the estimated size of the keys and results, None for no budget
+    :param policy: 'lru' to evict the least recently used result, 'lfu' the least frequently used
+    :param key: Function building the cache key from the arguments, for instance to put the
+                number of edges of a graph argument in it so results of older graphs aren't served;
+                None to key on all the positional and keyword arguments, which must be hashable
+    :return: The wrapped function
+    """
+    def decorate(function):
+        cache = MemoCache(maxsize, max_bytes, policy)
+
+        def helper(*args, **kwargs):
+            if key is not None:
+                cache_key = key(*args, **kwargs)
+            elif kwargs:
+                cache_key = args + (_KWARGS_MARK,) + tuple(sorted(kwargs.items()))
+            else:
+                cache_key = args
+
+            hit, value = cache.get(cache_key)
+            if hit:
+                return value
 
-    def helper(x):
-        if x not in memo:
-            memo[x] = func(x)
+            # Computed without holding the lock, so recursive calls and other threads aren't blocked
+            value = function(*args, **kwargs)
+            cache.put(cache_key, value)
+            return value
 
-        return memo[x]
+        helper.cache = cache
+        helper.cache_info = cache.stats
+        helper.cache_clear = cache.clear
 
-    return helper
+        return update_wrapper(helper, function)
 
+    return decorate(func) if func is not None else decorate
 
 
+@memoize(maxsize=None)
 def fib_memo(num):
     """
-    :param num:
-    :return:
+    :param num: Position of the fibonacci sequence
+    :return: An int
+    :runtime: O(n), every position is computed once
     """
     if num == 0:
         return 0
@@ -37,8 +237,109 @@ def fib_memo(num):
     elif num == 1:
         return 1
 
+    # Fill the cache up from the highest position it already holds, so each of these calls
+    # finds both of its predecessors cached and no call recurses more than one level
+    start = num - 1
+    while start > 1 and (start,) not in fib_memo.cache:
+        start -= 1
+
+    for position in range(start + 1, num):
+        fib_memo(position)
+
     return fib_memo(num - 1) + fib_memo(num - 2)
 
 
-fib_memo = memoize(fib_memo())
-print(fib_memo(500))
+def fib_doubling(num):
+    """
+    :param num: Position of the fibonacci sequence, 0 or more
+    :return: An int
+    :runtime: O(log n) steps of fast doubling, each a few multiplications of numbers up to n bits
+    """
+    return _fib_pair(num)[0]
+
+
+def fib_mod(num, modulus):
+    """
+    :param num: Position of the fibonacci sequence, 0 or more, as big as needed
+    :param modulus: Positive int the result is taken modulo
+    :return: The fibonacci number at num modulo modulus
+    :runtime: O(log n) steps on numbers below modulus
+    """
+    if modulus < 1:
+        raise ValueError('Modulus must be positive, got {}'.format(modulus))
+
+    return _fib_pair(num, modulus)[0]
+
+
+def fib_many(nums):
+    """
+    Compute the fibonacci numbers of many positions, sharing work between them:
+    positions are visited in sorted order, close ones are reached from the previous one by
+    adding, and far ones by shifting the previous pair with the pair of the gap
+    :param nums: Iterable of positions, 0 or more
+    :return: List of the fibonacci numbers, in the order of nums
+    :runtime: O(k log k) to sort, plus O(log d) doubling steps for every gap d
+    """
+    nums = list(nums)
+    results = {}
+
+    position, current, following = 0, 0, 1  # F(position), F(position + 1)
+
+    for num in sorted(set(nums)):
+        if num < 0:
+            raise ValueError('Position must be 0 or more, got {}'.format(num))
+
+        gap = num - position
+
+        if gap <= STEP_LIMIT:
+            for _ in range(gap):
+                current, following = following, current + following
+
+        elif gap < position:
+            # F(p + d) = F(p + 1)F(d) + F(p)F(d - 1) and F(p + d + 1) = F(p + 1)F(d + 1) + F(p)F(d),
+            # the small F(d) make these cheaper than doubling all the way up to num
+            gap_current, gap_following = _fib_pair(gap)
+            current, following = (following * gap_current + current * (gap_following - gap_current),
+                                  following * gap_following + current * gap_current)
+
+        else:
+            current, following = _fib_pair(num)
+
+        position = num
+        results[num] = current
+
+    return [results[num] for num in nums]
+
+
+def _fib_pair(num, modulus=None):
+    """
+    Return (F(num), F(num + 1)), modulo modulus if given, by fast doubling from the
+    highest bit of num down: with a = F(k) and b = F(k + 1),
+    F(2k) = a(2b - a) and F(2k + 1) = a^2 + b^2, plus one step forward for every set bit
+    """
+    if num < 0:
+        raise ValueError('Position must be 0 or more, got {}'.format(num))
+
+    current, following = 0, 1
+
+    for bit in bin(num)[2:]:
+        doubled = current * (2 * following - current)
+        doubled_next = current * current + following * following
+
+        if bit == '1':
+            current, following = doubled_next, doubled + doubled_next
+        else:
+            current, following = doubled, doubled_next
+
+        if modulus is not None:
+            current, following = current % modulus, following % modulus
+
+    if modulus is not None:
+        current, following = current % modulus, following % modulus
+
+    return current, following
+
+
+if __name__ == "__main__":
+    print(fib_memo(500))
+    print(fib_memo.cache_info())
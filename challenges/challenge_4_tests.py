@@ -0,0 +1,191 @@
+from challenge_4 import MemoCache, fib, fib_doubling, fib_many, fib_memo, fib_mod, memoize
+import math
+import sys
+import threading
+import unittest
+
+
+class FibTests(unittest.TestCase):
+
+    def test_fib(self):
+        assert [fib(num) for num in range(10)] == [0, 1, 1, 2, 3, 5, 8, 13, 21, 34]
+
+    def test_fib_memo(self):
+        fib_memo.cache_clear()
+        assert fib_memo(100) == 354224848179261915075
+
+        # Every position was computed once, filled in from the bottom so both
+        # predecessors of fib_memo(3) and up were already cached
+        info = fib_memo.cache_info()
+        assert info['misses'] == 101
+        assert info['hits'] == 196
+
+        assert fib_memo(100) == 354224848179261915075
+        assert fib_memo.cache_info()['hits'] == 197
+        assert fib_memo.__name__ == 'fib_memo'
+
+        # Cold calls past half the recursion limit don't overflow the stack
+        fib_memo.cache_clear()
+        num = sys.getrecursionlimit() * 2
+        assert fib_memo(num) == fib_doubling(num)
+        assert fib_memo.cache_info()['misses'] == num + 1
+
+        # Only the positions above the highest cached one are computed
+        assert fib_memo(num + 10) == fib_doubling(num + 10)
+        assert fib_memo.cache_info()['misses'] == num + 11
+
+    def test_fib_doubling(self):
+        expected = [0, 1]
+        while len(expected) < 1000:
+            expected.append(expected[-1] + expected[-2])
+
+        assert [fib_doubling(num) for num in range(1000)] == expected
+
+        # Far past the positions fib_memo is practical for
+        big = fib_doubling(10 ** 5)
+        assert abs(big.bit_length() - 10 ** 5 * math.log2((1 + 5 ** 0.5) / 2)) < 2
+        assert fib_doubling(10 ** 5 + 1) - big == fib_doubling(10 ** 5 - 1)
+
+        with self.assertRaises(ValueError):
+            fib_doubling(-1)
+
+    def test_fib_mod(self):
+        for modulus in [1, 2, 10, 1000000007]:
+            assert [fib_mod(num, modulus) for num in range(200)] == [fib_doubling(num) % modulus for num in range(200)]
+
+        # The last digits repeat every 60 positions (Pisano period)
+        assert fib_mod(10 ** 100, 10) == fib_mod(10 ** 100 % 60, 10)
+
+        with self.assertRaises(ValueError):
+            fib_mod(5, 0)
+
+    def test_fib_many(self):
+        nums = [500, 3, 3, 0, 10000, 10010, 70, 9000, 1, 20000]
+        assert fib_many(nums) == [fib_doubling(num) for num in nums]
+        assert fib_many([]) == []
+
+        with self.assertRaises(ValueError):
+            fib_many([4, -2])
+
+
+class MemoizeTests(unittest.TestCase):
+
+    def test_arguments(self):
+        calls = []
+
+        @memoize
+        def add(a, b=0, *, scale=1):
+            calls.append((a, b, scale))
+            return (a + b) * scale
+
+        assert add(1, 2) == 3
+        assert add(1, 2) == 3
+        assert add(1, b=2) == 3
+        assert add(1, 2, scale=3) == 9
+        assert add(1, 2, scale=3) == 9
+        assert add(2, 1) == 3
+
+        # Keyword arguments are keyed apart from the positional ones, in any order
+        assert calls == [(1, 2, 1), (1, 2, 1), (1, 2, 3), (2, 1, 1)]
+
+        with self.assertRaises(TypeError):
+            add([1], 2)
+
+    def test_lru(self):
+        @memoize(maxsize=2)
+        def square(x):
+            return x * x
+
+        square(1)
+        square(2)
+        square(1)  # 2 is now the least recently used
+        square(3)
+
+        info = square.cache_info()
+        assert info['evictions'] == 1 and info['entries'] == 2
+        assert (1,) in square.cache.entries and (2,) not in square.cache.entries
+
+        square.cache_clear()
+        assert square.cache_info()['entries'] == 0 and square.cache_info()['hits'] == 0
+
+    def test_lfu(self):
+        cache = MemoCache(maxsize=3, policy='lfu')
+        for key in 'abc':
+            cache.put(key, key.upper())
+
+        cache.get('a')
+        cache.get('a')
+        cache.get('c')
+
+        # b was used least, then c, even though a is the least recently added
+        cache.put('d', 'D')
+        assert sorted(cache.entries) == ['a', 'c', 'd']
+        cache.put('e', 'E')
+        assert sorted(cache.entries) == ['a', 'c', 'e']
+
+        assert cache.get('a') == (True, 'A')
+        assert cache.get('b') == (False, None)
+
+        with self.assertRaises(ValueError):
+            MemoCache(policy='fifo')
+
+    def test_max_bytes(self):
+        @memoize(maxsize=None, max_bytes=600)
+        def text(size):
+            return 'x' * size
+
+        for size in range(10):
+            text(size * 10)
+
+        info = text.cache_info()
+        assert 0 < info['bytes'] <= 600
+        assert info['evictions'] > 0
+
+        # Too big to ever fit
+        text(1000)
+        assert text.cache_info()['entries'] == info['entries']
+
+    def test_key_function(self):
+        calls = []
+
+        class Graph(object):
+            def __init__(self):
+                self.num_edges = 0
+
+        @memoize(key=lambda graph, vertex: (id(graph), graph.num_edges, vertex))
+        def degree(graph, vertex):
+            calls.append(vertex)
+            return graph.num_edges
+
+        graph = Graph()
+        degree(graph, 'A')
+        degree(graph, 'A')
+        graph.num_edges += 1
+        assert degree(graph, 'A') == 1
+        assert calls == ['A', 'A']
+
+    def test_threads(self):
+        @memoize(maxsize=50, policy='lfu')
+        def double(x):
+            return 2 * x
+
+        errors = []
+
+        def work(offset):
+            try:
+                for num in range(2000):
+                    value = (num * 7 + offset) % 80
+                    assert double(value) == 2 * value
+            except AssertionError as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=work, args=(offset,)) for offset in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        info = double.cache_info()
+        assert not errors
+        assert info['hits'] + info['misses'] == 8000
+        assert info['entries'] <= 50
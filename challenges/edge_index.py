@@ -0,0 +1,56 @@
+class EdgeIndex(object):
+    """
+    Insertion ordered index of the edges of a graph, keyed by (from, to).
+    Iterating yields (from, to, cost) tuples, so it can stand in for a list of
+    edges while lookups, inserts and removals stay O(1).
+    """
+
+    def __init__(self):
+        """Initialize an empty index"""
+        self.costs = {}  # (from, to) -> cost, in insertion order
+
+    def __repr__(self):
+        """Return a string representation of this index."""
+        return 'EdgeIndex({!r})'.format(list(self))
+
+    def __len__(self):
+        return len(self.costs)
+
+    def __iter__(self):
+        """Generate the (from, to, cost) edges in the order they were added"""
+        return ((from_vert, to_vert, cost) for (from_vert, to_vert), cost in self.costs.items())
+
+    def __contains__(self, edge):
+        """
+        Return True if the given (from, to) pair or (from, to, cost) edge is indexed
+        Runtime: O(1)
+        """
+        if len(edge) == 2:
+            return edge in self.costs
+
+        from_vert, to_vert, cost = edge
+        return (from_vert, to_vert) in self.costs and self.costs[(from_vert, to_vert)] == cost
+
+    def add(self, from_vert, to_vert, cost=0):
+        """
+        Index the edge, keeping its position if it is already there
+        Runtime: O(1)
+        """
+        self.costs[(from_vert, to_vert)] = cost
+
+    def get(self, from_vert, to_vert):
+        """
+        Return the cost of the edge, or None if it isn't indexed
+        Runtime: O(1)
+        """
+        return self.costs.get((from_vert, to_vert))
+
+    def remove(self, from_vert, to_vert):
+        """
+        Remove the edge and return its cost, or raise ValueError if it isn't indexed
+        Runtime: O(1)
+        """
+        if (from_vert, to_vert) not in self.costs:
+            raise ValueError('Edge not found: ({}, {})'.format(from_vert, to_vert))
+
+        return self.costs.pop((from_vert, to_vert))
@@ -0,0 +1,127 @@
+import argparse
+import json
+import socket
+
+"""
+Client for the graph query server, see graph_server.py for the protocol
+"""
+
+
+class GraphClient(object):
+
+    # Most requests pipelined before reading their answers
+    WINDOW = 1000
+
+    def __init__(self, host='127.0.0.1', port=8022, unix_path=None, timeout=None):
+        """Connect to a graph server on the Unix socket path if given, otherwise on the TCP host and port"""
+        if unix_path is not None:
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.socket.settimeout(timeout)
+            self.socket.connect(unix_path)
+        else:
+            self.socket = socket.create_connection((host, port), timeout)
+
+        self.file = self.socket.makefile('rwb')
+        self.next_id = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Close the connection"""
+        self.file.close()
+        self.socket.close()
+
+    def request(self, op, **params):
+        """
+        Send one request and return its result, or raise ValueError with the error of the server
+        """
+        return self.pipeline([dict(params, op=op)])[0]
+
+    def pipeline(self, requests):
+        """
+        Send the requests, given as dictionaries with an 'op' key, WINDOW at a time without
+        waiting for the answers, and return their results in the same order.
+        Raise ValueError on the first error of the server.
+        """
+        requests = list(requests)
+        results = []
+
+        # Bounded windows keep both ends from blocking on full socket buffers
+        for start in range(0, len(requests), self.WINDOW):
+            results.extend(self._send_window(requests[start:start + self.WINDOW]))
+
+        return results
+
+    def _send_window(self, requests):
+        ids = []
+
+        for request in requests:
+            self.next_id += 1
+            ids.append(self.next_id)
+            self.file.write((json.dumps(dict(request, id=self.next_id)) + '\n').encode('utf-8'))
+
+        self.file.flush()
+
+        responses = []
+
+        # Read every answer before raising, so the next requests line up with their answers
+        for request_id in ids:
+            line = self.file.readline()
+            if not line:
+                raise ConnectionError('Server closed the connection')
+
+            response = json.loads(line)
+            if response.get('id') != request_id:
+                raise ValueError('Answer out of order: expected id {}, got {}'.format(request_id, response.get('id')))
+
+            responses.append(response)
+
+        for response in responses:
+            if not response['ok']:
+                raise ValueError(response['error'])
+
+        return [response['result'] for response in responses]
+
+    def path(self, from_vert, to_vert):
+        """Return the keys on a shortest path between the two vertices, or None"""
+        return self.request('path', **{'from': from_vert, 'to': to_vert})
+
+    def k_hop(self, vertex, length):
+        """Return the keys of the vertices exactly length edges away from the vertex"""
+        return self.request('k-hop', vertex=vertex, length=length)
+
+    def connected(self, from_vert, to_vert):
+        """Return True if the two vertices are connected"""
+        return self.request('connected', **{'from': from_vert, 'to': to_vert})
+
+    def stats(self):
+        """Return a dictionary of statistics about the graph and the server"""
+        return self.request('stats')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Ask a running graph server for a shortest path')
+    parser.add_argument('from_vertex')
+    parser.add_argument('to_vertex')
+    parser.add_argument('--host', default='127.0.0.1', help='TCP host of the server')
+    parser.add_argument('--port', type=int, default=8022, help='TCP port of the server')
+    parser.add_argument('--unix', dest='unix_path', help='Unix socket of the server instead of TCP')
+    args = parser.parse_args(argv)
+
+    with GraphClient(args.host, args.port, args.unix_path) as client:
+        path = client.path(args.from_vertex, args.to_vertex)
+
+    if path is None:
+        print('No path from vertex {} to vertex {}'.format(args.from_vertex, args.to_vertex))
+        return
+
+    print('Vertices in shortest path: ' + ', '.join(path))
+    print('Number of edges in shortest path: {}'.format(len(path) - 1))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import time
+
+
+class ReadStats(object):
+
+    def __init__(self):
+        """Initialize the counters of a graph file read"""
+        self.lines = 0
+        self.vertices = 0
+        self.edges = 0
+        self.rejected = 0  # Edges the graph refused to add
+        self.seconds = 0.0
+
+    def __str__(self):
+        return 'Read {} lines ({} vertices, {} edges, {} rejected) in {:.3f}s, {:.0f} lines/sec'.format(
+            self.lines, self.vertices, self.edges, self.rejected, self.seconds, self.lines_per_second())
+
+    def lines_per_second(self):
+        """Return the read throughput"""
+        return self.lines / self.seconds if self.seconds > 0 else 0.0
+
+
+class GraphReader(object):
+    """
+    Streaming parser for the graph text format:
+        D or G          (header line)
+        1,2,3,4,5       (vertex line)
+        (1,2)           (edge line, optionally with a cost: (1,2,4))
+    The file is read in large chunks that are split into lines in bulk,
+    and edges are handed out in bounded batches so memory stays constant.
+    """
+
+    def __init__(self, chunk_size=1 << 20, batch_size=10000):
+        """
+        chunk_size: number of characters read from the file at a time
+        batch_size: most edges handed out in one batch
+        """
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self.stats = ReadStats()
+
+    def read(self, text_file):
+        """
+        Generate the contents of the given file in order, as
+        ('header', 'D' or 'G'), ('vertices', [key, ...]) and ('edges', [(from, to, cost), ...])
+        Runtime: O(n) where n is the number of character in the text file
+        """
+        self.stats = ReadStats()
+        start = time.perf_counter()
+        batch = []
+
+        with open(text_file, 'r') as file:
+            for line in self._lines(file):
+                self.stats.lines += 1
+
+                if not line:
+                    continue
+
+                elif line[0] == '(':
+                    batch.append(self._parse_edge(line))
+
+                    if len(batch) >= self.batch_size:
+                        self.stats.edges += len(batch)
+                        yield 'edges', batch
+                        batch = []
+
+                    continue
+
+                # Flush pending edges so they stay ordered with the lines around them
+                if batch:
+                    self.stats.edges += len(batch)
+                    yield 'edges', batch
+                    batch = []
+
+                if len(line) == 1:
+                    yield 'header', line
+
+                else:
+                    keys = [key.strip() for key in line.split(',')]
+                    self.stats.vertices += len(keys)
+                    yield 'vertices', keys
+
+        if batch:
+            self.stats.edges += len(batch)
+            yield 'edges', batch
+
+        self.stats.seconds = time.perf_counter() - start
+
+    def _lines(self, file):
+        """
+        Generate the stripped lines of the file, splitting whole chunks at once
+        Runtime: O(n) where n is the number of character in the file
+        """
+        pieces = []  # Pieces of a line that spans chunks
+
+        while True:
+            chunk = file.read(self.chunk_size)
+            if not chunk:
+                break
+
+            if '\n' not in chunk:
+                pieces.append(chunk)
+                continue
+
+            lines = chunk.split('\n')
+            if pieces:
+                pieces.append(lines[0])
+                lines[0] = ''.join(pieces)
+                pieces = []
+
+            pieces.append(lines.pop())  # The last line may continue in the next chunk
+
+            for line in lines:
+                yield line.strip()
+
+        remainder = ''.join(pieces).strip()
+        if remainder:
+            yield remainder
+
+    @staticmethod
+    def _parse_edge(line):
+        """
+        Return the (from, to, cost) tuple of an edge line such as (1,2) or (1,2,4)
+        Runtime: O(n) where n is the number of character in the line
+        """
+        end = line.find(')')
+        parts = line[1:end if end != -1 else len(line)].split(',')
+
+        cost = parts[2].strip() if len(parts) > 2 else ''
+
+        return parts[0].strip(), parts[1].strip() if len(parts) > 1 else '', int(cost) if cost else 0
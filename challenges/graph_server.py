@@ -0,0 +1,222 @@
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from challenge_2 import Graph
+
+"""
+Graph query server
+
+Loads a graph once and answers queries over TCP or a Unix socket, one JSON object per line.
+Clients may pipeline: send any number of requests without waiting, the answers come back
+in the same order, each carrying the id of its request. Path and k-hop queries run on a
+pool of threads, so a long search doesn't hold up the other clients.
+
+    -> {"id": 1, "op": "path", "from": "1", "to": "5"}
+    <- {"id": 1, "ok": true, "result": ["1", "2", "5"]}
+    -> {"id": 2, "op": "k-hop", "vertex": "1", "length": 2}
+    <- {"id": 2, "ok": true, "result": ["3", "5"]}
+    -> {"id": 3, "op": "connected", "from": "1", "to": "6"}
+    <- {"id": 3, "ok": true, "result": false}
+    -> {"id": 4, "op": "stats"}
+    <- {"id": 4, "ok": true, "result": {"vertices": 5, "edges": 6, ...}}
+    -> {"id": 5, "op": "fly"}
+    <- {"id": 5, "ok": false, "error": "Unknown op: fly"}
+"""
+
+# Longest request line accepted, in bytes
+MAX_LINE = 1 << 20
+
+# Largest k-hop length accepted
+MAX_HOPS = 1 << 20
+
+# Ops answered on the worker threads instead of the event loop, their runtime grows with the graph
+SEARCH_OPS = ('path', 'k-hop')
+
+
+class GraphServer(object):
+
+    def __init__(self, graph, workers=4):
+        """
+        Initialize a server answering queries about the given graph
+        workers: threads running the path and k-hop searches
+        """
+        self.graph = graph
+        self.executor = ThreadPoolExecutor(workers)
+        self.started = time.monotonic()
+        self.requests = 0  # Requests answered so far
+        self.clients = 0  # Clients connected right now
+
+        self.handlers = {
+            'path': self._path,
+            'k-hop': self._k_hop,
+            'connected': self._connected,
+            'stats': self._stats,
+        }
+
+    def handle_request(self, request):
+        """
+        Return the response to a decoded request, errors included
+        Runtime: the runtime of the query
+        """
+        self.requests += 1
+        return self._answer(request)
+
+    def handle_line(self, line):
+        """Return the encoded response line to an encoded request line"""
+        request = self._decode(line)
+        self.requests += 1
+        return self._encode(self._answer(request))
+
+    async def handle_line_async(self, line):
+        """
+        Return the encoded response line to an encoded request line,
+        running searches on the worker threads so the event loop stays free
+        """
+        request = self._decode(line)
+        self.requests += 1
+
+        if isinstance(request, dict) and request.get('op') in SEARCH_OPS:
+            response = await asyncio.get_running_loop().run_in_executor(self.executor, self._answer, request)
+        else:
+            response = self._answer(request)
+
+        return self._encode(response)
+
+    def close(self):
+        """Stop the worker threads once the searches they are running are done"""
+        self.executor.shutdown(wait=False)
+
+    def _decode(self, line):
+        """Return the decoded request line, or None if it isn't JSON"""
+        try:
+            return json.loads(line)
+        except ValueError:
+            return None
+
+    def _encode(self, response):
+        return (json.dumps(response) + '\n').encode('utf-8')
+
+    def _answer(self, request):
+        """Return the response to a decoded request without counting it"""
+        if not isinstance(request, dict):
+            return {'id': None, 'ok': False, 'error': 'Requests must be JSON objects'}
+
+        response = {'id': request.get('id')}
+        op = request.get('op')
+        handler = self.handlers.get(op) if isinstance(op, str) else None
+
+        if handler is None:
+            response.update(ok=False, error='Unknown op: {}'.format(op))
+            return response
+
+        try:
+            response.update(ok=True, result=handler(request))
+        except (KeyError, TypeError, ValueError) as error:
+            response.update(ok=False, error='Bad {} request: {!r}'.format(op, error))
+
+        return response
+
+    async def serve_client(self, reader, writer):
+        """Answer the requests of one client in order until it disconnects"""
+        self.clients += 1
+
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    break  # Line over the limit, the stream can't be resynchronized
+
+                if not line:
+                    break
+
+                if line.strip():
+                    writer.write(await self.handle_line_async(line))
+
+                # Returns at once unless the client has fallen behind reading its answers
+                await writer.drain()
+
+        except ConnectionError:
+            pass
+
+        finally:
+            self.clients -= 1
+            writer.close()
+
+    async def start(self, host='127.0.0.1', port=0, unix_path=None):
+        """
+        Start listening on the Unix socket path if given, otherwise on the TCP host and port,
+        and return the asyncio server
+        """
+        if unix_path is not None:
+            return await asyncio.start_unix_server(self.serve_client, unix_path, limit=MAX_LINE)
+
+        return await asyncio.start_server(self.serve_client, host, port, limit=MAX_LINE)
+
+    def _path(self, request):
+        return self.graph.path_keys(request['from'], request['to'])
+
+    def _k_hop(self, request):
+        length = request['length']
+        if not isinstance(length, int) or isinstance(length, bool) or not 0 <= length <= MAX_HOPS:
+            raise ValueError('length must be an integer from 0 to {}'.format(MAX_HOPS))
+
+        # No vertex is further away than the number of vertices, the answer is the same
+        length = min(length, self.graph.num_vertices)
+
+        vertices = self.graph.breadth_first_search_length(request['vertex'], length)
+        return [x.data for x in vertices] if vertices is not None else None
+
+    def _connected(self, request):
+        return self.graph.connected(request['from'], request['to'])
+
+    def _stats(self, request):
+        return {
+            'vertices': self.graph.num_vertices,
+            'edges': self.graph.num_edges,
+            'undirected': self.graph.undirected,
+            'components': self.graph.num_components,
+            'requests': self.requests,
+            'clients': self.clients,
+            'uptime': time.monotonic() - self.started,
+        }
+
+
+async def serve(graph, host='127.0.0.1', port=0, unix_path=None):
+    """Serve queries about the graph until cancelled"""
+    graph_server = GraphServer(graph)
+    server = await graph_server.start(host, port, unix_path)
+
+    for sock in server.sockets:
+        print('Serving on {}'.format(sock.getsockname()))
+
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        graph_server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load a graph file once and answer queries about it over a socket')
+    parser.add_argument('filename', help='graph file to load')
+    parser.add_argument('--host', default='127.0.0.1', help='TCP host to listen on')
+    parser.add_argument('--port', type=int, default=8022, help='TCP port to listen on')
+    parser.add_argument('--unix', dest='unix_path', help='listen on this Unix socket instead of TCP')
+    args = parser.parse_args(argv)
+
+    graph = Graph()
+    stats = graph.read_file(args.filename)
+    print(stats)
+
+    try:
+        asyncio.run(serve(graph, args.host, args.port, args.unix_path))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
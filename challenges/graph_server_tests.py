@@ -0,0 +1,150 @@
+from challenge_2 import Graph
+from graph_client import GraphClient
+from graph_server import GraphServer
+import asyncio
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+
+class GraphServerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = Graph()
+        self.graph.read_file('graph_data.txt')
+        self.graph.add_vertex('6')
+
+        self.server = GraphServer(self.graph)
+        self.addCleanup(self.server.close)
+
+        # Run the event loop of the server on a thread of its own
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever)
+        self.thread.start()
+        self.addCleanup(self.stop_loop)
+
+    def stop_loop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+    def start(self, **kwargs):
+        """Start the server on the background loop and return the asyncio server"""
+        listener = asyncio.run_coroutine_threadsafe(self.server.start(**kwargs), self.loop).result()
+        self.addCleanup(lambda: asyncio.run_coroutine_threadsafe(self._stop(listener), self.loop).result())
+        return listener
+
+    async def _stop(self, listener):
+        listener.close()
+        await listener.wait_closed()
+
+        # Let the handlers see their clients hang up
+        for _ in range(100):
+            if not self.server.clients:
+                break
+            await asyncio.sleep(0.01)
+
+    def test_handle_request(self):
+        response = self.server.handle_request({'id': 7, 'op': 'path', 'from': '1', 'to': '5'})
+        assert response == {'id': 7, 'ok': True, 'result': ['1', '2', '5']}
+
+        response = self.server.handle_request({'id': 8, 'op': 'k-hop', 'vertex': '1', 'length': 2})
+        assert sorted(response['result']) == ['3', '5']
+
+        assert self.server.handle_request({'op': 'connected', 'from': '1', 'to': '6'})['result'] is False
+        assert self.server.handle_request({'op': 'path', 'from': '1', 'to': '6'})['result'] is None
+        assert self.server.handle_request({'op': 'path', 'from': '1', 'to': '9'})['result'] is None
+
+        stats = self.server.handle_request({'op': 'stats'})['result']
+        assert stats['vertices'] == 6
+        assert stats['components'] == 2
+        assert stats['requests'] == 6
+
+        # Test bad input
+        assert self.server.handle_request({'id': 9, 'op': 'fly'}) == {'id': 9, 'ok': False, 'error': 'Unknown op: fly'}
+        assert self.server.handle_request({'op': 'path', 'from': '1'})['ok'] is False
+        assert self.server.handle_request(['path'])['ok'] is False
+        assert b'"ok": false' in self.server.handle_line(b'{not json\n')
+
+    def test_k_hop_length(self):
+        for length in [-1, 10 ** 7, '2', 2.5, True, None]:
+            response = self.server.handle_request({'op': 'k-hop', 'vertex': '1', 'length': length})
+            assert response['ok'] is False, length
+
+        # Lengths past the number of vertices are capped, nothing is that far away
+        assert self.server.handle_request({'op': 'k-hop', 'vertex': '1', 'length': 10 ** 6})['result'] == []
+        assert self.server.handle_request({'op': 'k-hop', 'vertex': '1', 'length': 0})['result'] == []
+
+    def test_search_doesnt_block_other_clients(self):
+        listener = self.start(host='127.0.0.1', port=0)
+        port = listener.sockets[0].getsockname()[1]
+
+        # A search that runs until the test lets it finish
+        release = threading.Event()
+        search = self.graph.breadth_first_search_length
+
+        def slow_search(vertex, length):
+            release.wait(10)
+            return search(vertex, length)
+
+        self.graph.breadth_first_search_length = slow_search
+
+        with socket.create_connection(('127.0.0.1', port)) as slow, GraphClient(port=port) as fast:
+            slow.sendall(b'{"id": 1, "op": "k-hop", "vertex": "1", "length": 2}\n')
+
+            # Answered while the search is still running
+            assert fast.stats()['clients'] == 2
+            assert fast.path('1', '5') == ['1', '2', '5']
+
+            release.set()
+            answer = slow.makefile('rb').readline()
+            assert b'"ok": true' in answer and b'"3"' in answer
+
+    def test_tcp(self):
+        listener = self.start(host='127.0.0.1', port=0)
+        port = listener.sockets[0].getsockname()[1]
+
+        with GraphClient(port=port) as client:
+            assert client.path('1', '5') == ['1', '2', '5']
+            assert client.connected('1', '6') is False
+            assert client.stats()['edges'] == 6
+
+            with self.assertRaises(ValueError):
+                client.request('fly')
+
+            with self.assertRaises(ValueError):
+                client.pipeline([{'op': 'fly'}, {'op': 'stats'}])
+
+            # The connection is still usable after an error
+            assert sorted(client.k_hop('1', 2)) == ['3', '5']
+
+    def test_pipelining_and_concurrent_clients(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(os.rmdir, directory)
+        path = os.path.join(directory, 'graph.sock')
+        self.addCleanup(lambda: os.path.exists(path) and os.remove(path))
+
+        self.start(unix_path=path)
+
+        requests = [{'op': 'path', 'from': '1', 'to': key} for key in ['2', '3', '4', '5', '6']] * 100
+
+        with GraphClient(unix_path=path) as first, GraphClient(unix_path=path) as second:
+            assert second.stats()['vertices'] == 6
+            assert first.stats()['clients'] == 2
+
+            results = first.pipeline(requests)
+            assert len(results) == 500
+            assert results[:5] == [['1', '2'], ['1', '2', '3'], ['1', '4'], ['1', '2', '5'], None]
+
+            assert second.path('3', '4') == ['3', '2', '4']
+
+        # Answers come back in order on a raw socket too
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as raw:
+            raw.connect(path)
+            raw.sendall(b'{"id": 1, "op": "stats"}\n\n{"id": 2, "op": "connected", "from": "1", "to": "3"}\n')
+            file = raw.makefile('rb')
+            assert b'"id": 1' in file.readline()
+            assert file.readline() == b'{"id": 2, "ok": true, "result": true}\n'
+            file.close()
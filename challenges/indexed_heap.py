@@ -0,0 +1,121 @@
+class IndexedHeap(object):
+    """
+    Binary min heap of items keyed by priority, with a position map
+    so the priority of an item already in the heap can be lowered in place.
+    """
+
+    def __init__(self):
+        """Initialize an empty heap"""
+        self.items = []  # (priority, item) in heap order
+        self.positions = {}  # item -> its index in items
+
+    def __repr__(self):
+        """Return a string representation of this heap."""
+        return 'IndexedHeap({} items)'.format(len(self.items))
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, item):
+        return item in self.positions
+
+    def is_empty(self):
+        """Return True if the heap doesn't have any items"""
+        return len(self.items) == 0
+
+    def priority(self, item):
+        """
+        Return the priority of the item, or None if it isn't in the heap
+        Runtime: O(1)
+        """
+        position = self.positions.get(item)
+        return self.items[position][0] if position is not None else None
+
+    def push(self, item, priority):
+        """
+        Add the item, or lower its priority if it is already in the heap with a higher one.
+        Return True if the heap changed.
+        Runtime: O(log n)
+        """
+        position = self.positions.get(item)
+
+        if position is None:
+            self.items.append((priority, item))
+            self.positions[item] = len(self.items) - 1
+            self._sift_up(len(self.items) - 1)
+            return True
+
+        return self.decrease_key(item, priority)
+
+    def decrease_key(self, item, priority):
+        """
+        Lower the priority of an item in the heap, return False if it isn't lower
+        Runtime: O(log n)
+        """
+        position = self.positions[item]
+
+        if priority >= self.items[position][0]:
+            return False
+
+        self.items[position] = (priority, item)
+        self._sift_up(position)
+        return True
+
+    def pop(self):
+        """
+        Remove and return the (item, priority) with the lowest priority,
+        or raise ValueError if the heap is empty
+        Runtime: O(log n)
+        """
+        if not self.items:
+            raise ValueError('Heap is empty')
+
+        priority, item = self.items[0]
+        last = self.items.pop()
+        del self.positions[item]
+
+        if self.items:
+            self.items[0] = last
+            self.positions[last[1]] = 0
+            self._sift_down(0)
+
+        return item, priority
+
+    def _sift_up(self, position):
+        items, positions = self.items, self.positions
+        entry = items[position]
+
+        while position > 0:
+            parent = (position - 1) >> 1
+            if items[parent][0] <= entry[0]:
+                break
+
+            items[position] = items[parent]
+            positions[items[position][1]] = position
+            position = parent
+
+        items[position] = entry
+        positions[entry[1]] = position
+
+    def _sift_down(self, position):
+        items, positions = self.items, self.positions
+        entry = items[position]
+        size = len(items)
+
+        while True:
+            child = 2 * position + 1
+            if child >= size:
+                break
+
+            if child + 1 < size and items[child + 1][0] < items[child][0]:
+                child += 1
+
+            if entry[0] <= items[child][0]:
+                break
+
+            items[position] = items[child]
+            positions[items[position][1]] = position
+            position = child
+
+        items[position] = entry
+        positions[entry[1]] = position
@@ -0,0 +1,146 @@
+def strongly_connected_components(keys, successors_of):
+    """
+    Return the strongly connected components of a directed graph as lists of keys,
+    found with Tarjan's algorithm on an explicit stack so deep graphs can't hit the recursion limit.
+    Components come out sinks first, the reverse of a topological order of the condensation.
+    keys: every vertex key of the graph
+    successors_of: function returning the keys an edge leads to from the given key
+    Runtime: O(V + E)
+    """
+    index = {}  # key -> order it was discovered in
+    low = {}  # key -> lowest index reachable from its subtree through the keys on the stack
+    on_stack = set()
+    stack = []  # Keys whose component isn't complete yet
+    components = []
+
+    for root in keys:
+        if root in index:
+            continue
+
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+
+        # (key, iterator over the successors left to look at)
+        work = [(root, iter(successors_of(root)))]
+
+        while work:
+            key, successors = work[-1]
+
+            for successor in successors:
+                if successor not in index:
+                    index[successor] = low[successor] = len(index)
+                    stack.append(successor)
+                    on_stack.add(successor)
+
+                    work.append((successor, iter(successors_of(successor))))
+                    break
+
+                if successor in on_stack and index[successor] < low[key]:
+                    low[key] = index[successor]
+
+            else:
+                work.pop()
+
+                if work:
+                    parent = work[-1][0]
+                    if low[key] < low[parent]:
+                        low[parent] = low[key]
+
+                # The key is the root of a component, everything above it on the stack belongs to it
+                if low[key] == index[key]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == key:
+                            break
+
+                    components.append(component)
+
+    return components
+
+
+class Condensation(object):
+    """
+    The DAG left after merging every strongly connected component into a single node.
+    Components are numbered in topological order, so every edge goes from a lower to a higher id.
+    """
+
+    def __init__(self, keys, successors_of):
+        """
+        Compute the components of the directed graph and the edges between them
+        Runtime: O(V + E)
+        """
+        self.components = strongly_connected_components(keys, successors_of)
+        self.components.reverse()  # Sources first
+
+        self.component_ids = {}  # key -> id of its component
+        for component_id, component in enumerate(self.components):
+            for key in component:
+                self.component_ids[key] = component_id
+
+        self.successors = []  # component id -> sorted ids of the components its edges lead to
+        for component in self.components:
+            component_id = self.component_ids[component[0]]
+            targets = set()
+
+            for key in component:
+                for successor in successors_of(key):
+                    target = self.component_ids[successor]
+                    if target != component_id:
+                        targets.add(target)
+
+            self.successors.append(sorted(targets))
+
+    def __repr__(self):
+        """Return a string representation of this condensation."""
+        return 'Condensation({} components, {} edges)'.format(len(self.components), self.num_edges())
+
+    def __len__(self):
+        return len(self.components)
+
+    def num_edges(self):
+        """Return the number of edges between components"""
+        return sum(len(targets) for targets in self.successors)
+
+    def component_of(self, key):
+        """
+        Return the id of the component the key is in, or None
+        Runtime: O(1)
+        """
+        return self.component_ids.get(key)
+
+    def get_edges(self):
+        """
+        Return a list of the (from, to) component id edges of the DAG
+        Runtime: O(C + D) where C and D are the number of components and edges between them
+        """
+        return [(component_id, target) for component_id, targets in enumerate(self.successors) for target in targets]
+
+    def is_reachable(self, from_component, to_component):
+        """
+        Return True if there's a path from one component to the other.
+        Components after the target in topological order can't lead to it, so they are never searched.
+        Runtime: O(C + D) at worst, O(1) for the same component or a later one
+        """
+        if from_component == to_component:
+            return True
+
+        elif from_component > to_component:
+            return False
+
+        visited = {from_component}
+        stack = [from_component]
+
+        while stack:
+            for target in self.successors[stack.pop()]:
+                if target == to_component:
+                    return True
+
+                if target < to_component and target not in visited:
+                    visited.add(target)
+                    stack.append(target)
+
+        return False
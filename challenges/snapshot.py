@@ -0,0 +1,517 @@
+import heapq
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+# Helpers shared with the graphs of the repository root are only kept in useful_classes
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'useful_classes'))
+
+from union_find import UnionFind
+
+"""
+Binary graph snapshot
+
+Layout, every section starting on an 8 byte boundary and stored in the
+byte order of the machine that wrote it:
+    header       magic, version, flags, byte order, #vertices, #arcs, #edges, key blob size
+    key_offsets  uint64 x (V + 1)  key i is key_blob[key_offsets[i]:key_offsets[i + 1]]
+    sorted_ids   uint32 x V        vertex ids ordered by their encoded key, for lookups
+    key_blob     utf-8 keys back to back
+    offsets      uint64 x (V + 1)  the neighbors of vertex i are targets[offsets[i]:offsets[i + 1]]
+    targets      uint32 x arcs     neighbor ids, sorted within each vertex
+    weights      int64 x arcs      edge costs, parallel to targets
+"""
+
+MAGIC = b'CS22GRPH'
+VERSION = 1
+HEADER = struct.Struct('=8sHBBQQQQ')
+
+FLAG_UNDIRECTED = 1
+BYTE_ORDER = 0 if sys.byteorder == 'little' else 1
+
+
+def _padding(size):
+    """Return the number of bytes needed to reach the next 8 byte boundary"""
+    return -size % 8
+
+
+def write_snapshot(graph, path):
+    """
+    Write the vertices and edges of a challenge Graph to a snapshot file
+    Runtime: O(V + E)
+    """
+    keys = list(graph.vertices_dict.keys())
+    ids = {key: index for index, key in enumerate(keys)}
+    encoded = [key.encode('utf-8') for key in keys]
+
+    key_offsets = array('Q', [0])
+    for key in encoded:
+        key_offsets.append(key_offsets[-1] + len(key))
+
+    sorted_ids = array('I', sorted(range(len(keys)), key=encoded.__getitem__))
+    key_blob = b''.join(encoded)
+
+    offsets = array('Q', [0])
+    targets = array('I')
+    weights = array('q')
+
+    for key in keys:
+        row = sorted((ids[neighbor], cost) for neighbor, cost in graph.vertices_dict[key].neighbors.items())
+
+        for target, cost in row:
+            if not isinstance(cost, int):
+                raise ValueError('Snapshots only store integer costs, got {!r}'.format(cost))
+            targets.append(target)
+            weights.append(cost)
+
+        offsets.append(len(targets))
+
+    flags = FLAG_UNDIRECTED if graph.undirected else 0
+    header = HEADER.pack(MAGIC, VERSION, flags, BYTE_ORDER, len(keys), len(targets), graph.num_edges, len(key_blob))
+
+    with open(path, 'wb') as file:
+        for section in (header, key_offsets.tobytes(), sorted_ids.tobytes(), key_blob,
+                        offsets.tobytes(), targets.tobytes(), weights.tobytes()):
+            file.write(section)
+            file.write(b'\0' * _padding(len(section)))
+
+
+class SnapshotVertex(object):
+
+    def __init__(self, snapshot, index):
+        """Initialize a view of the vertex stored at the given id"""
+        self.snapshot = snapshot
+        self.index = index
+        self.data = snapshot.key(index)
+
+    def __str__(self):
+        """output the list of neighbors of this vertex"""
+        return str(self.data) + " adjacent to: " + ', '.join(self.get_neighbors())
+
+    @property
+    def neighbors(self):
+        """Return a dictionary of neighbor key -> weight, built on demand"""
+        return dict(self.snapshot.neighbors(self.index))
+
+    def get_neighbors(self):
+        """return the neighbors of this vertex"""
+        return [key for key, _ in self.snapshot.neighbors(self.index)]
+
+    def get_id(self):
+        """return the id of this vertex"""
+        return self.data
+
+    def get_edge_weight(self, vertex):
+        """return the weight of this edge"""
+        return self.neighbors.get(vertex)
+
+
+class Snapshot(object):
+    """
+    A read-only graph backed by a snapshot file.
+    When memory mapped, every array is a zero-copy view over the file,
+    so opening is O(1) and pages are only read as queries touch them.
+    It answers the queries of the challenge graphs straight from the arrays:
+    find_path_bfs, breadth_first_search_length, is_reachable, connected,
+    depth_first_search_iter and shortest_path. Anything else, such as the
+    strongly connected components, needs a regular graph from to_graph.
+    """
+
+    def __init__(self, path, use_mmap=True):
+        """Open the snapshot file at the given path, or raise ValueError if it isn't one"""
+        self.mmap = None
+
+        with open(path, 'rb') as file:
+            if use_mmap:
+                self.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                self.buffer = memoryview(self.mmap)
+            else:
+                self.buffer = memoryview(file.read())
+
+        if len(self.buffer) < HEADER.size:
+            self.close()
+            raise ValueError('{} is not a graph snapshot'.format(path))
+
+        magic, version, flags, byte_order, num_vertices, num_arcs, num_edges, blob_size = \
+            HEADER.unpack_from(self.buffer)
+
+        if magic != MAGIC or version != VERSION or byte_order != BYTE_ORDER:
+            self.close()
+            raise ValueError('{} is not a version {} graph snapshot for this machine'.format(path, VERSION))
+
+        sections = ((num_vertices + 1, 'Q'), (num_vertices, 'I'), (blob_size, 'B'),
+                    (num_vertices + 1, 'Q'), (num_arcs, 'I'), (num_arcs, 'q'))
+
+        # Truncated or padded files would give short arrays or fail to cast, so check the size up front
+        expected = HEADER.size + _padding(HEADER.size)
+        for count, typecode in sections:
+            size = count * struct.calcsize(typecode)
+            expected += size + _padding(size)
+
+        if len(self.buffer) != expected:
+            size = len(self.buffer)
+            self.close()
+            raise ValueError('{} is {} bytes but its header describes a {} byte snapshot'.format(path, size, expected))
+
+        self.undirected = bool(flags & FLAG_UNDIRECTED)
+        self.num_vertices = num_vertices
+        self.num_edges = num_edges
+        self.components = None  # UnionFind of the vertex ids, built by the first connected call
+
+        position = HEADER.size + _padding(HEADER.size)
+        views = []
+        for count, typecode in sections:
+            view, position = self._section(position, count, typecode)
+            views.append(view)
+
+        self.key_offsets, self.sorted_ids, self.key_blob, self.offsets, self.targets, self.weights = views
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __iter__(self):
+        """
+        Iterate over the vertex views in the
+        graph, to use syntax: for vertex in graph
+        """
+        return (SnapshotVertex(self, index) for index in range(self.num_vertices))
+
+    def close(self):
+        """Release the views and the file mapping"""
+        for name in ('key_offsets', 'sorted_ids', 'key_blob', 'offsets', 'targets', 'weights', 'buffer'):
+            view = self.__dict__.pop(name, None)
+            if view is not None:
+                view.release()
+
+        if self.mmap is not None:
+            self.mmap.close()
+            self.mmap = None
+
+    def key(self, index):
+        """
+        Return the key of the vertex with the given id
+        Runtime: O(k) where k is the length of the key
+        """
+        return bytes(self.key_blob[self.key_offsets[index]:self.key_offsets[index + 1]]).decode('utf-8')
+
+    def index_of(self, key):
+        """
+        Return the id of the vertex with the given key, or None
+        Runtime: O(log V) by binary search over the sorted ids
+        """
+        encoded = key.encode('utf-8')
+        low, high = 0, self.num_vertices
+
+        while low < high:
+            middle = (low + high) // 2
+            index = self.sorted_ids[middle]
+            if self._encoded_key(index) < encoded:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low < self.num_vertices and self._encoded_key(self.sorted_ids[low]) == encoded:
+            return self.sorted_ids[low]
+
+        return None
+
+    def neighbors(self, index):
+        """
+        Return the (neighbor key, weight) pairs of the vertex with the given id
+        Runtime: O(d) where d is the degree of the vertex
+        """
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return [(self.key(self.targets[pos]), self.weights[pos]) for pos in range(start, end)]
+
+    def get_vertex(self, key):
+        """
+        Return the vertex if it exists
+        Runtime: O(log V)
+        """
+        index = self.index_of(key)
+        return SnapshotVertex(self, index) if index is not None else None
+
+    def get_vertices(self):
+        """
+        Generate the keys of all the vertices in the graph
+        Runtime: O(n) where n is the number of vertices
+        """
+        return (self.key(index) for index in range(self.num_vertices))
+
+    def get_edges(self):
+        """
+        Generate the (from, to, cost) edges of the graph, each undirected edge once
+        Runtime: O(V + E)
+        """
+        for u in range(self.num_vertices):
+            for pos in range(self.offsets[u], self.offsets[u + 1]):
+                v = self.targets[pos]
+                if not self.undirected or u < v:
+                    yield self.key(u), self.key(v), self.weights[pos]
+
+    def find_path_bfs(self, from_vert, to_vert):
+        """
+        Return a list of vertex that represent a path from one vertex to another
+        Runtime: O(V + E), but only the pages of the visited vertices are read
+        """
+        source = self.index_of(from_vert)
+        target = self.index_of(to_vert)
+
+        if source is None or target is None:
+            return
+
+        offsets, targets = self.offsets, self.targets
+
+        # Sparse predecessor map so untouched parts of the file stay on disk
+        parent = {source: None}
+        frontier = [source]
+
+        while frontier and target not in parent:
+            next_frontier = []
+
+            for curr in frontier:
+                for pos in range(offsets[curr], offsets[curr + 1]):
+                    neighbor = targets[pos]
+                    if neighbor not in parent:
+                        parent[neighbor] = curr
+                        next_frontier.append(neighbor)
+
+            frontier = next_frontier
+
+        # Cover case for disjointed graph
+        if target not in parent:
+            return
+
+        path = []
+        curr = target
+        while curr is not None:
+            path.append(SnapshotVertex(self, curr))
+            curr = parent[curr]
+
+        path.reverse()
+
+        return path
+
+    def breadth_first_search_length(self, vertex, length):
+        """
+        Perform breadth first search along the direction of the edges and return
+        all the vertices exactly length edges away from the inputted vertex
+        Runtime: O(V + E), but only the pages of the visited vertices are read
+        """
+        source = self.index_of(vertex)
+        if source is None:
+            return
+
+        if length < 1:
+            return []
+
+        offsets, targets = self.offsets, self.targets
+
+        visited = {source}
+        frontier = [source]
+
+        # Expand one level at a time, the last frontier is the answer
+        for _ in range(length):
+            # Nothing is any further away, the answer is empty however long the length
+            if not frontier:
+                break
+
+            next_frontier = []
+
+            for curr in frontier:
+                for pos in range(offsets[curr], offsets[curr + 1]):
+                    neighbor = targets[pos]
+                    if neighbor not in visited:
+                        visited.add(neighbor)
+                        next_frontier.append(neighbor)
+
+            frontier = next_frontier
+
+        return [SnapshotVertex(self, index) for index in frontier]
+
+    def is_reachable(self, from_vert, to_vert):
+        """
+        Return True if a path along the direction of the edges leads from one vertex to the other
+        Runtime: O(V + E), but only the pages of the visited vertices are read
+        """
+        source = self.index_of(from_vert)
+        target = self.index_of(to_vert)
+
+        if source is None or target is None:
+            return False
+
+        offsets, targets = self.offsets, self.targets
+
+        visited = {source}
+        stack = [source]
+
+        while stack and target not in visited:
+            curr = stack.pop()
+            for pos in range(offsets[curr], offsets[curr + 1]):
+                neighbor = targets[pos]
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    stack.append(neighbor)
+
+        return target in visited
+
+    def connected(self, from_vert, to_vert):
+        """
+        Return True if the two vertices are connected, ignoring the direction of the edges.
+        The snapshot never changes, so the components are found once and kept.
+        Runtime: O(V + E) reading every arc the first time, O(α(V)) amortized after
+        """
+        source = self.index_of(from_vert)
+        target = self.index_of(to_vert)
+
+        if source is None or target is None:
+            return False
+
+        if self.components is None:
+            offsets, targets = self.offsets, self.targets
+            components = UnionFind(range(self.num_vertices))
+
+            for u in range(self.num_vertices):
+                for pos in range(offsets[u], offsets[u + 1]):
+                    components.union(u, targets[pos])
+
+            self.components = components
+
+        return self.components.connected(source, target)
+
+    def depth_first_search_iter(self, start_vertex, target):
+        """
+        :param start_vertex: The string key of the starting vertex
+        :param target: The string key of the target vertex as a end point
+        :return Boolean, list of the keys on the path
+        Runtime: O(V + E), but only the pages of the visited vertices are read
+        """
+        # Can't find a path for a disjointed graph, no need to search
+        if not self.connected(start_vertex, target):
+            return False, []
+
+        source = self.index_of(start_vertex)
+        goal = self.index_of(target)
+        offsets, targets = self.offsets, self.targets
+
+        # (vertex id, position of the next neighbor to look at), always the path from the start
+        stack = [(source, offsets[source])]
+        visited = {source}
+
+        while stack:
+            curr, pos = stack[-1]
+
+            if curr == goal:
+                return True, [self.key(index) for index, _ in stack]
+
+            if pos == offsets[curr + 1]:
+                stack.pop()
+                continue
+
+            stack[-1] = (curr, pos + 1)
+            neighbor = targets[pos]
+
+            if neighbor not in visited:
+                visited.add(neighbor)
+                stack.append((neighbor, offsets[neighbor]))
+
+        return False, []
+
+    def shortest_path(self, start_vertex, target, max_cost=None):
+        """
+        Find the cheapest path by the edge costs with Dijkstra's algorithm,
+        stopping as soon as every target is settled.
+        :param start_vertex: The string key of the starting vertex
+        :param target: The key of the target vertex, or a list or set of them
+        :param max_cost: Ignore paths that cost more than this, None for no budget
+        :return (list of the keys on the path, total cost), or ([], None) if the target
+                can't be reached; a dictionary of target -> (path, cost) for several targets
+        Runtime: O((V + E) log V), but only the pages of the settled vertices are read
+        """
+        # Snapshot keys are always strings, so any other target is a collection of them
+        single = isinstance(target, str)
+        keys = [target] if single else list(target)
+
+        source = self.index_of(start_vertex)
+        goals = {}  # vertex id -> key of the targets that exist
+        for key in keys:
+            index = self.index_of(key) if isinstance(key, str) else None
+            if index is not None:
+                goals[index] = key
+
+        distances = {}  # vertex id -> cost, once settled
+        parents = {}  # vertex id -> vertex id it was reached from
+
+        if source is not None:
+            remaining = set(goals)
+            offsets, targets, weights = self.offsets, self.targets, self.weights
+
+            heap = [(0, source, -1)]
+            best = {source: 0}
+
+            while remaining and heap:
+                cost, curr, parent = heapq.heappop(heap)
+                if curr in distances:
+                    continue  # An older, costlier entry
+
+                distances[curr] = cost
+                parents[curr] = parent
+                remaining.discard(curr)
+
+                for pos in range(offsets[curr], offsets[curr + 1]):
+                    neighbor, weight = targets[pos], weights[pos]
+                    if neighbor in distances:
+                        continue
+
+                    if weight < 0:
+                        raise ValueError('Shortest paths need non-negative costs, got {} on ({}, {})'.format(
+                            weight, self.key(curr), self.key(neighbor)))
+
+                    new_cost = cost + weight
+                    if max_cost is not None and new_cost > max_cost:
+                        continue
+
+                    if neighbor not in best or new_cost < best[neighbor]:
+                        best[neighbor] = new_cost
+                        heapq.heappush(heap, (new_cost, neighbor, curr))
+
+        results = {key: ([], None) for key in keys}
+        for index, key in goals.items():
+            if index not in distances:
+                continue
+
+            path = [index]
+            while parents[path[-1]] != -1:
+                path.append(parents[path[-1]])
+            path.reverse()
+
+            results[key] = ([self.key(vertex) for vertex in path], distances[index])
+
+        return results[target] if single else results
+
+    def to_graph(self, graph):
+        """
+        Add every vertex and edge of the snapshot to the given Graph and return it
+        Runtime: O(V + E)
+        """
+        graph.undirected = self.undirected
+
+        graph.add_vertices_from(self.get_vertices())
+
+        graph.add_edges_from(self.get_edges())
+
+        return graph
+
+    def _encoded_key(self, index):
+        return bytes(self.key_blob[self.key_offsets[index]:self.key_offsets[index + 1]])
+
+    def _section(self, position, count, typecode):
+        """Return a view of count items starting at position, and the position of the next section"""
+        size = count * struct.calcsize(typecode)
+        view = self.buffer[position:position + size].cast(typecode)
+        return view, position + size + _padding(size)
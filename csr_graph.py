@@ -0,0 +1,963 @@
+import sys
+from array import array
+from build_report import BuildReport
+from memory_report import memory_report, sampled, structure_size, value_size
+from multi_source_bfs import multi_source_bfs, query_indexes
+from traversal_stats import TraversalRecorder
+
+try:
+    import numpy
+except ImportError:  # NumPy is optional, traversals fall back to the array module
+    numpy = None
+
+"""
+CSRVertex Class
+A lightweight view over one row of a CSRGraph, so traversals can hand back
+vertex objects with the same interface as graph.Vertex without storing them.
+"""
+
+
+class CSRVertex(object):
+
+    def __init__(self, graph, index):
+        """
+        Initialize a view of the vertex stored at the given dense id
+        """
+        self.graph = graph
+        self.index = index
+        self.id = graph.keys[index]
+
+    def __eq__(self, other):
+        return isinstance(other, CSRVertex) and other.graph is self.graph and other.index == self.index
+
+    def __hash__(self):
+        return hash(self.index)
+
+    def __str__(self):
+        """output the list of neighbors of this vertex"""
+        return str(self.id) + " adjacent to " + str(self.get_neighbors())
+
+    @property
+    def neighbors(self):
+        """
+        Return a dictionary of neighbor key -> weight, built on demand
+        Runtime: O(d) where d is the degree of the vertex
+        """
+        return dict(self.graph._row(self.index))
+
+    def get_neighbors(self):
+        """
+        Return the keys of the neighbors of this vertex
+        Runtime: O(d) where d is the degree of the vertex
+        """
+        return [key for key, _ in self.graph._row(self.index)]
+
+    def get_id(self):
+        """
+        Return the id of this vertex
+        Runtime: O(1)
+        """
+        return self.id
+
+    def get_edge_weight(self, vertex):
+        """
+        Return the weight of this edge
+        Runtime: O(d) where d is the degree of the vertex
+        """
+        for key, weight in self.graph._row(self.index):
+            if key == vertex:
+                return weight
+        return None
+
+
+"""
+BFSLevels Class
+The result of a level-synchronous breadth first search over a whole CSRGraph:
+the distance and predecessor of every vertex id, and the frontier of every level.
+"""
+
+
+class BFSLevels(object):
+
+    def __init__(self, graph, source, distance, parent, levels):
+        """
+        distance: distance of every vertex id from the source, -1 if unreachable
+        parent: predecessor id of every vertex on a shortest path, -1 if unreachable
+        levels: levels[k] holds the ids of the vertices k edges away from the source
+        """
+        self.graph = graph
+        self.source = source
+        self.distance = distance
+        self.parent = parent
+        self.levels = levels
+
+    def k_hop(self, length):
+        """
+        Return the keys of the vertices exactly length edges away from the source
+        Runtime: O(n) where n is the number of vertices returned
+        """
+        if not 0 <= length < len(self.levels):
+            return []
+
+        keys = self.graph.keys
+        return [keys[index] for index in self.levels[length].tolist()]
+
+    def path_to(self, key):
+        """
+        Return the keys along a shortest path from the source to the given vertex, or None
+        Runtime: O(p) where p is the length of the path
+        """
+        index = self.graph.key_to_id.get(key)
+        if index is None or self.distance[index] == -1:
+            return
+
+        path = [index]
+        while path[-1] != self.source:
+            path.append(int(self.parent[path[-1]]))
+
+        path.reverse()
+
+        return [self.graph.keys[index] for index in path]
+
+
+"""
+CSRGraph Class
+An undirected graph with the same interface as graph.Graph, but stored in
+compressed sparse row form: vertex keys are interned to dense integer ids and
+the adjacency lives in three flat arrays (offsets, targets, weights).
+New edges are buffered and merged into the arrays in batches.
+Edge weights are stored as integers.
+"""
+
+
+class CSRGraph:
+
+    # Minimum number of buffered edges before add_edge merges them into the arrays
+    COMPACT_MIN = 1024
+
+    # Graphs with at least this many vertices use bidirectional search in find_path_bfs by default
+    BIDIRECTIONAL_MIN_VERTICES = 1000
+
+    # Most queries answered by one multi-source BFS, one bit of a 64 bit mask each
+    BATCH_SIZE = 64
+
+    def __init__(self, max_degree=5):
+        """
+        Initialize an empty graph
+        max_degree: the most neighbors a vertex may have, None for no limit
+        """
+        self.keys = []  # Dense id -> key
+        self.key_to_id = {}  # Key -> dense id
+        self.offsets = array('q', [0])  # Row u spans targets[offsets[u]:offsets[u + 1]]
+        self.targets = array('i')  # Neighbor ids, sorted within each row
+        self.weights = array('q')  # Edge weights, parallel to targets
+        self.degrees = array('i')  # Degree of every vertex, including buffered edges
+        self.max_degree = max_degree
+        self.num_vertices = 0
+        self.total_edges = 0  # Number of all unique edges
+        self._pending = {}  # (lower id, higher id) -> weight of edges not merged yet
+        self.traversal_stats = None  # TraversalRecorder of the breadth first searches, if enabled
+
+    @classmethod
+    def from_graph(cls, graph, max_degree=None, weights=True):
+        """
+        Return a CSRGraph with the same vertices and edges as the given graph.Graph,
+        or raise ValueError if an edge can't be kept, such as one with a non-integer cost
+        or one over max_degree
+        weights: False to give every edge a cost of 0, for callers that only need the
+                 structure so no edge is lost over its cost
+        Runtime: O(V + E)
+        """
+        csr = cls(max_degree=max_degree)
+        csr.add_vertices_from(graph.get_vertices())
+
+        edges = graph.iter_edges()
+        if not weights:
+            edges = ((from_vert, to_vert) for from_vert, to_vert, _ in edges)
+
+        report = csr.add_edges_from(edges)
+
+        if report.rejected:
+            edge, reason = report.rejected[0]
+            raise ValueError('{} of the edges can\'t be converted, such as {!r} ({})'.format(
+                len(report.rejected), edge, reason))
+
+        return csr
+
+    def __iter__(self):
+        """iterate over the vertex views in the
+        graph, to use sytax: for v in g"""
+        return (CSRVertex(self, index) for index in range(self.num_vertices))
+
+    def add_vertex(self, key):
+        """
+        Add a new vertex to the graph with the given key and return the vertex
+        Runtime: O(1)* since keys are interned through a dictionary
+        """
+        if key in self.key_to_id:
+            print("Vertex: " + key + " already exist")
+            return
+
+        index = self.num_vertices
+
+        self.key_to_id[key] = index
+        self.keys.append(key)
+        self.offsets.append(self.offsets[-1])  # New vertices start with an empty row
+        self.degrees.append(0)
+        self.num_vertices += 1
+
+        return CSRVertex(self, index)
+
+    def get_vertex(self, key):
+        """
+        Return the vertex if it exists
+        Runtime: O(1)
+        """
+        index = self.key_to_id.get(key)
+        return CSRVertex(self, index) if index is not None else None
+
+    def add_edge(self, from_vert, to_vert, cost=0):
+        """
+        Add an edge from one to another vertex with a cost
+        Runtime: O(d) amortized where d is the degree of from_vert,
+                since the edge is buffered and merged in batches.
+        """
+        # Handle bad inputs and edge cases
+        if from_vert == to_vert:
+            print('Both from vertex and to vertex are the same')
+            return
+
+        elif from_vert not in self.key_to_id or to_vert not in self.key_to_id:
+            print('{} or {} are not in dictionary of vertices'.format(from_vert, to_vert))
+            return
+
+        # Weights live in an array of 64-bit ints
+        elif not isinstance(cost, int):
+            print('Cost of {} to {} must be an integer, got {!r}'.format(from_vert, to_vert, cost))
+            return
+
+        from_id = self.key_to_id[from_vert]
+        to_id = self.key_to_id[to_vert]
+        pair = (from_id, to_id) if from_id < to_id else (to_id, from_id)
+
+        # Re-adding an existing edge only updates its weight, even on a vertex at the degree cap
+        if pair in self._pending:
+            self._pending[pair] = cost
+            return
+
+        if self._set_weight(from_id, to_id, cost):
+            self._set_weight(to_id, from_id, cost)
+            return
+
+        if self.max_degree is not None and self.degrees[from_id] >= self.max_degree:
+            print('{} is too popular already'.format(from_vert))
+            return
+
+        elif self.max_degree is not None and self.degrees[to_id] >= self.max_degree:
+            print('{} is too popular already'.format(to_vert))
+            return
+
+        self._pending[pair] = cost
+        self.degrees[from_id] += 1
+        self.degrees[to_id] += 1
+        self.total_edges += 1
+
+        if len(self._pending) >= max(self.COMPACT_MIN, len(self.targets) >> 2):
+            self._compact()
+
+    def add_vertices_from(self, keys):
+        """
+        Add a vertex for every key of the given iterable or NumPy array without printing,
+        and return a BuildReport listing the duplicate keys that were skipped
+        Runtime: O(n) where n is the number of keys
+        """
+        report = BuildReport()
+
+        if hasattr(keys, 'tolist'):  # NumPy arrays
+            keys = keys.tolist()
+
+        for key in keys:
+            if key in self.key_to_id:
+                report.reject(key, 'duplicate vertex')
+                continue
+
+            self.key_to_id[key] = self.num_vertices + report.added
+            self.keys.append(key)
+            report.added += 1
+
+        # Every new vertex starts with an empty row
+        self.offsets.extend(array('q', [self.offsets[-1]]) * report.added)
+        self.degrees.extend(array('i', [0]) * report.added)
+        self.num_vertices += report.added
+
+        return report
+
+    def add_edges_from(self, edges):
+        """
+        Add every (from, to) or (from, to, cost) edge of the given iterable or NumPy array without printing.
+        All the edges are validated in one pass and merged into the arrays at once, and the self-loops,
+        unknown vertices, non-integer costs, duplicates and degree cap violations are returned in a BuildReport.
+        Runtime: O(V + E + n) where n is the number of edges
+        """
+        report = BuildReport()
+
+        if hasattr(edges, 'tolist'):  # NumPy arrays
+            edges = edges.tolist()
+
+        key_to_id, degrees, pending = self.key_to_id, self.degrees, self._pending
+        max_degree = self.max_degree
+
+        for edge in edges:
+            from_vert, to_vert = edge[0], edge[1]
+
+            if from_vert == to_vert:
+                report.reject(edge, 'self-loop')
+                continue
+
+            elif from_vert not in key_to_id or to_vert not in key_to_id:
+                report.reject(edge, 'unknown vertex')
+                continue
+
+            cost = edge[2] if len(edge) > 2 else 0
+            if not isinstance(cost, int):
+                report.reject(edge, 'non-integer cost')
+                continue
+
+            from_id, to_id = key_to_id[from_vert], key_to_id[to_vert]
+            pair = (from_id, to_id) if from_id < to_id else (to_id, from_id)
+
+            if pair in pending or self._find_arc(from_id, to_id) != -1:
+                report.reject(edge, 'duplicate edge')
+                continue
+
+            elif max_degree is not None and (degrees[from_id] >= max_degree or degrees[to_id] >= max_degree):
+                report.reject(edge, 'degree cap')
+                continue
+
+            pending[pair] = cost
+            degrees[from_id] += 1
+            degrees[to_id] += 1
+            report.added += 1
+
+        self.total_edges += report.added
+        self._compact()
+
+        return report
+
+    def get_vertices(self):
+        """
+        Return all the vertex keys in the graph
+        Runtime: O(1) since a view of the interned keys is returned
+        """
+        return self.key_to_id.keys()
+
+    def get_edges(self):
+        """
+        Return a set of all unique the edges in the graph
+        Runtime: O(V + E)
+        """
+        return set(self.iter_edges())
+
+    def iter_edges(self):
+        """
+        Generate every edge of the graph once as a (from_vertex, to_vertex, weight) tuple,
+        from the vertex with the lower id, without building any collection
+        Runtime: O(V + E), O(1) memory once the buffered edges are merged
+        """
+        self._compact()
+        keys, offsets, targets, weights = self.keys, self.offsets, self.targets, self.weights
+
+        for u in range(self.num_vertices):
+            for pos in range(offsets[u], offsets[u + 1]):
+                v = targets[pos]
+                if u < v:  # Each undirected edge is stored once per direction
+                    yield keys[u], keys[v], weights[pos]
+
+    def num_edges(self):
+        """
+        Return the number of unique edges in the graph
+        Runtime: O(1)
+        """
+        return self.total_edges
+
+    def degree(self, key):
+        """
+        Return the number of neighbors of the vertex, or None if it doesn't exist
+        Runtime: O(1)
+        """
+        index = self.key_to_id.get(key)
+        return self.degrees[index] if index is not None else None
+
+    def adjacency(self):
+        """
+        Return the (offsets, targets, weights) arrays with every buffered edge merged:
+        the neighbors of vertex id u are targets[offsets[u]:offsets[u + 1]], sorted by id.
+        The arrays belong to the graph, copy them before changing anything.
+        Runtime: O(V + E) if edges are buffered, O(1) otherwise
+        """
+        self._compact()
+        return self.offsets, self.targets, self.weights
+
+    def is_empty(self):
+        """Return true if the graph doesn't have any vertices"""
+        return self.num_vertices == 0
+
+    def memory_usage(self, deep=True, sample=None):
+        """
+        Return a report of the bytes the graph uses by structure, with the total and the
+        per vertex and per edge averages, as described in memory_report.memory_report:
+            keys_list, key_to_id     the tables of the id -> key list and key -> id dictionary
+            offsets, targets, weights, degrees   the arrays, buffers included
+            pending                  the table of the buffered edges
+            traversal_stats          the traversal recorder, when enabled
+        and with deep:
+            keys                     the key strings
+            ids                      the id ints of key_to_id that aren't shared small ints
+            pending_edges            the (lower id, higher id) tuples, ids and weights of the buffered edges
+        deep: measure the objects inside the tables too
+        sample: number of keys and buffered edges to measure and scale up from, None to measure all of them
+        Runtime: O(1), or O(V + P) with deep for P buffered edges
+        """
+        sizes = {
+            'keys_list': sys.getsizeof(self.keys),
+            'key_to_id': sys.getsizeof(self.key_to_id),
+            'offsets': sys.getsizeof(self.offsets),
+            'targets': sys.getsizeof(self.targets),
+            'weights': sys.getsizeof(self.weights),
+            'degrees': sys.getsizeof(self.degrees),
+            'pending': sys.getsizeof(self._pending),
+        }
+
+        if self.traversal_stats is not None:
+            sizes['traversal_stats'] = structure_size(self.traversal_stats)
+
+        if deep:
+            keys, scale = sampled(iter(self.keys), len(self.keys), sample)
+            sizes['keys'] = int(round(sum(sys.getsizeof(key) for key in keys) * scale))
+
+            ids, scale = sampled(iter(self.key_to_id.values()), len(self.key_to_id), sample)
+            sizes['ids'] = int(round(sum(value_size(index) for index in ids) * scale))
+
+            pending, scale = sampled(iter(self._pending.items()), len(self._pending), sample)
+            sizes['pending_edges'] = int(round(sum(sys.getsizeof(pair) + value_size(pair[0]) + value_size(pair[1])
+                                                   + value_size(weight) for pair, weight in pending) * scale))
+
+        return memory_report(sizes, self.num_vertices, self.total_edges, deep, sample)
+
+    def enable_stats(self, callback=None, keep=1000):
+        """
+        Count the vertices, edges, frontier size, visited vertices and wall time of every
+        breadth first search, and return the TraversalRecorder holding them.
+        callback: function called with the TraversalStats of every finished search
+        """
+        self.traversal_stats = TraversalRecorder(callback, keep)
+        return self.traversal_stats
+
+    def disable_stats(self):
+        """Stop counting the breadth first searches"""
+        self.traversal_stats = None
+
+    def breadth_first_search_length(self, vertex, length):
+        """
+        Perform breadth first search and return all nodes that met
+        the require length from the inputted vertex.
+        Runtime: O(V + E)
+        """
+        if vertex not in self.key_to_id:
+            return
+
+        if length < 1:
+            return []
+
+        self._compact()
+        offsets, targets = self.offsets, self.targets
+
+        # Distance of every vertex from the start, -1 when not visited yet
+        distance = array('i', [-1]) * self.num_vertices
+        source = self.key_to_id[vertex]
+        distance[source] = 0
+
+        # The queue is a flat array of ids consumed from a moving head
+        queue = array('i', [source])
+        head = 0
+        vertices = []
+
+        stats = self.traversal_stats.start('breadth_first_search_length') if self.traversal_stats else None
+
+        while head < len(queue):
+            curr = queue[head]
+            head += 1
+
+            next_length = distance[curr] + 1
+            if next_length > length:
+                break
+
+            if stats is not None:
+                stats.expand(range(offsets[curr], offsets[curr + 1]), len(queue) - head + 1)
+
+            for pos in range(offsets[curr], offsets[curr + 1]):
+                neighbor = targets[pos]
+                if distance[neighbor] == -1:
+                    distance[neighbor] = next_length
+                    queue.append(neighbor)
+
+                    if next_length == length:
+                        vertices.append(CSRVertex(self, neighbor))
+
+        if stats is not None:
+            self.traversal_stats.finish(stats, len(queue))
+
+        return vertices
+
+    def find_path_bfs(self, from_vert, to_vert, bidirectional=None):
+        """
+        Return a list of vertex that represent a path from one vertex to another
+        bidirectional: True to grow frontiers from both ends, False to search from from_vert only,
+                       None to pick bidirectional once the graph reaches BIDIRECTIONAL_MIN_VERTICES
+        Runtime: O(V + E)
+        """
+        if from_vert not in self.key_to_id or to_vert not in self.key_to_id:
+            print('{} or {} are not in dictionary of vertices'.format(from_vert, to_vert))
+            return
+
+        elif from_vert == to_vert:
+            print('Both from vertex and to vertex are the same')
+            return [self.get_vertex(from_vert)]
+
+        self._compact()
+        offsets, targets = self.offsets, self.targets
+
+        source = self.key_to_id[from_vert]
+        target = self.key_to_id[to_vert]
+
+        if bidirectional is None:
+            bidirectional = self.num_vertices >= self.BIDIRECTIONAL_MIN_VERTICES
+
+        if bidirectional:
+            return self._find_path_bidirectional(source, target)
+
+        # Predecessor of every visited vertex, -1 when not visited yet
+        parent = array('i', [-1]) * self.num_vertices
+        parent[source] = source
+
+        queue = array('i', [source])
+        head = 0
+
+        stats = self.traversal_stats.start('find_path_bfs') if self.traversal_stats else None
+
+        while head < len(queue) and parent[target] == -1:
+            curr = queue[head]
+            head += 1
+
+            if stats is not None:
+                stats.expand(range(offsets[curr], offsets[curr + 1]), len(queue) - head + 1)
+
+            for pos in range(offsets[curr], offsets[curr + 1]):
+                neighbor = targets[pos]
+                if parent[neighbor] == -1:
+                    parent[neighbor] = curr
+                    queue.append(neighbor)
+
+        if stats is not None:
+            self.traversal_stats.finish(stats, len(queue))
+
+        # If unable to find the path
+        if parent[target] == -1:
+            return
+
+        path = [CSRVertex(self, target)]
+
+        curr = target
+        while curr != source:
+            curr = parent[curr]
+            path.append(CSRVertex(self, curr))
+
+        path.reverse()
+
+        return path
+
+    def bfs_levels(self, vertex, max_depth=None, use_numpy=None):
+        """
+        Run a level-synchronous breadth first search from the given vertex over the whole graph,
+        expanding each frontier at once, and return a BFSLevels with the distance and predecessor
+        arrays and the k-hop set of every level, or None if the vertex doesn't exist.
+        max_depth: stop after this many levels, None for the whole graph
+        use_numpy: True to gather frontiers with NumPy, False for the array fallback,
+                   None to use NumPy when it is installed
+        Runtime: O(V + E)
+        """
+        if vertex not in self.key_to_id:
+            return
+
+        if use_numpy is None:
+            use_numpy = numpy is not None
+
+        self._compact()
+        source = self.key_to_id[vertex]
+
+        stats = self.traversal_stats.start('bfs_levels') if self.traversal_stats else None
+
+        if use_numpy:
+            distance, parent, levels = self._numpy_levels(source, max_depth)
+        else:
+            distance, parent, levels = self._array_levels(source, max_depth)
+
+        if stats is not None:
+            # The deepest level is only expanded when the search ran out of vertices before max_depth
+            expanded = levels if max_depth is None or len(levels) - 1 < max_depth else levels[:-1]
+            self._count_levels(stats, expanded)
+            self.traversal_stats.finish(stats, sum(len(level) for level in levels))
+
+        return BFSLevels(self, source, distance, parent, levels)
+
+    def _numpy_levels(self, source, max_depth):
+        """
+        Expand every frontier with NumPy gathers over the CSR arrays,
+        deduplicating the next frontier through the distance array
+        Runtime: O(V + E), in vectorized steps of one level each
+        """
+        offsets = numpy.frombuffer(self.offsets, dtype=numpy.int64)
+        targets = numpy.frombuffer(self.targets, dtype=numpy.int32)
+
+        distance = numpy.full(self.num_vertices, -1, dtype=numpy.int32)
+        parent = numpy.full(self.num_vertices, -1, dtype=numpy.int32)
+        distance[source] = 0
+        parent[source] = source
+
+        frontier = numpy.array([source], dtype=numpy.int64)
+        levels = [frontier]
+        depth = 0
+
+        while max_depth is None or depth < max_depth:
+            starts = offsets[frontier]
+            counts = offsets[frontier + 1] - starts
+            total = int(counts.sum())
+            if total == 0:
+                break
+
+            # Position of every neighbor of the frontier in targets: each row start plus its offset in the row
+            row_starts = numpy.repeat(starts - (numpy.cumsum(counts) - counts), counts)
+            neighbors = targets[row_starts + numpy.arange(total)]
+            sources = numpy.repeat(frontier, counts)
+
+            unvisited = distance[neighbors] == -1
+            neighbors = neighbors[unvisited]
+            if neighbors.size == 0:
+                break
+
+            # Keep the first edge that reached each new vertex
+            frontier, first = numpy.unique(neighbors, return_index=True)
+            frontier = frontier.astype(numpy.int64)
+            depth += 1
+
+            distance[frontier] = depth
+            parent[frontier] = sources[unvisited][first]
+            levels.append(frontier)
+
+        return distance, parent, levels
+
+    def _array_levels(self, source, max_depth):
+        """
+        Expand every frontier with plain loops over the CSR arrays
+        Runtime: O(V + E)
+        """
+        offsets, targets = self.offsets, self.targets
+
+        distance = array('i', [-1]) * self.num_vertices
+        parent = array('i', [-1]) * self.num_vertices
+        distance[source] = 0
+        parent[source] = source
+
+        frontier = array('i', [source])
+        levels = [frontier]
+        depth = 0
+
+        while max_depth is None or depth < max_depth:
+            depth += 1
+            next_frontier = array('i')
+
+            for curr in frontier:
+                for pos in range(offsets[curr], offsets[curr + 1]):
+                    neighbor = targets[pos]
+                    if distance[neighbor] == -1:
+                        distance[neighbor] = depth
+                        parent[neighbor] = curr
+                        next_frontier.append(neighbor)
+
+            if not next_frontier:
+                break
+
+            frontier = next_frontier
+            levels.append(frontier)
+
+        return distance, parent, levels
+
+    def breadth_first_search_length_batch(self, vertices, length):
+        """
+        Return a list with the result of breadth_first_search_length(vertex, length) for every
+        given vertex, sharing the frontier expansion between up to BATCH_SIZE queries at a time.
+        Each result holds the same vertices as the single query, possibly in another order.
+        Runtime: O(V + E) per batch of queries
+        """
+        self._compact()
+        results = [None] * len(vertices)
+
+        for start in range(0, len(vertices), self.BATCH_SIZE):
+            # Queries with an unknown starting vertex keep their None result
+            indexes = [index for index in range(start, min(start + self.BATCH_SIZE, len(vertices)))
+                       if vertices[index] in self.key_to_id]
+
+            for index in indexes:
+                results[index] = []
+
+            if length < 1 or not indexes:
+                continue
+
+            def visit(vertex, bits, parent, depth):
+                if depth == length:
+                    for query in query_indexes(bits):
+                        results[indexes[query]].append(CSRVertex(self, vertex))
+                return 0
+
+            sources = [self.key_to_id[vertices[index]] for index in indexes]
+            stats = self.traversal_stats.start('breadth_first_search_length_batch') if self.traversal_stats else None
+
+            visited = multi_source_bfs(sources, self._neighbor_ids, visit, max_depth=length, stats=stats)
+
+            if stats is not None:
+                self.traversal_stats.finish(stats, visited)
+
+        return results
+
+    def find_path_bfs_batch(self, pairs):
+        """
+        Return a list with a shortest path for every given (from, to) pair, like find_path_bfs
+        but without printing, sharing the frontier expansion between up to BATCH_SIZE queries at a time.
+        Each path has the same length as the one find_path_bfs returns, though another path
+        of that length may be picked when there are ties.
+        Runtime: O(V + E) per batch of queries
+        """
+        self._compact()
+        results = [None] * len(pairs)
+
+        for start in range(0, len(pairs), self.BATCH_SIZE):
+            indexes = []
+
+            for index in range(start, min(start + self.BATCH_SIZE, len(pairs))):
+                from_vert, to_vert = pairs[index]
+
+                if from_vert not in self.key_to_id or to_vert not in self.key_to_id:
+                    continue
+
+                elif from_vert == to_vert:
+                    results[index] = [self.get_vertex(from_vert)]
+
+                else:
+                    indexes.append(index)
+
+            if not indexes:
+                continue
+
+            sources = [self.key_to_id[pairs[index][0]] for index in indexes]
+            targets = [self.key_to_id[pairs[index][1]] for index in indexes]
+
+            # A dictionary per query of the visited vertices along with their predecessor
+            parents = [{source: -1} for source in sources]
+
+            def visit(vertex, bits, parent, depth):
+                finished = 0
+                for query in query_indexes(bits):
+                    parents[query][vertex] = parent
+                    if vertex == targets[query]:
+                        finished |= 1 << query
+                return finished
+
+            stats = self.traversal_stats.start('find_path_bfs_batch') if self.traversal_stats else None
+
+            visited = multi_source_bfs(sources, self._neighbor_ids, visit, stats=stats)
+
+            if stats is not None:
+                self.traversal_stats.finish(stats, visited)
+
+            for query, index in enumerate(indexes):
+                # If unable to find the path
+                if targets[query] not in parents[query]:
+                    continue
+
+                path = []
+                curr = targets[query]
+                while curr != -1:
+                    path.append(CSRVertex(self, curr))
+                    curr = parents[query][curr]
+
+                path.reverse()
+                results[index] = path
+
+        return results
+
+    def _neighbor_ids(self, index):
+        """Return the ids of the neighbors of the vertex with the given id"""
+        return self.targets[self.offsets[index]:self.offsets[index + 1]]
+
+    def _find_path_bidirectional(self, source, target):
+        """
+        Return a list of vertex that represent a shortest path between two vertex ids,
+        growing one frontier from each end and always expanding the smaller one.
+        Runtime: O(V + E), but usually only explores around the two ends
+        """
+        # Predecessor towards the source / successor towards the target, -1 when not visited yet
+        forward = array('i', [-1]) * self.num_vertices
+        backward = array('i', [-1]) * self.num_vertices
+        forward[source] = source
+        backward[target] = target
+
+        forward_frontier = array('i', [source])
+        backward_frontier = array('i', [target])
+        meeting = -1
+
+        stats = self.traversal_stats.start('find_path_bfs') if self.traversal_stats else None
+
+        while forward_frontier and backward_frontier and meeting == -1:
+            if stats is not None:
+                self._count_levels(stats, [min(forward_frontier, backward_frontier, key=len)])
+                stats.peak_frontier = max(stats.peak_frontier, len(forward_frontier) + len(backward_frontier))
+
+            if len(forward_frontier) <= len(backward_frontier):
+                forward_frontier, meeting = self._expand_frontier(forward_frontier, forward, backward)
+            else:
+                backward_frontier, meeting = self._expand_frontier(backward_frontier, backward, forward)
+
+        if stats is not None:
+            self.traversal_stats.finish(stats, 2 * self.num_vertices - forward.count(-1) - backward.count(-1))
+
+        # If unable to find the path
+        if meeting == -1:
+            return
+
+        # Stitch the two halves together at the meeting vertex
+        path = [CSRVertex(self, meeting)]
+        curr = meeting
+        while curr != source:
+            curr = forward[curr]
+            path.append(CSRVertex(self, curr))
+
+        path.reverse()
+
+        curr = meeting
+        while curr != target:
+            curr = backward[curr]
+            path.append(CSRVertex(self, curr))
+
+        return path
+
+    def _expand_frontier(self, frontier, parent, other_parent):
+        """
+        Visit every unvisited neighbor of the frontier one level out, and return the new frontier
+        along with the first vertex the other search has already visited, or -1.
+        Runtime: O(E) of the frontier
+        """
+        offsets, targets = self.offsets, self.targets
+        next_frontier = array('i')
+
+        for curr in frontier:
+            for pos in range(offsets[curr], offsets[curr + 1]):
+                neighbor = targets[pos]
+                if parent[neighbor] == -1:
+                    parent[neighbor] = curr
+
+                    if other_parent[neighbor] != -1:
+                        return next_frontier, neighbor
+
+                    next_frontier.append(neighbor)
+
+        return next_frontier, -1
+
+    def _count_levels(self, stats, levels):
+        """Count every vertex of the given frontiers as expanded into the traversal stats, one frontier at a time"""
+        offsets = self.offsets
+
+        for level in levels:
+            stats.dequeued += len(level)
+            stats.edges_scanned += sum(offsets[curr + 1] - offsets[curr] for curr in map(int, level))
+            stats.peak_frontier = max(stats.peak_frontier, len(level))
+
+    def _row(self, index):
+        """
+        Return the (neighbor key, weight) pairs of the given vertex id
+        Runtime: O(d) where d is the degree of the vertex
+        """
+        self._compact()
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return [(self.keys[self.targets[pos]], self.weights[pos]) for pos in range(start, end)]
+
+    def _set_weight(self, from_id, to_id, cost):
+        """
+        Overwrite the weight of a merged edge, return False if there's no such edge
+        Runtime: O(log d) since rows are sorted
+        """
+        pos = self._find_arc(from_id, to_id)
+
+        if pos == -1:
+            return False
+
+        self.weights[pos] = cost
+        return True
+
+    def _find_arc(self, from_id, to_id):
+        """
+        Return the position of to_id in the merged row of from_id, or -1
+        Runtime: O(log d) since rows are sorted
+        """
+        start, end = self.offsets[from_id], self.offsets[from_id + 1]
+        targets = self.targets
+
+        # Binary search the sorted row
+        while start < end:
+            middle = (start + end) // 2
+            if targets[middle] < to_id:
+                start = middle + 1
+            else:
+                end = middle
+
+        if start < self.offsets[from_id + 1] and targets[start] == to_id:
+            return start
+
+        return -1
+
+    def _compact(self):
+        """
+        Merge the buffered edges into the offsets, targets and weights arrays
+        Runtime: O(V + E)
+        """
+        if not self._pending:
+            return
+
+        # Group the buffered edges by vertex, in both directions
+        extra = {}
+        for (u, v), weight in self._pending.items():
+            extra.setdefault(u, []).append((v, weight))
+            extra.setdefault(v, []).append((u, weight))
+
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        new_offsets = array('q', [0])
+        new_targets = array('i')
+        new_weights = array('q')
+
+        for u in range(self.num_vertices):
+            start, end = offsets[u], offsets[u + 1]
+
+            if u in extra:
+                row = list(zip(targets[start:end], weights[start:end])) + extra[u]
+                row.sort()
+                new_targets.extend([v for v, _ in row])
+                new_weights.extend([w for _, w in row])
+            else:
+                new_targets.extend(targets[start:end])
+                new_weights.extend(weights[start:end])
+
+            new_offsets.append(len(new_targets))
+
+        self.offsets = new_offsets
+        self.targets = new_targets
+        self.weights = new_weights
+        self._pending = {}
@@ -0,0 +1,361 @@
+from csr_graph import CSRGraph, numpy
+from graph import Graph
+import unittest
+
+
+class CSRGraphTests(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = CSRGraph()
+
+        self.populated_graph = CSRGraph()
+        # Add vertices
+        for key in ["A", "B", "C", "D", "E", "F", "G"]:
+            self.populated_graph.add_vertex(key)
+
+        # Add connections (non weighted edges for now)
+        self.populated_graph.add_edge("A", "B")  # (A -> B)
+        self.populated_graph.add_edge("A", "C")  # (A -> C)
+        self.populated_graph.add_edge("B", "C")  # (B -> C)
+        self.populated_graph.add_edge("C", "D")  # (C -> D)
+        self.populated_graph.add_edge("C", "E")  # (C -> E)
+        self.populated_graph.add_edge("C", "F")  # (C -> F)
+        self.populated_graph.add_edge("A", "F")  # (A -> F)
+
+    def test_init(self):
+        assert not self.graph.key_to_id
+        assert self.graph.num_vertices == 0
+        assert self.graph.is_empty()
+
+    def test_add_vertex(self):
+        self.graph.add_vertex("B")
+        self.graph.add_vertex("A")
+        assert self.graph.num_vertices == 2
+        assert self.graph.key_to_id == {"B": 0, "A": 1}
+
+        # Should avoid adding duplicate
+        assert self.graph.add_vertex("B") is None
+        assert self.graph.num_vertices == 2
+
+    def test_get_vertex(self):
+        self.graph.add_vertex("B")
+        assert self.graph.get_vertex("B").id == "B"
+        assert self.graph.get_vertex("C") is None
+
+    def test_add_edge(self):
+        for key in ["A", "B", "C", "D", "E", "F", "G"]:
+            self.graph.add_vertex(key)
+
+        self.graph.add_edge("A", "B", 10)
+        self.graph.add_edge("A", "C", 5)
+        vertex_a = self.graph.get_vertex("A")
+        vertex_c = self.graph.get_vertex("C")
+
+        assert vertex_a.get_edge_weight("B") == 10
+        assert vertex_c.get_edge_weight("A") == 5
+        assert self.graph.total_edges == 2
+
+        # Re-adding an edge only updates the weight
+        self.graph.add_edge("C", "A", 7)
+        assert vertex_a.get_edge_weight("C") == 7
+        assert vertex_c.neighbors == {"A": 7}
+        assert self.graph.total_edges == 2
+
+        # Test for bad inputs
+        assert self.graph.add_edge("O", "B", 12) is None
+        assert self.graph.add_edge("A", "A") is None
+
+        # Weights are stored as integers, so other costs are turned away
+        assert self.graph.add_edge("B", "C", 1.5) is None
+        assert "C" not in self.graph.get_vertex("B").get_neighbors()
+        assert self.graph.total_edges == 2
+
+        # Made vertex A have 5 edges / neighbor
+        self.graph.add_edge("A", "D", 11)
+        self.graph.add_edge("A", "E", 12)
+        self.graph.add_edge("A", "F", 45)
+        assert self.graph.add_edge("A", "G") is None
+        assert "G" not in vertex_a.get_neighbors()
+        assert len(vertex_a.get_neighbors()) == 5
+
+        # A is at the cap, but its existing edges still take new weights, buffered or merged
+        self.graph.add_edge("F", "A", 46)
+        assert vertex_a.get_edge_weight("F") == 46
+        self.graph._compact()
+        self.graph.add_edge("A", "B", 13)
+        assert vertex_a.get_edge_weight("B") == 13
+        assert self.graph.get_vertex("B").get_edge_weight("A") == 13
+        assert self.graph.total_edges == 5
+
+    def test_get_edges(self):
+        self.graph.add_vertex("B")
+        self.graph.add_vertex("A")
+        self.graph.add_vertex("C")
+
+        self.graph.add_edge("A", "B", 10)
+        self.graph.add_edge("A", "C", 5)
+        self.graph.add_edge("B", "C", 10)
+
+        edges_set = self.graph.get_edges()
+
+        assert len(edges_set) == 3
+        assert ("B", "A", 10) in edges_set
+        assert ("A", "C", 5) in edges_set
+        assert ("B", "C", 10) in edges_set
+
+    def test_iter_edges(self):
+        edges = list(self.populated_graph.iter_edges())
+        assert len(edges) == self.populated_graph.num_edges() == 7
+        assert set(edges) == self.populated_graph.get_edges()
+        assert edges[0] == ("A", "B", 0)
+
+        assert self.populated_graph.degree("C") == 5
+        assert self.populated_graph.degree("G") == 0
+        assert self.populated_graph.degree("R") is None
+
+        # Rows of the merged adjacency are sorted by id
+        offsets, targets, weights = self.populated_graph.adjacency()
+        assert list(targets[offsets[2]:offsets[3]]) == [0, 1, 3, 4, 5]
+        assert len(weights) == len(targets) == 14
+
+    def test_bfs(self):
+        assert self.populated_graph.breadth_first_search_length('R', 1) is None
+
+        vertex_array = self.populated_graph.breadth_first_search_length("A", 2)
+        assert sorted(vertex.id for vertex in vertex_array) == ['D', 'E']
+
+        assert self.populated_graph.breadth_first_search_length('A', 3) == []
+
+    def test_bfs_path(self):
+        shortest_path = [x.id for x in self.populated_graph.find_path_bfs('A', 'D')]
+        assert shortest_path == ['A', 'C', 'D']
+
+        assert self.populated_graph.find_path_bfs('A', 'Z') is None
+
+        self.populated_graph.add_vertex('Q')
+        assert self.populated_graph.find_path_bfs('A', 'Q') is None
+
+    def test_compaction(self):
+        # Push enough edges through to force several merges into the arrays
+        self.graph.COMPACT_MIN = 4
+        self.graph.max_degree = None
+
+        for index in range(200):
+            self.graph.add_vertex(str(index))
+
+        for index in range(1, 200):
+            for step in (1, 7):
+                if index - step >= 0:
+                    self.graph.add_edge(str(index), str(index - step), index)
+
+        assert self.graph.total_edges == len(self.graph.get_edges())
+        assert len(self.graph.targets) == 2 * self.graph.total_edges
+
+        for index in range(200):
+            start, end = self.graph.offsets[index], self.graph.offsets[index + 1]
+            row = list(self.graph.targets[start:end])
+            assert row == sorted(row)
+
+        # 199 = 28 * 7 + 3 * 1, so the shortest path takes 31 edges
+        path = self.graph.find_path_bfs('0', '199')
+        assert len(path) == 32
+
+
+    def test_bfs_path_bidirectional(self):
+        shortest_path = [x.id for x in self.populated_graph.find_path_bfs('A', 'D', bidirectional=True)]
+        assert shortest_path == ['A', 'C', 'D']
+
+        self.populated_graph.add_vertex('Q')
+        assert self.populated_graph.find_path_bfs('A', 'Q', bidirectional=True) is None
+
+        self.graph.max_degree = None
+        for index in range(200):
+            self.graph.add_vertex(str(index))
+        for index in range(1, 200):
+            self.graph.add_edge(str(index), str(index - 1))
+            if index >= 7:
+                self.graph.add_edge(str(index), str(index - 7))
+
+        path = self.graph.find_path_bfs('0', '199', bidirectional=True)
+        assert len(path) == 32
+        for curr, after in zip(path, path[1:]):
+            assert after.id in curr.get_neighbors()
+
+    def test_bulk_build(self):
+        report = self.graph.add_vertices_from(["A", "B", "C", "D", "E", "F", "G", "A"])
+        assert report.added == 7
+        assert report.rejected == [("A", 'duplicate vertex')]
+
+        report = self.graph.add_edges_from([
+            ("A", "B", 10),
+            ("A", "A"),
+            ("A", "Z"),
+            ("B", "A", 3),
+            ("A", "C"),
+            ("A", "D"),
+            ("A", "E"),
+            ("A", "F"),
+            ("A", "G"),
+        ])
+
+        assert report.added == 5
+        assert report.reasons() == {'self-loop': 1, 'unknown vertex': 1, 'duplicate edge': 1, 'degree cap': 1}
+        assert self.graph.total_edges == 5
+        assert not self.graph._pending
+        assert self.graph.get_vertex("B").neighbors == {"A": 10}
+
+        # Edges already merged into the arrays are duplicates too
+        report = self.graph.add_edges_from([("C", "A"), ("C", "D")])
+        assert report.added == 1
+        assert report.rejected == [(("C", "A"), 'duplicate edge')]
+
+        report = self.graph.add_edges_from([("C", "E", 2.5), ("D", "E", "3")])
+        assert report.added == 0
+        assert report.reasons() == {'non-integer cost': 2}
+        assert self.graph.get_vertex("E").neighbors == {"A": 0}
+
+        shortest_path = [x.id for x in self.graph.find_path_bfs('B', 'D')]
+        assert shortest_path == ['B', 'A', 'D']
+
+    def test_batches(self):
+        queries = ["A", "B", "R", "D"]
+        results = self.populated_graph.breadth_first_search_length_batch(queries, 2)
+
+        assert results[2] is None
+        assert sorted(x.id for x in results[0]) == ['D', 'E']
+        assert sorted(x.id for x in results[3]) == ['A', 'B', 'E', 'F']
+
+        self.populated_graph.add_vertex('Q')
+        results = self.populated_graph.find_path_bfs_batch([('A', 'D'), ('B', 'B'), ('A', 'Q'), ('A', 'Z')])
+
+        assert [x.id for x in results[0]] == ['A', 'C', 'D']
+        assert [x.id for x in results[1]] == ['B']
+        assert results[2] is None
+        assert results[3] is None
+
+    def test_bfs_levels(self):
+        modes = [False, True] if numpy is not None else [False]
+
+        for use_numpy in modes:
+            levels = self.populated_graph.bfs_levels('A', use_numpy=use_numpy)
+
+            assert sorted(levels.k_hop(1)) == ['B', 'C', 'F']
+            assert sorted(levels.k_hop(2)) == ['D', 'E']
+            assert levels.k_hop(3) == []
+            assert levels.distance[self.populated_graph.key_to_id['G']] == -1
+            assert levels.path_to('D') == ['A', 'C', 'D']
+            assert levels.path_to('G') is None
+
+            # Stopping early leaves the far vertices unvisited
+            levels = self.populated_graph.bfs_levels('A', max_depth=1, use_numpy=use_numpy)
+            assert levels.distance[self.populated_graph.key_to_id['D']] == -1
+            assert len(levels.levels) == 2
+
+        assert self.populated_graph.bfs_levels('R') is None
+
+    def test_bfs_levels_match_bfs(self):
+        self.graph.max_degree = None
+        for index in range(300):
+            self.graph.add_vertex(str(index))
+        for index in range(1, 300):
+            self.graph.add_edge(str(index), str((index * 7) % index if index > 1 else 0))
+            self.graph.add_edge(str(index), str(index // 3))
+
+        modes = [False, True] if numpy is not None else [False]
+
+        for use_numpy in modes:
+            levels = self.graph.bfs_levels('0', use_numpy=use_numpy)
+            for length in range(1, 8):
+                single = self.graph.breadth_first_search_length('0', length)
+                assert sorted(levels.k_hop(length)) == sorted(x.id for x in single)
+
+            path = levels.path_to('299')
+            assert len(path) == len(self.graph.find_path_bfs('0', '299'))
+
+    def test_from_graph(self):
+        graph = Graph()
+        for key in ["A", "B", "C"]:
+            graph.add_vertex(key)
+        graph.add_edge("A", "B", 3)
+        graph.add_edge("B", "C", 4)
+
+        csr = CSRGraph.from_graph(graph)
+        assert csr.num_vertices == 3
+        assert csr.get_edges() == graph.get_edges()
+
+        # Float costs can't be stored, so the conversion fails unless the costs are dropped
+        graph.add_edge("A", "C", 0.5)
+        with self.assertRaises(ValueError):
+            CSRGraph.from_graph(graph)
+
+        csr = CSRGraph.from_graph(graph, weights=False)
+        assert csr.total_edges == 3
+        assert csr.get_edges() == {(from_vert, to_vert, 0) for from_vert, to_vert, _ in graph.get_edges()}
+
+    def test_traversal_stats(self):
+        assert self.populated_graph.traversal_stats is None
+
+        calls = []
+        recorder = self.populated_graph.enable_stats(callback=calls.append)
+
+        # Only A is expanded, its neighbors B, C and F are already at the length
+        self.populated_graph.breadth_first_search_length("A", 1)
+        stats = recorder.last()
+        assert stats.method == 'breadth_first_search_length'
+        assert stats.dequeued == 1
+        assert stats.edges_scanned == 3
+        assert stats.visited == 4
+        assert calls == [stats]
+
+        # Both path searches are recorded under the same method
+        self.populated_graph.find_path_bfs("A", "E", bidirectional=False)
+        assert recorder.last().dequeued == 3
+        self.populated_graph.find_path_bfs("A", "E", bidirectional=True)
+        assert recorder.last().dequeued == 2
+        assert recorder.last().visited == 6
+        assert recorder.totals['find_path_bfs']['calls'] == 2
+
+        # Every level is expanded, the last one finding nothing new
+        for use_numpy in (False, True) if numpy is not None else (False,):
+            self.populated_graph.bfs_levels("A", use_numpy=use_numpy)
+            stats = recorder.last()
+            assert stats.method == 'bfs_levels'
+            assert (stats.dequeued, stats.edges_scanned, stats.peak_frontier, stats.visited) == (6, 14, 3, 6)
+
+        # but the deepest level isn't when max_depth stops the search
+        self.populated_graph.bfs_levels("A", max_depth=1)
+        assert (recorder.last().dequeued, recorder.last().visited) == (1, 4)
+
+        self.populated_graph.breadth_first_search_length_batch(["A", "D"], 1)
+        assert recorder.last().method == 'breadth_first_search_length_batch'
+        self.populated_graph.find_path_bfs_batch([("A", "E"), ("D", "F")])
+        assert recorder.last().method == 'find_path_bfs_batch'
+        assert recorder.last().visited == 6
+
+        assert 'traversal_stats' in self.populated_graph.memory_usage(deep=False)['structures']
+
+        assert len(calls) == len(recorder.calls)
+        self.populated_graph.disable_stats()
+        self.populated_graph.find_path_bfs("B", "D")
+        assert len(calls) == len(recorder.calls)
+
+    def test_memory_usage(self):
+        shallow = self.populated_graph.memory_usage(deep=False)
+        assert set(shallow['structures']) == {'keys_list', 'key_to_id', 'offsets', 'targets',
+                                              'weights', 'degrees', 'pending'}
+        assert shallow['total'] == sum(shallow['structures'].values())
+        assert shallow['per_edge'] == shallow['total'] / 7
+
+        report = self.populated_graph.memory_usage()
+        assert report['structures']['keys'] > 0
+        assert report['total'] > shallow['total']
+
+        # The arrays take far less than the dictionaries of a graph.Graph
+        graph = Graph()
+        for key in ["A", "B", "C", "D", "E", "F", "G"]:
+            graph.add_vertex(key)
+        for from_vert, to_vert, _ in self.populated_graph.iter_edges():
+            graph.add_edge(from_vert, to_vert)
+        assert graph.memory_usage()['total'] > report['total']
+
+        assert self.graph.memory_usage()['per_vertex'] == 0.0
@@ -1,4 +1,10 @@
-from linked_queue import LinkedQueue
+from array_queue import ArrayQueue
+from build_report import BuildReport
+from memory_report import adjacency_usage, memory_report, structure_size
+from multi_source_bfs import multi_source_bfs, query_indexes
+from query_cache import QueryCache
+from traversal_stats import TraversalRecorder
+from union_find import UnionFind
 
 """ 
 Vertex Class
@@ -17,6 +23,7 @@ class Vertex(object):
         """
         self.id = vertex
         self.neighbors = {}
+        self.index = None  # Order the vertex was added to its graph in
 
     def add_neighbor(self, vertex, weight=0):
         """
@@ -54,11 +61,25 @@ class Vertex(object):
 # This is an undirected graph
 
 class Graph:
+
+    # Most friends a vertex may have
+    MAX_NEIGHBORS = 5
+
+    # Graphs with at least this many vertices use bidirectional search in find_path_bfs by default
+    BIDIRECTIONAL_MIN_VERTICES = 1000
+
+    # Most queries answered by one multi-source BFS, one bit of a 64 bit mask each
+    BATCH_SIZE = 64
+
     def __init__(self):
         """ initializes a graph object with an empty dictionary."""
         self.vertices_dict = {}
         self.num_vertices = 0
         self.total_edges = 0  # Number of all unique edges
+        self.generation = 0  # Bumped by every change, so cached query results can tell they are stale
+        self.query_cache = None  # QueryCache in front of the k-hop and path queries, if enabled
+        self.components = UnionFind()  # Connected components, kept up to date as vertices and edges are added
+        self.traversal_stats = None  # TraversalRecorder of the breadth first searches, if enabled
 
     def __iter__(self):
         """iterate over the vertex objects in the
@@ -76,9 +97,12 @@ class Graph:
             return
 
         new_vertex = Vertex(key)
+        new_vertex.index = self.num_vertices
 
         self.vertices_dict[key] = new_vertex
         self.num_vertices += 1
+        self.generation += 1
+        self.components.add(key)
 
         return new_vertex
 
@@ -104,11 +128,18 @@ class Graph:
             print('{} or {} are not in dictionary of vertices'.format(from_vert, to_vert))
             return
 
-        elif len(self.vertices_dict[from_vert].get_neighbors()) >= 5:
+        # Re-adding an existing edge only updates its cost, it isn't counted again
+        elif to_vert in self.vertices_dict[from_vert].neighbors:
+            self.vertices_dict[from_vert].add_neighbor(to_vert, cost)
+            self.vertices_dict[to_vert].add_neighbor(from_vert, cost)
+            self.generation += 1
+            return
+
+        elif len(self.vertices_dict[from_vert].get_neighbors()) >= self.MAX_NEIGHBORS:
             print('{} is too popular already'.format(from_vert))
             return
 
-        elif len(self.vertices_dict[to_vert].get_neighbors()) >= 5:
+        elif len(self.vertices_dict[to_vert].get_neighbors()) >= self.MAX_NEIGHBORS:
             print('{} is too popular already'.format(to_vert))
             return
 
@@ -119,6 +150,91 @@ class Graph:
         neighbor_vertex.add_neighbor(from_vert, cost)
 
         self.total_edges += 1
+        self.generation += 1
+        self.components.union(from_vert, to_vert)
+
+    def add_vertices_from(self, keys):
+        """
+        Add a vertex for every key of the given iterable or NumPy array without printing,
+        and return a BuildReport listing the duplicate keys that were skipped
+        Runtime: O(n) where n is the number of keys
+        """
+        report = BuildReport()
+
+        if hasattr(keys, 'tolist'):  # NumPy arrays
+            keys = keys.tolist()
+
+        for key in keys:
+            if key in self.vertices_dict:
+                report.reject(key, 'duplicate vertex')
+                continue
+
+            new_vertex = Vertex(key)
+            new_vertex.index = self.num_vertices + report.added
+
+            self.vertices_dict[key] = new_vertex
+            self.components.add(key)
+            report.added += 1
+
+        self.num_vertices += report.added
+        self.generation += 1
+
+        return report
+
+    def add_edges_from(self, edges):
+        """
+        Add every (from, to) or (from, to, cost) edge of the given iterable or NumPy array without printing.
+        All the edges are validated in one pass before the adjacency is built, and the self-loops,
+        unknown vertices, duplicates and degree cap violations are returned in a BuildReport.
+        Runtime: O(n) where n is the number of edges
+        """
+        report = BuildReport()
+
+        if hasattr(edges, 'tolist'):  # NumPy arrays
+            edges = edges.tolist()
+
+        vertices_dict = self.vertices_dict
+        degrees = {}  # Degree of every touched vertex once the accepted edges are added
+        accepted = {}  # (from, to) -> cost of the edges that passed validation
+
+        for edge in edges:
+            from_vert, to_vert = edge[0], edge[1]
+
+            if from_vert == to_vert:
+                report.reject(edge, 'self-loop')
+                continue
+
+            elif from_vert not in vertices_dict or to_vert not in vertices_dict:
+                report.reject(edge, 'unknown vertex')
+                continue
+
+            elif to_vert in vertices_dict[from_vert].neighbors or (from_vert, to_vert) in accepted \
+                    or (to_vert, from_vert) in accepted:
+                report.reject(edge, 'duplicate edge')
+                continue
+
+            from_degree = degrees.get(from_vert, len(vertices_dict[from_vert].neighbors))
+            to_degree = degrees.get(to_vert, len(vertices_dict[to_vert].neighbors))
+
+            if from_degree >= self.MAX_NEIGHBORS or to_degree >= self.MAX_NEIGHBORS:
+                report.reject(edge, 'degree cap')
+                continue
+
+            degrees[from_vert] = from_degree + 1
+            degrees[to_vert] = to_degree + 1
+            accepted[(from_vert, to_vert)] = edge[2] if len(edge) > 2 else 0
+
+        # Build the adjacency in one shot
+        for (from_vert, to_vert), cost in accepted.items():
+            vertices_dict[from_vert].neighbors[to_vert] = cost
+            vertices_dict[to_vert].neighbors[from_vert] = cost
+            self.components.union(from_vert, to_vert)
+
+        report.added = len(accepted)
+        self.total_edges += report.added
+        self.generation += 1
+
+        return report
 
     def get_vertices(self):
         """
@@ -130,28 +246,133 @@ class Graph:
     def get_edges(self):
         """
         Return a set of all unique the edges in the graph
-        Runtime: O(V*E) where V is the number of vertices and E is the number of edges for a vertex
+        Runtime: O(V + E)
+        """
+        return set(self.iter_edges())
+
+    def iter_edges(self):
+        """
+        Generate every edge of the graph once as a (from_vertex, to_vertex, weight) tuple,
+        from the vertex that was added first, without building any collection
+        Runtime: O(V + E), O(1) memory
         """
-        # Store a tuple ( from_vertex, to_vertex, weight)
-        unique_edges = set()
+        vertices_dict = self.vertices_dict
 
         for vertex in self:
-            for neighbor in vertex.get_neighbors():
-                curr_edge = (vertex.id, neighbor, vertex.neighbors[neighbor])
-                reversed_edge = (neighbor, vertex.id, vertex.neighbors[neighbor])
+            for neighbor, weight in vertex.neighbors.items():
+                # Each undirected edge is stored on both ends, keep the one from the older vertex
+                if vertex.index < vertices_dict[neighbor].index:
+                    yield vertex.id, neighbor, weight
 
-                if reversed_edge in unique_edges:
-                    pass
-                else:
-                    unique_edges.add(curr_edge)
+    def num_edges(self):
+        """
+        Return the number of unique edges in the graph
+        Runtime: O(1)
+        """
+        return self.total_edges
 
-        return unique_edges
+    def degree(self, key):
+        """
+        Return the number of neighbors of the vertex, or None if it doesn't exist
+        Runtime: O(1)
+        """
+        vertex = self.vertices_dict.get(key)
+        return len(vertex.neighbors) if vertex is not None else None
 
     def is_empty(self):
         """Return true if the graph doesn't have any vertices"""
         return len(self.get_vertices()) is 0
 
+    def memory_usage(self, deep=True, sample=None):
+        """
+        Return a report of the bytes the graph uses by structure, with the total and the
+        per vertex and per edge averages, as described in memory_report.memory_report.
+        The structures are those of memory_report.adjacency_usage, the components, and the
+        query cache with its estimated results and the traversal recorder when enabled.
+        deep: measure the vertex objects, key strings and weights too, not only the tables
+        sample: number of vertices to measure and scale up from, None to measure all of them
+        Runtime: O(V + E), or O(V + sample * d) when sampling
+        """
+        sizes = adjacency_usage(self.vertices_dict, 'id', deep, sample)
+        sizes['components'] = structure_size(self.components)
+
+        if self.query_cache is not None:
+            sizes['query_cache'] = structure_size(self.query_cache) + self.query_cache.bytes
+
+        if self.traversal_stats is not None:
+            sizes['traversal_stats'] = structure_size(self.traversal_stats)
+
+        return memory_report(sizes, self.num_vertices, self.total_edges, deep, sample)
+
+    @property
+    def num_components(self):
+        """Return the number of connected components"""
+        return self.components.num_components
+
+    def connected(self, from_vert, to_vert):
+        """
+        Return True if there's a path between the two vertices
+        Runtime: O(α(V)) amortized, no traversal needed
+        """
+        if from_vert not in self.vertices_dict or to_vert not in self.vertices_dict:
+            return False
+
+        return self.components.connected(from_vert, to_vert)
+
+    def component_of(self, key):
+        """
+        Return the representative vertex key of the component the vertex is in, or None.
+        Two vertices are connected when their components have the same representative.
+        Runtime: O(α(V)) amortized
+        """
+        return self.components.find(key) if key in self.vertices_dict else None
+
+    def component_sizes(self):
+        """
+        Return a dictionary of representative vertex key -> number of vertices in its component
+        Runtime: O(c) where c is the number of components
+        """
+        return self.components.component_sizes()
+
+    def enable_cache(self, max_entries=1024, ttl=None, max_bytes=None):
+        """
+        Cache the results of breadth_first_search_length and find_path_bfs in a bounded
+        least recently used QueryCache, and return the cache to read its statistics.
+        Results are dropped as soon as the graph changes.
+        """
+        self.query_cache = QueryCache(max_entries, ttl, max_bytes)
+        return self.query_cache
+
+    def disable_cache(self):
+        """Stop caching query results"""
+        self.query_cache = None
+
+    def enable_stats(self, callback=None, keep=1000):
+        """
+        Count the vertices, edges, frontier size, visited map size and wall time of every
+        breadth first search, and return the TraversalRecorder holding them.
+        Results served from the query cache don't search, so they aren't recorded.
+        callback: function called with the TraversalStats of every finished search
+        """
+        self.traversal_stats = TraversalRecorder(callback, keep)
+        return self.traversal_stats
+
+    def disable_stats(self):
+        """Stop counting the breadth first searches"""
+        self.traversal_stats = None
+
     def breadth_first_search_length(self, vertex, length):
+        """
+        Perform breadth first search and return all nodes that met
+        the require length from the inputted vertex.
+        Runtime: O(V + E), O(1) when the result is cached
+        """
+        if self.query_cache is not None:
+            return self._cached_query(('k-hop', vertex, length), self._breadth_first_search_length, vertex, length)
+
+        return self._breadth_first_search_length(vertex, length)
+
+    def _breadth_first_search_length(self, vertex, length):
         """
         Perform breadth first search and return all nodes that met
         the require length from the inputted vertex.
@@ -163,13 +384,15 @@ class Graph:
         vertices = []
 
         # Create queue to store nodes not yet traversed in level-order
-        queue = LinkedQueue()
+        queue = ArrayQueue()
 
         # Enqueue given starting node and a length of 0
         queue.enqueue((self.vertices_dict[vertex], 0))  # Queue = [(vertex, length), ... ]
 
         visited_dict = {self.vertices_dict[vertex].id: 0}  # A dictionary to keep track of the visited vertices
 
+        stats = self.traversal_stats.start('breadth_first_search_length') if self.traversal_stats else None
+
         while not queue.is_empty():
 
             value = queue.dequeue()  # curr_vertex = (Vertex, length)
@@ -181,6 +404,9 @@ class Graph:
             if vertex_length > length:
                 break
 
+            if stats is not None:
+                stats.expand(curr_vertex.neighbors, len(queue) + 1)
+
             for neighbor in curr_vertex.get_neighbors():
                 if neighbor not in visited_dict:
 
@@ -194,9 +420,25 @@ class Graph:
                     # Add the neighbor to the visited dictionary
                     visited_dict[new_value[0].id] = new_value[1]
 
+        if stats is not None:
+            self.traversal_stats.finish(stats, len(visited_dict))
+
         return vertices
 
-    def find_path_bfs(self, from_vert, to_vert):  # Algorithm from Wikipedia and The Coding Train help understand it
+    def find_path_bfs(self, from_vert, to_vert, bidirectional=None):
+        """
+        Return a list of vertex that represent a path from one vertex to another
+        bidirectional: True to grow frontiers from both ends, False to search from from_vert only,
+                       None to pick bidirectional once the graph reaches BIDIRECTIONAL_MIN_VERTICES
+        Runtime: O(V + E), O(1) when the result is cached
+        """
+        if self.query_cache is not None:
+            return self._cached_query(('path', from_vert, to_vert, bidirectional), self._find_path_bfs,
+                                      from_vert, to_vert, bidirectional)
+
+        return self._find_path_bfs(from_vert, to_vert, bidirectional)
+
+    def _find_path_bfs(self, from_vert, to_vert, bidirectional):  # Algorithm from Wikipedia and The Coding Train help understand it
         """
         Return a list of vertex that represent a path from one vertex to another
         Runtime: O(V + E)
@@ -209,12 +451,24 @@ class Graph:
             print('Both from vertex and to vertex are the same')
             return [self.vertices_dict[from_vert]]
 
-        queue = LinkedQueue()
+        # Cover case for disjointed graph without searching anything
+        elif not self.components.connected(from_vert, to_vert):
+            return
+
+        if bidirectional is None:
+            bidirectional = self.num_vertices >= self.BIDIRECTIONAL_MIN_VERTICES
+
+        if bidirectional:
+            return self._find_path_bidirectional(from_vert, to_vert)
+
+        queue = ArrayQueue()
         queue.enqueue((self.vertices_dict[from_vert], 0))   # Enqueue the from vertex
 
         # A dictionary to keep track of the visited vertices along with their predecessor
         visited_dict = {self.vertices_dict[from_vert].id: None}
 
+        stats = self.traversal_stats.start('find_path_bfs') if self.traversal_stats else None
+
         while not queue.is_empty():
 
             value = queue.dequeue()  # curr_vertex = (Vertex, length)
@@ -224,6 +478,9 @@ class Graph:
             if curr_vertex.id == to_vert:
                 break
 
+            if stats is not None:
+                stats.expand(curr_vertex.neighbors, len(queue) + 1)
+
             for neighbor in curr_vertex.get_neighbors():
                 if neighbor not in visited_dict:
                     # Enqueue the neighbor with an incremented length
@@ -233,6 +490,9 @@ class Graph:
                     # Add the neighbor to the visited dictionary
                     visited_dict[new_value[0].id] = new_value[1]
 
+        if stats is not None:
+            self.traversal_stats.finish(stats, len(visited_dict))
+
         # If unable to find the path
         if to_vert not in visited_dict:
             return
@@ -249,6 +509,200 @@ class Graph:
 
         return path
 
+    def breadth_first_search_length_batch(self, vertices, length):
+        """
+        Return a list with the result of breadth_first_search_length(vertex, length) for every
+        given vertex, sharing the frontier expansion between up to BATCH_SIZE queries at a time.
+        Each result holds the same vertices as the single query, possibly in another order.
+        Runtime: O(V + E) per batch of queries
+        """
+        results = [None] * len(vertices)
+
+        for start in range(0, len(vertices), self.BATCH_SIZE):
+            # Queries with an unknown starting vertex keep their None result
+            indexes = [index for index in range(start, min(start + self.BATCH_SIZE, len(vertices)))
+                       if vertices[index] in self.vertices_dict]
+
+            for index in indexes:
+                results[index] = []
+
+            if length < 1 or not indexes:
+                continue
+
+            def visit(key, bits, parent, depth):
+                if depth == length:
+                    for query in query_indexes(bits):
+                        results[indexes[query]].append(self.vertices_dict[key])
+                return 0
+
+            stats = self.traversal_stats.start('breadth_first_search_length_batch') if self.traversal_stats else None
+
+            visited = multi_source_bfs([vertices[index] for index in indexes], self._neighbor_keys, visit,
+                                       max_depth=length, stats=stats)
+
+            if stats is not None:
+                self.traversal_stats.finish(stats, visited)
+
+        return results
+
+    def find_path_bfs_batch(self, pairs):
+        """
+        Return a list with a shortest path for every given (from, to) pair, like find_path_bfs
+        but without printing, sharing the frontier expansion between up to BATCH_SIZE queries at a time.
+        Each path has the same length as the one find_path_bfs returns, though another path
+        of that length may be picked when there are ties.
+        Runtime: O(V + E) per batch of queries
+        """
+        results = [None] * len(pairs)
+
+        for start in range(0, len(pairs), self.BATCH_SIZE):
+            indexes = []
+
+            for index in range(start, min(start + self.BATCH_SIZE, len(pairs))):
+                from_vert, to_vert = pairs[index]
+
+                if from_vert not in self.vertices_dict or to_vert not in self.vertices_dict:
+                    continue
+
+                elif from_vert == to_vert:
+                    results[index] = [self.vertices_dict[from_vert]]
+
+                elif self.components.connected(from_vert, to_vert):
+                    indexes.append(index)
+
+            if not indexes:
+                continue
+
+            # A dictionary per query to keep track of the visited vertices along with their predecessor
+            parents = [{pairs[index][0]: None} for index in indexes]
+
+            def visit(key, bits, parent, depth):
+                finished = 0
+                for query in query_indexes(bits):
+                    parents[query][key] = parent
+                    if key == pairs[indexes[query]][1]:
+                        finished |= 1 << query
+                return finished
+
+            stats = self.traversal_stats.start('find_path_bfs_batch') if self.traversal_stats else None
+
+            visited = multi_source_bfs([pairs[index][0] for index in indexes], self._neighbor_keys, visit, stats=stats)
+
+            if stats is not None:
+                self.traversal_stats.finish(stats, visited)
+
+            for query, index in enumerate(indexes):
+                to_vert = pairs[index][1]
+
+                # If unable to find the path
+                if to_vert not in parents[query]:
+                    continue
+
+                path = []
+                key = to_vert
+                while key is not None:
+                    path.append(self.vertices_dict[key])
+                    key = parents[query][key]
+
+                path.reverse()
+                results[index] = path
+
+        return results
+
+    def _cached_query(self, key, query, *args):
+        """
+        Return the cached result of the query for the current generation of the graph,
+        or run the query and cache its result
+        """
+        hit, result = self.query_cache.get(key, self.generation)
+
+        if not hit:
+            result = query(*args)
+            self.query_cache.put(key, self.generation, result)
+
+        # Hand out copies so callers can't change the cached list
+        return list(result) if result is not None else None
+
+    def _neighbor_keys(self, key):
+        """Return the keys of the neighbors of the vertex with the given key"""
+        return self.vertices_dict[key].neighbors
+
+    def _find_path_bidirectional(self, from_vert, to_vert):
+        """
+        Return a list of vertex that represent a shortest path from one vertex to another,
+        growing one frontier from each end and always expanding the smaller one.
+        Runtime: O(V + E), but usually only explores around the two ends
+        """
+        # Predecessor of every vertex reached from from_vert, and successor of every vertex reached from to_vert
+        forward_dict = {from_vert: None}
+        backward_dict = {to_vert: None}
+
+        forward_frontier = [from_vert]
+        backward_frontier = [to_vert]
+        meeting = None
+
+        stats = self.traversal_stats.start('find_path_bfs') if self.traversal_stats else None
+
+        while forward_frontier and backward_frontier and meeting is None:
+            if stats is not None:
+                self._count_frontiers(stats, forward_frontier, backward_frontier)
+
+            if len(forward_frontier) <= len(backward_frontier):
+                forward_frontier, meeting = self._expand_frontier(forward_frontier, forward_dict, backward_dict)
+            else:
+                backward_frontier, meeting = self._expand_frontier(backward_frontier, backward_dict, forward_dict)
+
+        if stats is not None:
+            self.traversal_stats.finish(stats, len(forward_dict) + len(backward_dict))
+
+        # If unable to find the path
+        if meeting is None:
+            return
+
+        # Stitch the two halves together at the meeting vertex
+        path = []
+        key = meeting
+        while key is not None:
+            path.append(self.vertices_dict[key])
+            key = forward_dict[key]
+
+        path.reverse()
+
+        key = backward_dict[meeting]
+        while key is not None:
+            path.append(self.vertices_dict[key])
+            key = backward_dict[key]
+
+        return path
+
+    def _expand_frontier(self, frontier, visited_dict, other_dict):
+        """
+        Visit every unvisited neighbor of the frontier one level out, and return the new frontier
+        along with the first vertex the other search has already visited, if any.
+        Runtime: O(E) of the frontier
+        """
+        next_frontier = []
+
+        for key in frontier:
+            for neighbor in self.vertices_dict[key].get_neighbors():
+                if neighbor not in visited_dict:
+                    visited_dict[neighbor] = key
+
+                    if neighbor in other_dict:
+                        return next_frontier, neighbor
+
+                    next_frontier.append(neighbor)
+
+        return next_frontier, None
+
+    def _count_frontiers(self, stats, forward_frontier, backward_frontier):
+        """Count the smaller of the two frontiers, the one about to be expanded, into the traversal stats"""
+        frontier = min(forward_frontier, backward_frontier, key=len)
+
+        stats.dequeued += len(frontier)
+        stats.edges_scanned += sum(len(self.vertices_dict[key].neighbors) for key in frontier)
+        stats.peak_frontier = max(stats.peak_frontier, len(forward_frontier) + len(backward_frontier))
+
 # Driver code
 
 
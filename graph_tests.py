@@ -1,4 +1,6 @@
 from graph import Graph, Vertex
+from traversal_stats import instrument
+import sys
 import unittest
 
 
@@ -205,3 +207,303 @@ class GraphTests(unittest.TestCase):
         # Add disjointed vertices
         self.populated_graph.add_vertex('Q')
         assert self.populated_graph.find_path_bfs('A', 'Q') is None
+
+    def test_bfs_path_bidirectional(self):
+        shortest_path = [x.id for x in self.populated_graph.find_path_bfs('A', 'D', bidirectional=True)]
+        assert shortest_path == ['A', 'C', 'D']
+
+        shortest_path = [x.id for x in self.populated_graph.find_path_bfs('D', 'B', bidirectional=True)]
+        assert shortest_path == ['D', 'C', 'B']
+
+        # Test for disjointed graph and unable to find path
+        self.populated_graph.add_vertex('Q')
+        assert self.populated_graph.find_path_bfs('A', 'Q', bidirectional=True) is None
+
+        # Both searches should agree on the length of the shortest path of a long chain
+        for index in range(50):
+            self.graph.add_vertex(str(index))
+        for index in range(1, 50):
+            self.graph.add_edge(str(index - 1), str(index))
+            if index >= 3:
+                self.graph.add_edge(str(index - 3), str(index))
+
+        single = self.graph.find_path_bfs('0', '49', bidirectional=False)
+        both = self.graph.find_path_bfs('0', '49', bidirectional=True)
+        assert len(single) == len(both) == 18
+        assert both[0].id == '0' and both[-1].id == '49'
+        for curr, after in zip(both, both[1:]):
+            assert after.id in curr.neighbors
+
+    def test_add_vertices_from(self):
+        report = self.graph.add_vertices_from(["A", "B", "A", "C"])
+
+        assert report.added == 3
+        assert report.rejected == [("A", 'duplicate vertex')]
+        assert self.graph.num_vertices == 3
+        assert "C" in self.graph.vertices_dict
+
+    def test_add_edges_from(self):
+        self.graph.add_vertices_from(["A", "B", "C", "D", "E", "F", "G"])
+
+        report = self.graph.add_edges_from([
+            ("A", "B", 10),
+            ("A", "A"),
+            ("A", "Z"),
+            ("B", "A", 3),
+            ("A", "C"),
+            ("A", "D"),
+            ("A", "E"),
+            ("A", "F"),
+            ("A", "G"),
+        ])
+
+        assert report.added == 5
+        assert report.reasons() == {'self-loop': 1, 'unknown vertex': 1, 'duplicate edge': 1, 'degree cap': 1}
+        assert report.rejected[-1] == (("A", "G"), 'degree cap')
+        assert self.graph.total_edges == 5
+
+        vertex_a = self.graph.get_vertex("A")
+        assert vertex_a.get_edge_weight("B") == 10
+        assert self.graph.get_vertex("B").get_edge_weight("A") == 10
+        assert vertex_a.get_edge_weight("C") == 0
+        assert "G" not in vertex_a.neighbors
+
+        # Bulk built graphs answer queries like any other
+        shortest_path = [x.id for x in self.graph.find_path_bfs('B', 'F')]
+        assert shortest_path == ['B', 'A', 'F']
+
+    def test_bfs_batch(self):
+        queries = ["A", "B", "R", "D", "A"]
+        results = self.populated_graph.breadth_first_search_length_batch(queries, 2)
+
+        assert len(results) == len(queries)
+        assert results[2] is None
+
+        for key, result in zip(queries, results):
+            single = self.populated_graph.breadth_first_search_length(key, 2)
+            if single is None:
+                assert result is None
+            else:
+                assert sorted(x.id for x in result) == sorted(x.id for x in single)
+
+        # More queries than fit in one batch
+        self.populated_graph.BATCH_SIZE = 2
+        results = self.populated_graph.breadth_first_search_length_batch(queries, 1)
+        for key, result in zip(queries, results):
+            single = self.populated_graph.breadth_first_search_length(key, 1)
+            assert result == single or sorted(x.id for x in result) == sorted(x.id for x in single)
+
+    def test_bfs_path_batch(self):
+        self.populated_graph.add_vertex('Q')
+        pairs = [('A', 'D'), ('D', 'E'), ('B', 'B'), ('A', 'Z'), ('A', 'Q'), ('F', 'B'), ('E', 'A')]
+        results = self.populated_graph.find_path_bfs_batch(pairs)
+
+        assert [x.id for x in results[0]] == ['A', 'C', 'D']
+        assert [x.id for x in results[1]] == ['D', 'C', 'E']
+        assert [x.id for x in results[2]] == ['B']
+        assert results[3] is None
+        assert results[4] is None
+
+        for (from_vert, to_vert), path in zip(pairs[5:], results[5:]):
+            single = self.populated_graph.find_path_bfs(from_vert, to_vert)
+            assert len(path) == len(single)
+            assert path[0].id == from_vert and path[-1].id == to_vert
+            for curr, after in zip(path, path[1:]):
+                assert after.id in curr.neighbors
+
+    def test_query_cache(self):
+        cache = self.populated_graph.enable_cache(max_entries=2)
+
+        first = self.populated_graph.breadth_first_search_length("A", 2)
+        second = self.populated_graph.breadth_first_search_length("A", 2)
+        assert [x.id for x in first] == [x.id for x in second]
+        assert cache.hits == 1 and cache.misses == 1
+
+        # Callers get their own copy of the result
+        second.append("junk")
+        assert len(self.populated_graph.breadth_first_search_length("A", 2)) == 2
+
+        # Paths are cached too, and the least recently used result is evicted
+        self.populated_graph.find_path_bfs('A', 'D')
+        self.populated_graph.find_path_bfs('B', 'E')
+        assert cache.evictions == 1
+        assert len(cache) == 2
+
+        # Changing the graph makes the cached results stale
+        self.populated_graph.add_vertex("H")
+        self.populated_graph.add_edge("D", "H")
+        path = [x.id for x in self.populated_graph.find_path_bfs('B', 'E')]
+        assert path == ['B', 'C', 'E']
+        assert cache.invalidations == 1
+
+        too_far = self.populated_graph.breadth_first_search_length("A", 3)
+        assert [x.id for x in too_far] == ['H']
+
+        stats = cache.stats()
+        assert stats['hits'] == 2
+        assert stats['entries'] == 2
+
+        self.populated_graph.disable_cache()
+        assert self.populated_graph.query_cache is None
+
+    def test_query_cache_limits(self):
+        now = [0.0]
+        cache = self.populated_graph.enable_cache(ttl=10)
+        cache.clock = lambda: now[0]
+
+        self.populated_graph.breadth_first_search_length("A", 1)
+        now[0] = 5.0
+        self.populated_graph.breadth_first_search_length("A", 1)
+        assert cache.hits == 1
+
+        # Expired results are computed again
+        now[0] = 11.0
+        self.populated_graph.breadth_first_search_length("A", 1)
+        assert cache.hits == 1 and cache.invalidations == 1
+
+        # A memory budget keeps the estimated size of the results in check
+        cache = self.populated_graph.enable_cache(max_bytes=400)
+        for key in ["A", "B", "C", "D", "E", "F"]:
+            self.populated_graph.breadth_first_search_length(key, 1)
+        assert cache.bytes <= 400
+        assert cache.evictions > 0
+
+    def test_traversal_stats(self):
+        assert self.populated_graph.traversal_stats is None
+
+        calls = []
+        recorder = self.populated_graph.enable_stats(callback=calls.append)
+
+        # A, B, C and F are expanded, D and E are queued but beyond the length
+        self.populated_graph.breadth_first_search_length("A", 1)
+        stats = recorder.last()
+        assert stats.method == 'breadth_first_search_length'
+        assert stats.dequeued == 4
+        assert stats.edges_scanned == 12
+        assert stats.peak_frontier == 3
+        assert stats.visited == 6
+        assert stats.seconds >= 0
+        assert calls == [stats]
+
+        # Both path searches are recorded under the same method
+        self.populated_graph.find_path_bfs("A", "E", bidirectional=False)
+        self.populated_graph.find_path_bfs("A", "E", bidirectional=True)
+        assert recorder.last().dequeued == 2
+        assert recorder.last().visited == 6
+        assert recorder.totals['find_path_bfs']['calls'] == 2
+
+        self.populated_graph.find_path_bfs_batch([("A", "E"), ("D", "F")])
+        assert recorder.last().method == 'find_path_bfs_batch'
+        assert recorder.last().visited == 6
+
+        # Cached results don't search
+        self.populated_graph.enable_cache()
+        self.populated_graph.find_path_bfs("B", "D")
+        self.populated_graph.find_path_bfs("B", "D")
+        assert recorder.totals['find_path_bfs']['calls'] == 3
+        self.populated_graph.disable_cache()
+
+        self.populated_graph.disable_stats()
+        self.populated_graph.find_path_bfs("B", "D")
+        assert len(calls) == 5
+
+    def test_instrument(self):
+        with instrument(self.populated_graph) as recorder:
+            self.populated_graph.breadth_first_search_length_batch(["A", "D"], 1)
+            self.populated_graph.find_path_bfs("A", "G")  # Disconnected, answered without searching
+
+        assert self.populated_graph.traversal_stats is None
+        assert len(recorder.calls) == 1
+        assert recorder.last().as_dict()['method'] == 'breadth_first_search_length_batch'
+
+        recorder.reset()
+        assert recorder.last() is None and recorder.totals == {}
+
+    def test_memory_usage(self):
+        report = self.populated_graph.memory_usage()
+        structures = report['structures']
+
+        assert report['deep'] and report['exact']
+        assert report['total'] == sum(structures.values())
+        assert report['per_vertex'] == report['total'] / 7
+        assert report['per_edge'] == report['total'] / 7
+        assert structures['keys'] == 7 * sys.getsizeof('A')
+
+        # Neighbor keys are the vertex key strings, only copies are counted again
+        assert structures['neighbor_keys'] == 0
+        copy = ''.join(['H', 'H'])
+        self.populated_graph.add_vertex('HH')
+        self.populated_graph.add_edge('G', copy)
+        assert self.populated_graph.memory_usage()['structures']['neighbor_keys'] == sys.getsizeof(copy)
+
+        shallow = self.populated_graph.memory_usage(deep=False)
+        assert set(shallow['structures']) == {'vertices_dict', 'neighbors', 'components'}
+        assert shallow['total'] < report['total']
+
+        # Sampling measures some of the vertices and scales them up
+        sampled = self.populated_graph.memory_usage(sample=4)
+        assert not sampled['exact']
+        assert sampled['structures']['vertices_dict'] == shallow['structures']['vertices_dict']
+        assert 0.5 * report['total'] < sampled['total'] < 2 * report['total']
+
+        self.populated_graph.enable_cache()
+        self.populated_graph.find_path_bfs('A', 'E')
+        assert self.populated_graph.memory_usage()['structures']['query_cache'] > 0
+
+        assert self.graph.memory_usage()['per_edge'] == 0.0
+
+    def test_connectivity(self):
+        # G is on its own
+        assert self.populated_graph.num_components == 2
+        assert self.populated_graph.connected("A", "E")
+        assert not self.populated_graph.connected("A", "G")
+        assert not self.populated_graph.connected("A", "R")
+
+        assert self.populated_graph.component_of("B") == self.populated_graph.component_of("F")
+        assert self.populated_graph.component_of("G") == "G"
+        assert self.populated_graph.component_of("R") is None
+        assert sorted(self.populated_graph.component_sizes().values()) == [1, 6]
+
+        # No path without searching anything
+        assert self.populated_graph.find_path_bfs("A", "G") is None
+        assert self.populated_graph.find_path_bfs_batch([("A", "G"), ("A", "B")])[0] is None
+
+        self.populated_graph.add_edge("G", "D")
+        assert self.populated_graph.num_components == 1
+        assert self.populated_graph.connected("A", "G")
+
+        self.populated_graph.add_vertices_from(["H", "I", "J"])
+        self.populated_graph.add_edges_from([("H", "I"), ("I", "J")])
+        assert self.populated_graph.num_components == 2
+        assert self.populated_graph.connected("H", "J")
+        assert not self.populated_graph.connected("H", "A")
+
+    def test_iter_edges(self):
+        edges = list(self.populated_graph.iter_edges())
+
+        # Every edge comes once, from the vertex added first
+        assert edges == [("A", "B", 0), ("A", "C", 0), ("A", "F", 0), ("B", "C", 0),
+                         ("C", "D", 0), ("C", "E", 0), ("C", "F", 0)]
+        assert set(edges) == self.populated_graph.get_edges()
+        assert self.populated_graph.num_edges() == 7
+
+        assert self.populated_graph.degree("C") == 5
+        assert self.populated_graph.degree("G") == 0
+        assert self.populated_graph.degree("R") is None
+
+        # Vertices added in bulk are ordered too
+        self.populated_graph.add_vertices_from(["H", "I"])
+        self.populated_graph.add_edges_from([("I", "H", 3), ("G", "I")])
+        assert list(self.populated_graph.iter_edges())[-2:] == [("G", "I", 0), ("H", "I", 3)]
+
+    def test_add_duplicate_edge(self):
+        # Re-adding an edge only updates its cost
+        self.populated_graph.add_edge("B", "A", 7)
+        assert self.populated_graph.num_edges() == 7
+        assert self.populated_graph.get_vertex("A").get_edge_weight("B") == 7
+        assert ("A", "B", 7) in self.populated_graph.get_edges()
+
+        # Even on a vertex with the most neighbors
+        self.populated_graph.add_edge("C", "D", 2)
+        assert self.populated_graph.get_vertex("D").get_edge_weight("C") == 2
+        assert self.populated_graph.degree("C") == 5
@@ -0,0 +1,330 @@
+import hashlib
+import heapq
+import struct
+from array import array
+
+from array_queue import ArrayQueue
+
+"""
+Landmark distance oracle (ALT: A*, landmarks and the triangle inequality)
+
+A few landmark vertices are picked far apart, and the hop distance from every
+landmark to every vertex is stored. For any landmark L, |d(L, u) - d(L, t)| can
+never exceed d(u, t), so the largest of those differences is a lower bound A*
+can use to head straight for the target instead of searching in every direction.
+
+Saved tables, in the byte order of the machine that wrote them:
+    header       magic, version, fingerprint, #vertices, #edges, #landmarks, key blob size
+    key_lengths  uint32 x V   byte length of every vertex key, in vertex id order
+    key_blob     the UTF-8 vertex keys one after the other, in vertex id order
+    landmarks    uint32 x K   vertex id of every landmark
+    distances    int32 x K*V  hops from landmark i to vertex v at i * V + v, -1 if unreachable
+The fingerprint is a hash of the vertex keys and who is adjacent to whom, so the tables
+load into any graph with the same vertices and edges, also one rebuilt from the same file.
+"""
+
+MAGIC = b'CS22ALT\0'
+VERSION = 2
+HEADER = struct.Struct('=8sH16sQQIQ')
+
+UNREACHABLE = -1
+
+
+class LandmarkOracle(object):
+
+    def __init__(self, graph, num_landmarks=8):
+        """
+        Initialize an oracle over the given Graph, call build() before querying it
+        num_landmarks: how many landmark distance tables to keep, more means tighter bounds
+        """
+        self.graph = graph
+        self.num_landmarks = num_landmarks
+
+        self.keys = []  # vertex id -> key
+        self.key_to_id = {}  # key -> vertex id
+        self.landmarks = []  # vertex ids of the landmarks
+        self.distances = []  # array('i') of hops from each landmark, indexed by vertex id
+
+        # State of the graph the tables were built for
+        self.generation = None
+        self.num_vertices = 0
+        self.num_edges = 0
+
+        self.last_explored = 0  # Vertices settled by the last query
+
+    def __repr__(self):
+        """Return a string representation of this oracle."""
+        return 'LandmarkOracle({} landmarks, {} vertices)'.format(len(self.landmarks), self.num_vertices)
+
+    def build(self):
+        """
+        Pick the landmarks by farthest point selection, each one the vertex farthest
+        from the landmarks so far, and store the distances from every landmark.
+        Vertices no landmark reaches are the farthest of all, so every component gets one.
+        Runtime: O(K(V + E)) for K landmarks
+        """
+        self.keys = list(self.graph.vertices_dict.keys())
+        self.key_to_id = {key: index for index, key in enumerate(self.keys)}
+        self.landmarks = []
+        self.distances = []
+
+        self._record_state()
+
+        if not self.keys:
+            return self
+
+        # Hops to the closest landmark so far, None until one reaches the vertex
+        closest = [None] * len(self.keys)
+
+        # Start from the vertex with the most neighbors, it is central to its component
+        landmark = max(range(len(self.keys)), key=lambda index: len(self._neighbors(index)))
+
+        while len(self.landmarks) < min(self.num_landmarks, len(self.keys)):
+            hops = self._bfs(landmark)
+            self.landmarks.append(landmark)
+            self.distances.append(hops)
+
+            for index, distance in enumerate(hops):
+                if distance != UNREACHABLE and (closest[index] is None or distance < closest[index]):
+                    closest[index] = distance
+
+            landmark = max(range(len(self.keys)),
+                           key=lambda index: float('inf') if closest[index] is None else closest[index])
+
+            if closest[landmark] == 0:
+                break  # Every vertex is a landmark already
+
+        return self
+
+    def is_stale(self):
+        """
+        Return True if the graph changed since the tables were built, by its generation,
+        so even a change that was undone since counts; saved tables are checked by content instead
+        """
+        return (self.generation != self.graph.generation or self.num_vertices != self.graph.num_vertices or
+                self.num_edges != self.graph.total_edges)
+
+    def check_fresh(self):
+        """Raise ValueError if the tables weren't built for the graph as it is now"""
+        if self.generation is None:
+            raise ValueError('Landmark tables were never built')
+
+        if self.is_stale():
+            raise ValueError('Landmark tables are stale: built for generation {} with {} vertices and {} edges, '
+                             'graph is at generation {} with {} vertices and {} edges'.format(
+                                 self.generation, self.num_vertices, self.num_edges,
+                                 self.graph.generation, self.graph.num_vertices, self.graph.total_edges))
+
+    def lower_bound(self, from_vert, to_vert):
+        """
+        Return the most hops the landmarks prove a path between the two vertices needs,
+        or None if a landmark reaches one of them but not the other
+        Runtime: O(K)
+        """
+        self.check_fresh()
+        return self._lower_bound(self.key_to_id[from_vert], self.key_to_id[to_vert])
+
+    def find_path(self, from_vert, to_vert):
+        """
+        Return a list of vertex that represent a shortest path from one vertex to another,
+        or None if there isn't one, found by A* guided by the landmark bounds
+        Runtime: O((V + E) log V) at worst, usually a small part of the graph
+        """
+        self.check_fresh()
+        self.last_explored = 0
+
+        if from_vert not in self.key_to_id or to_vert not in self.key_to_id:
+            return
+
+        source, target = self.key_to_id[from_vert], self.key_to_id[to_vert]
+
+        # Cover case for disjointed graph without searching anything
+        estimate = self._lower_bound(source, target)
+        if estimate is None:
+            return
+
+        # (hops so far + bound left, bound left, vertex id), ties go to the vertex closest to the target
+        heap = [(estimate, estimate, source)]
+        hops = {source: 0}
+        parent = {source: None}
+        settled = set()
+
+        while heap:
+            _, _, curr = heapq.heappop(heap)
+            if curr in settled:
+                continue
+
+            settled.add(curr)
+
+            if curr == target:
+                break
+
+            for neighbor in self._neighbors(curr):
+                new_hops = hops[curr] + 1
+
+                if neighbor not in settled and (neighbor not in hops or new_hops < hops[neighbor]):
+                    bound = self._lower_bound(neighbor, target)
+                    if bound is None:
+                        continue
+
+                    hops[neighbor] = new_hops
+                    parent[neighbor] = curr
+                    heapq.heappush(heap, (new_hops + bound, bound, neighbor))
+
+        self.last_explored = len(settled)
+
+        if target not in settled:
+            return
+
+        path = []
+        curr = target
+        while curr is not None:
+            path.append(self.graph.vertices_dict[self.keys[curr]])
+            curr = parent[curr]
+
+        path.reverse()
+
+        return path
+
+    def distance(self, from_vert, to_vert):
+        """
+        Return the number of hops on a shortest path between the two vertices, or None
+        Runtime: same as find_path
+        """
+        path = self.find_path(from_vert, to_vert)
+        return len(path) - 1 if path is not None else None
+
+    def save(self, path):
+        """
+        Write the landmark tables to a file
+        Runtime: O(KV)
+        """
+        self.check_fresh()
+
+        encoded = [key.encode('utf-8') for key in self.keys]
+        key_blob = b''.join(encoded)
+        header = HEADER.pack(MAGIC, VERSION, self._fingerprint(), self.num_vertices, self.num_edges,
+                             len(self.landmarks), len(key_blob))
+
+        with open(path, 'wb') as file:
+            file.write(header)
+            file.write(array('I', map(len, encoded)).tobytes())
+            file.write(key_blob)
+            file.write(array('I', self.landmarks).tobytes())
+            for hops in self.distances:
+                file.write(hops.tobytes())
+
+    @classmethod
+    def load(cls, graph, path):
+        """
+        Return an oracle over the graph with the tables read from a file,
+        or raise ValueError if the file isn't one or was saved for a graph with other vertices or edges
+        Runtime: O(KV + E)
+        """
+        with open(path, 'rb') as file:
+            data = file.read()
+
+        if len(data) < HEADER.size:
+            raise ValueError('{} is not a landmark table file'.format(path))
+
+        magic, version, fingerprint, num_vertices, num_edges, num_landmarks, blob_size = HEADER.unpack_from(data)
+
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('{} is not a version {} landmark table file'.format(path, VERSION))
+
+        if num_vertices != graph.num_vertices or num_edges != graph.total_edges:
+            raise ValueError('Landmark tables are stale: {} was saved for {} vertices and {} edges, '
+                             'graph has {} vertices and {} edges'.format(
+                                 path, num_vertices, num_edges, graph.num_vertices, graph.total_edges))
+
+        oracle = cls(graph, num_landmarks)
+
+        key_lengths = array('I')
+        position = HEADER.size
+        key_lengths.frombytes(data[position:position + num_vertices * key_lengths.itemsize])
+        position += num_vertices * key_lengths.itemsize
+
+        if sum(key_lengths) != blob_size:
+            raise ValueError('{} is not a landmark table file'.format(path))
+
+        for length in key_lengths:
+            oracle.keys.append(data[position:position + length].decode('utf-8'))
+            position += length
+
+        if oracle.keys != list(graph.vertices_dict.keys()):
+            raise ValueError('Landmark tables are stale: {} was saved for different vertices'.format(path))
+
+        oracle.key_to_id = {key: index for index, key in enumerate(oracle.keys)}
+        if oracle._fingerprint() != fingerprint:
+            raise ValueError('Landmark tables are stale: {} was saved for different edges'.format(path))
+
+        oracle._record_state()
+
+        landmarks = array('I')
+        landmarks.frombytes(data[position:position + num_landmarks * landmarks.itemsize])
+        position += num_landmarks * landmarks.itemsize
+        oracle.landmarks = landmarks.tolist()
+
+        for _ in range(num_landmarks):
+            hops = array('i')
+            hops.frombytes(data[position:position + num_vertices * hops.itemsize])
+            position += num_vertices * hops.itemsize
+            oracle.distances.append(hops)
+
+        return oracle
+
+    def _fingerprint(self):
+        """Return 16 bytes hashing the vertex keys and the vertex ids adjacent to every vertex"""
+        digest = hashlib.blake2b(digest_size=16)
+
+        for index, key in enumerate(self.keys):
+            encoded = key.encode('utf-8')
+            digest.update(struct.pack('=I', len(encoded)))
+            digest.update(encoded)
+            digest.update(array('I', sorted(self._neighbors(index))).tobytes())
+            digest.update(b'\xff\xff\xff\xff')  # No vertex id, ends the neighbor list
+
+        return digest.digest()
+
+    def _record_state(self):
+        self.generation = self.graph.generation
+        self.num_vertices = self.graph.num_vertices
+        self.num_edges = self.graph.total_edges
+
+    def _neighbors(self, index):
+        """Return the vertex ids adjacent to the vertex with the given id"""
+        key_to_id = self.key_to_id
+        return [key_to_id[key] for key in self.graph.vertices_dict[self.keys[index]].neighbors]
+
+    def _bfs(self, source):
+        """Return an array of the hops from the source to every vertex, UNREACHABLE if none"""
+        hops = array('i', [UNREACHABLE]) * len(self.keys)
+        hops[source] = 0
+
+        queue = ArrayQueue()
+        queue.enqueue(source)
+
+        while not queue.is_empty():
+            curr = queue.dequeue()
+            for neighbor in self._neighbors(curr):
+                if hops[neighbor] == UNREACHABLE:
+                    hops[neighbor] = hops[curr] + 1
+                    queue.enqueue(neighbor)
+
+        return hops
+
+    def _lower_bound(self, u, t):
+        bound = 0
+
+        for hops in self.distances:
+            from_landmark, to_target = hops[u], hops[t]
+
+            if (from_landmark == UNREACHABLE) != (to_target == UNREACHABLE):
+                return None  # In different components
+
+            if from_landmark != UNREACHABLE:
+                difference = abs(from_landmark - to_target)
+                if difference > bound:
+                    bound = difference
+
+        return bound
@@ -0,0 +1,150 @@
+from graph import Graph
+from landmarks import LandmarkOracle
+import os
+import tempfile
+import unittest
+
+
+def grid_graph(width, height):
+    """Return a Graph of a width by height grid, vertex 'x,y' next to its four neighbors"""
+    graph = Graph()
+    graph.add_vertices_from('{},{}'.format(x, y) for y in range(height) for x in range(width))
+
+    edges = []
+    for y in range(height):
+        for x in range(width):
+            if x + 1 < width:
+                edges.append(('{},{}'.format(x, y), '{},{}'.format(x + 1, y)))
+            if y + 1 < height:
+                edges.append(('{},{}'.format(x, y), '{},{}'.format(x, y + 1)))
+
+    graph.add_edges_from(edges)
+    return graph
+
+
+class LandmarkOracleTests(unittest.TestCase):
+
+    def setUp(self):
+        self.populated_graph = Graph()
+        # Add vertices
+        for key in ["A", "B", "C", "D", "E", "F", "G"]:
+            self.populated_graph.add_vertex(key)
+
+        # Add connections (non weighted edges for now)
+        self.populated_graph.add_edge("A", "B")  # (A -> B)
+        self.populated_graph.add_edge("A", "C")  # (A -> C)
+        self.populated_graph.add_edge("B", "C")  # (B -> C)
+        self.populated_graph.add_edge("C", "D")  # (C -> D)
+        self.populated_graph.add_edge("C", "E")  # (C -> E)
+        self.populated_graph.add_edge("C", "F")  # (C -> F)
+        self.populated_graph.add_edge("A", "F")  # (A -> F)
+
+        self.oracle = LandmarkOracle(self.populated_graph, num_landmarks=3).build()
+
+    def test_build(self):
+        assert len(self.oracle.landmarks) == 3
+        # The disjointed vertex gets a landmark of its own
+        assert self.oracle.key_to_id['G'] in self.oracle.landmarks
+        assert not self.oracle.is_stale()
+
+    def test_find_path(self):
+        path = self.oracle.find_path('B', 'D')
+        assert [x.id for x in path] == ['B', 'C', 'D']
+        assert self.oracle.distance('D', 'E') == 2
+        assert self.oracle.distance('A', 'A') == 0
+
+        # Lower bounds never overestimate
+        for from_vert in "ABCDEF":
+            for to_vert in "ABCDEF":
+                assert self.oracle.lower_bound(from_vert, to_vert) <= self.oracle.distance(from_vert, to_vert)
+
+        # Can't find a path for a disjointed graph, and nothing is searched
+        assert self.oracle.find_path('A', 'G') is None
+        assert self.oracle.last_explored == 0
+        assert self.oracle.lower_bound('A', 'G') is None
+
+        # Test bad input
+        assert self.oracle.find_path('A', 'R') is None
+
+    def test_matches_bfs(self):
+        graph = grid_graph(30, 30)
+        oracle = LandmarkOracle(graph).build()
+
+        for from_vert, to_vert in [('0,0', '29,29'), ('5,17', '22,3'), ('14,14', '14,15'), ('29,0', '0,29')]:
+            path = oracle.find_path(from_vert, to_vert)
+            assert len(path) == len(graph.find_path_bfs(from_vert, to_vert, bidirectional=False))
+            assert path[0].id == from_vert and path[-1].id == to_vert
+
+        # The bounds keep the search close to the shortest path
+        oracle.find_path('0,0', '29,0')
+        assert oracle.last_explored < 100
+
+    def test_stale(self):
+        self.populated_graph.add_vertex("H")
+        assert self.oracle.is_stale()
+
+        with self.assertRaises(ValueError):
+            self.oracle.find_path('A', 'D')
+
+        self.oracle.build()
+        assert self.oracle.distance('A', 'D') == 2
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'graph.alt')
+            self.oracle.save(path)
+
+            loaded = LandmarkOracle.load(self.populated_graph, path)
+            assert loaded.landmarks == self.oracle.landmarks
+            assert loaded.distances == self.oracle.distances
+            assert [x.id for x in loaded.find_path('B', 'D')] == ['B', 'C', 'D']
+
+            # Tables load into an identical graph built again, whatever its generation
+            rebuilt = Graph()
+            rebuilt.add_vertices_from(self.populated_graph.vertices_dict)
+            for from_vert, to_vert, cost in self.populated_graph.iter_edges():
+                rebuilt.add_edge(from_vert, to_vert, cost)
+                rebuilt.add_edge(from_vert, to_vert, cost)
+            assert rebuilt.generation != self.populated_graph.generation
+
+            loaded = LandmarkOracle.load(rebuilt, path)
+            assert not loaded.is_stale()
+            assert loaded.distances == self.oracle.distances
+
+            # but not into one with as many edges between other vertices
+            other = Graph()
+            other.add_vertices_from(self.populated_graph.vertices_dict)
+            other.add_edges_from([("A", "B"), ("A", "C"), ("B", "C"), ("C", "D"), ("C", "E"), ("C", "F"), ("D", "E")])
+            with self.assertRaises(ValueError):
+                LandmarkOracle.load(other, path)
+
+            # Tables saved for an older graph are refused
+            self.populated_graph.add_edge("D", "E")
+            with self.assertRaises(ValueError):
+                LandmarkOracle.load(self.populated_graph, path)
+
+            with open(path, 'wb') as file:
+                file.write(b'not a table')
+            with self.assertRaises(ValueError):
+                LandmarkOracle.load(self.populated_graph, path)
+
+    def test_save_and_load_keys(self):
+        # Keys are stored with their lengths, so any character can be in them
+        graph = Graph()
+        keys = ["A\nB", "A", "B", "", "\u00e9\n\u2603"]
+        for key in keys:
+            graph.add_vertex(key)
+        graph.add_edge("A\nB", "A")
+        graph.add_edge("A", "")
+        graph.add_edge("", "\u00e9\n\u2603")
+        oracle = LandmarkOracle(graph, num_landmarks=2).build()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'graph.alt')
+            oracle.save(path)
+
+            loaded = LandmarkOracle.load(graph, path)
+            assert loaded.keys == keys
+            assert loaded.distance("A\nB", "\u00e9\n\u2603") == 3
+            assert loaded.find_path("B", "A") is None
+
@@ -0,0 +1,186 @@
+import heapq
+import math
+import multiprocessing
+
+from csr_graph import CSRGraph
+
+"""
+Friend recommendations
+
+Candidates for a user are the friends of their friends they aren't friends with yet,
+ranked by one of:
+    common       number of friends they share
+    jaccard      shared friends / friends either of them has
+    adamic-adar  sum of 1 / log(degree) over the shared friends, so a shared friend
+                 with few friends counts for more than a shared celebrity
+"""
+
+METRICS = ('common', 'jaccard', 'adamic-adar')
+
+# Recommender the pool workers score with, inherited from the parent or sent once per worker
+_worker_recommender = None
+
+
+def _init_worker(recommender):
+    global _worker_recommender
+    _worker_recommender = recommender
+
+
+def _recommend_ids(args):
+    index, k = args
+    return index, _worker_recommender._top_k(index, k)
+
+
+class Recommender(object):
+
+    def __init__(self, graph, metric='common'):
+        """
+        Initialize a recommender over a graph.Graph or a CSRGraph,
+        working on the sorted integer adjacency of a CSRGraph
+        metric: one of METRICS
+        Runtime: O(V + E) to convert a graph.Graph
+        """
+        if metric not in METRICS:
+            raise ValueError('Unknown metric {!r}, expected one of {}'.format(metric, ', '.join(METRICS)))
+
+        csr = graph if isinstance(graph, CSRGraph) else CSRGraph.from_graph(graph, weights=False)
+        self.metric = metric
+        self.keys = list(csr.keys)
+        self.key_to_id = dict(csr.key_to_id)
+
+        offsets, targets, _ = csr.adjacency()
+        self.offsets = offsets[:]
+        self.targets = targets[:]
+
+        # 1 / log(degree) of every vertex, what it adds to Adamic-Adar as a shared friend
+        self.inverse_log_degree = [0.0] * len(self.keys)
+        for index in range(len(self.keys)):
+            degree = self.offsets[index + 1] - self.offsets[index]
+            if degree > 1:
+                self.inverse_log_degree[index] = 1.0 / math.log(degree)
+
+    def __repr__(self):
+        """Return a string representation of this recommender."""
+        return 'Recommender({}, {} users)'.format(self.metric, len(self.keys))
+
+    def score(self, first, second):
+        """
+        Return the score of the two users by the metric, or None if one doesn't exist
+        Runtime: O(d1 + d2) by merging their sorted friend lists
+        """
+        if first not in self.key_to_id or second not in self.key_to_id:
+            return
+
+        u, v = self.key_to_id[first], self.key_to_id[second]
+        offsets, targets = self.offsets, self.targets
+
+        i, i_end = offsets[u], offsets[u + 1]
+        j, j_end = offsets[v], offsets[v + 1]
+        common = 0
+        adamic_adar = 0.0
+
+        while i < i_end and j < j_end:
+            if targets[i] < targets[j]:
+                i += 1
+            elif targets[i] > targets[j]:
+                j += 1
+            else:
+                common += 1
+                adamic_adar += self.inverse_log_degree[targets[i]]
+                i += 1
+                j += 1
+
+        return self._finish(u, v, common, adamic_adar)
+
+    def recommend(self, key, k=10):
+        """
+        Return up to k (candidate key, score) pairs for the user, best first,
+        ties broken by the order the candidates were added to the graph in
+        Runtime: O(d2 + d2' log k) where d2 counts the friend of friend paths and d2' the candidates
+        """
+        if key not in self.key_to_id:
+            return []
+
+        return [(self.keys[candidate], score) for candidate, score in self._top_k(self.key_to_id[key], k)]
+
+    def recommend_batch(self, keys, k=10, workers=1):
+        """
+        Return a dictionary of user key -> recommend(key, k) for every given user.
+        With more than one worker the users are spread over a process pool.
+        Runtime: O(n) recommend calls, shared by the workers
+        """
+        indexes = [self.key_to_id[key] for key in keys if key in self.key_to_id]
+        results = {key: [] for key in keys}
+
+        for index, top in self._run(indexes, k, workers):
+            results[self.keys[index]] = [(self.keys[candidate], score) for candidate, score in top]
+
+        return results
+
+    def recommend_all(self, k=10, workers=1, chunksize=256):
+        """
+        Generate (user key, recommend(key, k)) for every user in the graph, in id order,
+        as they are computed, so full population runs stream instead of piling up in memory
+        Runtime: O(V) recommend calls, shared by the workers
+        """
+        for index, top in self._run(range(len(self.keys)), k, workers, chunksize):
+            yield self.keys[index], [(self.keys[candidate], score) for candidate, score in top]
+
+    def _run(self, indexes, k, workers, chunksize=256):
+        """Generate (user id, top k) for the user ids, over a process pool with more than one worker"""
+        if workers <= 1:
+            for index in indexes:
+                yield index, self._top_k(index, k)
+            return
+
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(self,)) as pool:
+            for result in pool.imap(_recommend_ids, ((index, k) for index in indexes), chunksize=chunksize):
+                yield result
+
+    def _top_k(self, u, k):
+        """Return the k best (candidate id, score) pairs of the user id, best first"""
+        if k <= 0:
+            return []
+
+        offsets, targets = self.offsets, self.targets
+        friends = targets[offsets[u]:offsets[u + 1]]
+
+        # Count the friend of friend paths to every candidate
+        common = {}
+        adamic_adar = {}
+        for friend in friends:
+            weight = self.inverse_log_degree[friend]
+            for pos in range(offsets[friend], offsets[friend + 1]):
+                candidate = targets[pos]
+                common[candidate] = common.get(candidate, 0) + 1
+                adamic_adar[candidate] = adamic_adar.get(candidate, 0.0) + weight
+
+        # Not the user themself, nor anyone they are friends with already
+        common.pop(u, None)
+        for friend in friends:
+            common.pop(friend, None)
+
+        # Bounded min heap of (score, -id): the weakest of the best k sits on top
+        heap = []
+        for candidate, count in common.items():
+            entry = (self._finish(u, candidate, count, adamic_adar[candidate]), -candidate)
+
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+
+        heap.sort(reverse=True)
+
+        return [(-negative_id, score) for score, negative_id in heap]
+
+    def _finish(self, u, v, common, adamic_adar):
+        """Return the score by the metric from the shared friend count and Adamic-Adar sum"""
+        if self.metric == 'common':
+            return common
+
+        elif self.metric == 'adamic-adar':
+            return adamic_adar
+
+        union = (self.offsets[u + 1] - self.offsets[u]) + (self.offsets[v + 1] - self.offsets[v]) - common
+        return common / union if union else 0.0
@@ -0,0 +1,95 @@
+from csr_graph import CSRGraph
+from graph import Graph
+from recommend import Recommender
+import math
+import random
+import unittest
+
+
+class RecommenderTests(unittest.TestCase):
+
+    def setUp(self):
+        self.populated_graph = Graph()
+        # Add vertices
+        for key in ["A", "B", "C", "D", "E", "F", "G"]:
+            self.populated_graph.add_vertex(key)
+
+        # Add connections (non weighted edges for now)
+        self.populated_graph.add_edge("A", "B")  # (A -> B)
+        self.populated_graph.add_edge("A", "C")  # (A -> C)
+        self.populated_graph.add_edge("B", "C")  # (B -> C)
+        self.populated_graph.add_edge("C", "D")  # (C -> D)
+        self.populated_graph.add_edge("C", "E")  # (C -> E)
+        self.populated_graph.add_edge("C", "F")  # (C -> F)
+        self.populated_graph.add_edge("A", "F")  # (A -> F)
+
+    def test_common_neighbors(self):
+        recommender = Recommender(self.populated_graph)
+
+        # F shares A and C with B, ties go to the vertex added first
+        assert recommender.recommend("B") == [("F", 2), ("D", 1), ("E", 1)]
+        assert recommender.recommend("D", k=2) == [("A", 1), ("B", 1)]
+        assert recommender.recommend("A", k=0) == []
+
+        # Nothing to recommend
+        assert recommender.recommend("G") == []
+        assert recommender.recommend("R") == []
+
+        assert recommender.score("B", "F") == 2
+        assert recommender.score("A", "G") == 0
+        assert recommender.score("A", "R") is None
+
+        # Costs don't matter to the recommendations, float ones included
+        weighted = Graph()
+        for key in ["A", "B", "C"]:
+            weighted.add_vertex(key)
+        weighted.add_edge("A", "B", 0.5)
+        weighted.add_edge("B", "C", 1.5)
+        assert Recommender(weighted).recommend("A") == [("C", 1)]
+
+    def test_metrics(self):
+        jaccard = Recommender(self.populated_graph, 'jaccard')
+        assert jaccard.score("A", "D") == 1 / 3
+        assert jaccard.recommend("A") == [("D", 1 / 3), ("E", 1 / 3)]
+
+        adamic_adar = Recommender(self.populated_graph, 'adamic-adar')
+        assert math.isclose(adamic_adar.score("B", "F"), 1 / math.log(3) + 1 / math.log(5))
+        assert adamic_adar.recommend("B", k=1)[0][0] == "F"
+
+        with self.assertRaises(ValueError):
+            Recommender(self.populated_graph, 'popularity')
+
+    def test_matches_scores(self):
+        random.seed(19)
+        graph = CSRGraph(max_degree=None)
+        graph.add_vertices_from(range(200))
+        graph.add_edges_from((random.randrange(200), random.randrange(200)) for _ in range(800))
+
+        for metric in ['common', 'jaccard', 'adamic-adar']:
+            recommender = Recommender(graph, metric)
+
+            for key in range(0, 200, 20):
+                top = recommender.recommend(key, k=5)
+                friends = set(graph.get_vertex(key).get_neighbors())
+
+                # Every candidate is a new friend of a friend, scored like score() does
+                for candidate, score in top:
+                    assert candidate != key and candidate not in friends
+                    assert math.isclose(score, recommender.score(key, candidate))
+
+                scores = [score for _, score in top]
+                assert scores == sorted(scores, reverse=True)
+
+    def test_batch(self):
+        recommender = Recommender(self.populated_graph)
+
+        results = recommender.recommend_batch(["A", "B", "R"], k=2)
+        assert results == {"A": [("D", 1), ("E", 1)], "B": [("F", 2), ("D", 1)], "R": []}
+
+        # Worker processes give the same answers
+        assert recommender.recommend_batch(["A", "B", "R"], k=2, workers=2) == results
+
+        everyone = dict(recommender.recommend_all(k=2, workers=2, chunksize=2))
+        assert everyone == dict(recommender.recommend_all(k=2))
+        assert everyone["B"] == results["B"]
+        assert len(everyone) == 7
@@ -0,0 +1,285 @@
+import multiprocessing
+from array import array
+
+from csr_graph import CSRGraph
+
+try:
+    import numpy
+except ImportError:  # NumPy is optional, counting falls back to merging sorted rows
+    numpy = None
+
+"""
+Triangle counting (forward algorithm)
+
+Vertices are ranked by degree, and every edge is kept only on the lower ranked of
+its two ends, pointing up. Each triangle then shows up exactly once, at its lowest
+ranked vertex u with the two others in the sorted upward row of u, and the upward
+rows stay short even around very popular vertices.
+"""
+
+# Most wedges the NumPy path checks at once, bounding its memory
+NUMPY_WEDGES = 1 << 22
+
+# Work is cut into this many vertex ranges per worker, so fast ranges don't leave workers idle
+RANGES_PER_WORKER = 4
+
+# Upward adjacency the pool workers count on, inherited from the parent or sent once per worker
+_worker_rows = None
+
+
+def _init_worker(up_offsets, up_targets):
+    global _worker_rows
+    _worker_rows = (up_offsets, up_targets)
+
+
+def _count_worker(args):
+    low, high, use_numpy = args
+    up_offsets, up_targets = _worker_rows
+
+    if use_numpy:
+        return _numpy_count_range(up_offsets, up_targets, low, high).tolist()
+
+    return _count_range(up_offsets, up_targets, low, high)
+
+
+class TriangleCounts(object):
+
+    def __init__(self, keys, degrees, triangles):
+        """
+        keys: key of every vertex id
+        degrees: number of neighbors of every vertex id
+        triangles: number of triangles every vertex id is part of
+        """
+        self.keys = keys
+        self.degrees = degrees
+        self.triangles = triangles
+
+    def __repr__(self):
+        """Return a string representation of these counts."""
+        return 'TriangleCounts({} vertices, {} triangles)'.format(len(self.keys), self.total())
+
+    def total(self):
+        """
+        Return the number of triangles in the graph
+        Runtime: O(V)
+        """
+        return sum(self.triangles) // 3
+
+    def triangles_of(self, key):
+        """
+        Return the number of triangles the vertex is part of, or None if it doesn't exist
+        Runtime: O(V) the first time, then O(1)
+        """
+        if not hasattr(self, 'key_to_id'):
+            self.key_to_id = {key: index for index, key in enumerate(self.keys)}
+
+        index = self.key_to_id.get(key)
+        return self.triangles[index] if index is not None else None
+
+    def local_clustering(self):
+        """
+        Return an array of the local clustering coefficient of every vertex id:
+        the share of the pairs of its neighbors that are neighbors too, 0 under two neighbors
+        Runtime: O(V)
+        """
+        coefficients = array('d', bytes(8 * len(self.keys)))
+
+        for index, degree in enumerate(self.degrees):
+            if degree > 1:
+                coefficients[index] = 2.0 * self.triangles[index] / (degree * (degree - 1))
+
+        return coefficients
+
+    def average_clustering(self):
+        """
+        Return the mean of the local clustering coefficients, 0 for an empty graph
+        Runtime: O(V)
+        """
+        if not self.keys:
+            return 0.0
+
+        return sum(self.local_clustering()) / len(self.keys)
+
+    def global_clustering(self):
+        """
+        Return the global clustering coefficient (transitivity): the share of the
+        paths of two edges that are closed into a triangle, 0 if there are none
+        Runtime: O(V)
+        """
+        paths = sum(degree * (degree - 1) // 2 for degree in self.degrees)
+        return 3.0 * self.total() / paths if paths else 0.0
+
+
+def count_triangles(graph, use_numpy=None, workers=1):
+    """
+    Count the triangles of every vertex of a graph.Graph or CSRGraph with the forward algorithm
+    and return them in a TriangleCounts, as arrays indexed by the vertex ids of the CSRGraph,
+    which follow the order the vertices were added in
+    use_numpy: True to check wedges with NumPy, False to merge sorted rows,
+               None to use NumPy when it is installed
+    workers: processes counting vertex ranges in parallel
+    Runtime: O(E * sqrt(E))
+    """
+    if use_numpy is None:
+        use_numpy = numpy is not None
+
+    csr = graph if isinstance(graph, CSRGraph) else CSRGraph.from_graph(graph, weights=False)
+    offsets, targets, _ = csr.adjacency()
+    num_vertices = csr.num_vertices
+
+    degrees = array('q', (offsets[u + 1] - offsets[u] for u in range(num_vertices)))
+    order, up_offsets, up_targets = _orient(offsets, targets, degrees)
+
+    if workers > 1 and num_vertices:
+        ranked = _count_parallel(up_offsets, up_targets, use_numpy, workers)
+    elif use_numpy:
+        ranked = _numpy_count_range(up_offsets, up_targets, 0, num_vertices).tolist()
+    else:
+        ranked = _count_range(up_offsets, up_targets, 0, num_vertices)
+
+    # Back from rank order to vertex ids
+    triangles = array('q', bytes(8 * num_vertices))
+    for rank, index in enumerate(order):
+        triangles[index] = ranked[rank]
+
+    return TriangleCounts(list(csr.keys), degrees, triangles)
+
+
+def _orient(offsets, targets, degrees):
+    """
+    Rank the vertices by (degree, id) and return the vertex id of every rank, with the
+    upward adjacency in rank space: the sorted ranks above r adjacent to rank r are
+    up_targets[up_offsets[r]:up_offsets[r + 1]]
+    Runtime: O(V log V + E log d)
+    """
+    num_vertices = len(degrees)
+    order = sorted(range(num_vertices), key=lambda index: (degrees[index], index))
+
+    rank = array('q', bytes(8 * num_vertices))
+    for position, index in enumerate(order):
+        rank[index] = position
+
+    up_offsets = array('q', [0])
+    up_targets = array('i')
+
+    for position, index in enumerate(order):
+        up_targets.extend(sorted(rank[target] for target in targets[offsets[index]:offsets[index + 1]]
+                                 if rank[target] > position))
+        up_offsets.append(len(up_targets))
+
+    return order, up_offsets, up_targets
+
+
+def _count_range(up_offsets, up_targets, low, high):
+    """
+    Return the triangle counts of every rank, over the triangles whose lowest rank is in [low, high),
+    intersecting the upward row of u with the upward row of every v in it by merging
+    Runtime: O(sum of d+(u) * (d+(u) + d+(v))) over the range
+    """
+    counts = [0] * (len(up_offsets) - 1)
+
+    for u in range(low, high):
+        end = up_offsets[u + 1]
+
+        for position in range(up_offsets[u], end):
+            v = up_targets[position]
+
+            # Only the rest of the row of u can close a triangle with v, the ranks before are below v
+            i, j, j_end = position + 1, up_offsets[v], up_offsets[v + 1]
+
+            while i < end and j < j_end:
+                first, second = up_targets[i], up_targets[j]
+                if first < second:
+                    i += 1
+                elif first > second:
+                    j += 1
+                else:
+                    counts[u] += 1
+                    counts[v] += 1
+                    counts[first] += 1
+                    i += 1
+                    j += 1
+
+    return counts
+
+
+def _numpy_count_range(up_offsets, up_targets, low, high):
+    """
+    Return a NumPy array of the triangle counts of every rank, over the triangles whose lowest rank
+    is in [low, high): every pair (v, w) of the upward row of u is a wedge, closed if (v, w) is an arc,
+    which a binary search of the sorted arc codes v * V + w answers for a whole chunk of wedges at once
+    Runtime: O(W log E) where W is the number of wedges in the range
+    """
+    num_vertices = len(up_offsets) - 1
+    offsets = numpy.frombuffer(up_offsets, dtype=numpy.int64)
+    targets = numpy.frombuffer(up_targets, dtype=numpy.int32).astype(numpy.int64)
+    counts = numpy.zeros(num_vertices, dtype=numpy.int64)
+
+    if not len(targets):
+        return counts
+
+    # Rows are in rank order and sorted, so the arc codes come out sorted
+    row_lengths = numpy.diff(offsets)
+    arc_codes = numpy.repeat(numpy.arange(num_vertices, dtype=numpy.int64), row_lengths) * num_vertices + targets
+
+    wedges = row_lengths * (row_lengths - 1) // 2
+    start = low
+
+    while start < high:
+        # Take vertices until the chunk holds NUMPY_WEDGES wedges, at least one vertex
+        end = start + 1
+        total = int(wedges[start])
+        while end < high and total + wedges[end] <= NUMPY_WEDGES:
+            total += int(wedges[end])
+            end += 1
+
+        if total:
+            # Every arc of the chunk pairs with each arc after it in the same row
+            positions = numpy.arange(offsets[start], offsets[end])
+            owners = numpy.repeat(numpy.arange(start, end), row_lengths[start:end])
+            later = offsets[owners + 1] - positions - 1
+
+            first = numpy.repeat(positions, later)
+            group_starts = numpy.cumsum(later) - later
+            second = first + 1 + numpy.arange(len(first)) - numpy.repeat(group_starts, later)
+
+            v, w = targets[first], targets[second]
+            codes = v * num_vertices + w
+            found = numpy.searchsorted(arc_codes, codes)
+            closed = arc_codes[numpy.minimum(found, len(arc_codes) - 1)] == codes
+
+            u = numpy.repeat(owners, later)[closed]
+            for ranks in (u, v[closed], w[closed]):
+                counts += numpy.bincount(ranks, minlength=num_vertices)
+
+        start = end
+
+    return counts
+
+
+def _count_parallel(up_offsets, up_targets, use_numpy, workers):
+    """Return the triangle counts of every rank, summed over vertex ranges counted by a process pool"""
+    num_vertices = len(up_offsets) - 1
+
+    # Cut the ranks into ranges of about the same number of wedges
+    work = [(up_offsets[u + 1] - up_offsets[u]) ** 2 + 1 for u in range(num_vertices)]
+    pieces = workers * RANGES_PER_WORKER
+    share = sum(work) / pieces
+
+    ranges = []
+    low, done = 0, 0
+    for u in range(num_vertices):
+        done += work[u]
+        if done >= share * (len(ranges) + 1) or u == num_vertices - 1:
+            ranges.append((low, u + 1, use_numpy))
+            low = u + 1
+
+    counts = [0] * num_vertices
+
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(up_offsets, up_targets)) as pool:
+        for partial in pool.imap_unordered(_count_worker, ranges):
+            for rank, count in enumerate(partial):
+                if count:
+                    counts[rank] += count
+
+    return counts
@@ -0,0 +1,77 @@
+from csr_graph import CSRGraph, numpy
+from graph import Graph
+from triangles import count_triangles
+import itertools
+import math
+import random
+import unittest
+
+
+class TriangleTests(unittest.TestCase):
+
+    def setUp(self):
+        self.populated_graph = Graph()
+        # Add vertices
+        for key in ["A", "B", "C", "D", "E", "F", "G"]:
+            self.populated_graph.add_vertex(key)
+
+        # Add connections (non weighted edges for now)
+        self.populated_graph.add_edge("A", "B")  # (A -> B)
+        self.populated_graph.add_edge("A", "C")  # (A -> C)
+        self.populated_graph.add_edge("B", "C")  # (B -> C)
+        self.populated_graph.add_edge("C", "D")  # (C -> D)
+        self.populated_graph.add_edge("C", "E")  # (C -> E)
+        self.populated_graph.add_edge("C", "F")  # (C -> F)
+        self.populated_graph.add_edge("A", "F")  # (A -> F)
+
+    def test_count_triangles(self):
+        # A B C and A C F
+        counts = count_triangles(self.populated_graph, use_numpy=False)
+
+        assert counts.total() == 2
+        assert list(counts.triangles) == [2, 1, 2, 0, 0, 1, 0]
+        assert counts.triangles_of("C") == 2
+        assert counts.triangles_of("R") is None
+
+        local = counts.local_clustering()
+        assert math.isclose(local[0], 2 / 3)
+        assert local[1] == 1.0 and local[3] == 0.0 and local[6] == 0.0
+        assert math.isclose(local[2], 0.2)
+
+        assert math.isclose(counts.average_clustering(), (2 / 3 + 1 + 0.2 + 1) / 7)
+        assert math.isclose(counts.global_clustering(), 0.4)
+
+        empty = count_triangles(Graph())
+        assert empty.total() == 0
+        assert empty.global_clustering() == 0.0 and empty.average_clustering() == 0.0
+
+        # Costs don't matter to triangles, float ones included
+        weighted = Graph()
+        for key in ["A", "B", "C"]:
+            weighted.add_vertex(key)
+        weighted.add_edge("A", "B", 0.5)
+        weighted.add_edge("B", "C", 1.5)
+        weighted.add_edge("A", "C", 2)
+        assert count_triangles(weighted, use_numpy=False).total() == 1
+
+    def test_matches_brute_force(self):
+        random.seed(20)
+        graph = CSRGraph(max_degree=None)
+        graph.add_vertices_from(range(60))
+        graph.add_edges_from((random.randrange(60), random.randrange(60)) for _ in range(400))
+
+        neighbors = [set(graph.get_vertex(key).get_neighbors()) for key in range(60)]
+        expected = [0] * 60
+        for a, b, c in itertools.combinations(range(60), 3):
+            if b in neighbors[a] and c in neighbors[a] and c in neighbors[b]:
+                for key in (a, b, c):
+                    expected[key] += 1
+
+        assert list(count_triangles(graph, use_numpy=False).triangles) == expected
+
+        # Process-parallel vertex ranges add up to the same counts
+        assert list(count_triangles(graph, use_numpy=False, workers=2).triangles) == expected
+
+        if numpy is not None:
+            assert list(count_triangles(graph, use_numpy=True).triangles) == expected
+            assert list(count_triangles(graph, use_numpy=True, workers=2).triangles) == expected
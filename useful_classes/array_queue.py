@@ -0,0 +1,106 @@
+class ArrayQueue(object):
+
+    def __init__(self, iterable=None, capacity=8):
+        """Initialize this queue and enqueue the given items, if any.
+        Items live in a circular buffer that doubles when it fills up,
+        starting with room for capacity items, at least one."""
+        self.buffer = [None] * max(capacity, 1)
+        self.head = 0  # Index of the front item
+        self.size = 0  # Number of items
+        if iterable is not None:
+            self.enqueue_many(iterable)
+
+    def __repr__(self):
+        """Return a string representation of this queue."""
+        return 'Queue({} items, front={})'.format(self.length(), self.front())
+
+    def __len__(self):
+        return self.size
+
+    def is_empty(self):
+        """Return True if this queue is empty, or False otherwise."""
+        return self.size == 0
+
+    def length(self):
+        """Return the number of items in this queue."""
+        return self.size
+
+    def enqueue(self, item):
+        """Insert the given item at the back of this queue.
+        Running time: O(1)* – Amortized, the buffer only grows when it is full"""
+        if self.size == len(self.buffer):
+            self._grow(self.size + 1)
+
+        self.buffer[(self.head + self.size) % len(self.buffer)] = item
+        self.size += 1
+
+    def enqueue_many(self, items):
+        """Insert all the given items at the back of this queue, in order.
+        Running time: O(k) for k items"""
+        items = list(items)
+        count = len(items)
+
+        if self.size + count > len(self.buffer):
+            self._grow(self.size + count)
+
+        capacity = len(self.buffer)
+        start = (self.head + self.size) % capacity
+        # Copy in at most two slices, before and after the end of the buffer
+        first = min(count, capacity - start)
+        self.buffer[start:start + first] = items[:first]
+        self.buffer[0:count - first] = items[first:]
+        self.size += count
+
+    def front(self):
+        """Return the item at the front of this queue without removing it,
+        or None if this queue is empty."""
+        if self.is_empty():
+            return None
+        else:
+            return self.buffer[self.head]
+
+    def dequeue(self):
+        """Remove and return the item at the front of this queue,
+        or raise ValueError if this queue is empty.
+        Running time: O(1) – Only the head index moves, nothing is searched"""
+        if self.is_empty():
+            raise ValueError("The queue is empty")
+
+        front_data = self.buffer[self.head]
+        self.buffer[self.head] = None  # Drop the reference so it can be collected
+        self.head = (self.head + 1) % len(self.buffer)
+        self.size -= 1
+        return front_data
+
+    def dequeue_many(self, count=None):
+        """Remove and return up to count items from the front of this queue
+        as a list, or every item if count is None.
+        Running time: O(k) for k items returned"""
+        if count is None or count > self.size:
+            count = self.size
+
+        if count == 0:
+            return []
+
+        capacity = len(self.buffer)
+        first = min(count, capacity - self.head)
+        items = self.buffer[self.head:self.head + first] + self.buffer[0:count - first]
+
+        # Drop the references to the removed items
+        self.buffer[self.head:self.head + first] = [None] * first
+        self.buffer[0:count - first] = [None] * (count - first)
+
+        self.head = (self.head + count) % capacity
+        self.size -= count
+        return items
+
+    def _grow(self, needed):
+        """Move the items into a larger buffer that fits at least needed items,
+        unrolling them so the front is at index 0."""
+        capacity = len(self.buffer)
+        while capacity < needed:
+            capacity *= 2
+
+        items = self.buffer[self.head:] + self.buffer[:self.head]
+        self.buffer = items[:self.size] + [None] * (capacity - self.size)
+        self.head = 0
@@ -0,0 +1,85 @@
+from array_queue import ArrayQueue
+import unittest
+
+
+class ArrayQueueTests(unittest.TestCase):
+
+    def test_init(self):
+        queue = ArrayQueue(['A', 'B', 'C'])
+        assert queue.length() == 3
+        assert queue.front() == 'A'
+
+        # Capacities below one still give a buffer to grow from
+        for capacity in (0, -3):
+            queue = ArrayQueue(capacity=capacity)
+            queue.enqueue_many([])
+            assert queue.is_empty()
+            queue.enqueue('A')
+            queue.enqueue_many(['B', 'C'])
+            assert queue.dequeue_many() == ['A', 'B', 'C']
+
+    def test_dequeue_empty(self):
+        queue = ArrayQueue()
+        assert queue.front() is None
+        assert queue.dequeue_many() == []
+        assert queue.dequeue_many(5) == []
+
+        with self.assertRaises(ValueError):
+            queue.dequeue()
+
+        queue.enqueue('A')
+        assert queue.dequeue() == 'A'
+        with self.assertRaises(ValueError):
+            queue.dequeue()
+
+    def test_wrap_around(self):
+        queue = ArrayQueue(capacity=4)
+        queue.enqueue_many([1, 2, 3])
+        assert queue.dequeue() == 1
+        assert queue.dequeue() == 2
+
+        # The back passes the end of the buffer and continues at index 0
+        queue.enqueue(4)
+        queue.enqueue(5)
+        queue.enqueue(6)
+        assert len(queue.buffer) == 4
+        assert queue.head == 2
+        assert queue.buffer[:2] == [5, 6]
+        assert [queue.dequeue() for _ in range(4)] == [3, 4, 5, 6]
+        assert queue.is_empty()
+
+    def test_grow_while_wrapped(self):
+        queue = ArrayQueue(capacity=4)
+        queue.enqueue_many([1, 2, 3, 4])
+        queue.dequeue_many(3)
+        queue.enqueue_many([5, 6, 7])
+        assert queue.head == 3
+
+        # Full and wrapped, the next item unrolls the items into a buffer twice as big
+        queue.enqueue(8)
+        assert len(queue.buffer) == 8
+        assert queue.head == 0
+        assert queue.buffer[:5] == [4, 5, 6, 7, 8]
+        assert queue.dequeue_many() == [4, 5, 6, 7, 8]
+
+        # Growing by many items at once skips the intermediate sizes
+        queue.enqueue_many(range(20))
+        assert len(queue.buffer) == 32
+        assert queue.dequeue_many() == list(range(20))
+
+    def test_many_across_wrap(self):
+        queue = ArrayQueue(capacity=8)
+        queue.enqueue_many('ABCDEF')
+        assert queue.dequeue_many(5) == ['A', 'B', 'C', 'D', 'E']
+
+        # Written in two slices, after the head then from index 0
+        queue.enqueue_many('GHIJ')
+        assert len(queue.buffer) == 8
+        assert queue.buffer[:2] == ['I', 'J']
+
+        # Read back in two slices, with the references dropped from both
+        assert queue.dequeue_many(4) == ['F', 'G', 'H', 'I']
+        assert queue.buffer.count(None) == 7
+        assert queue.dequeue_many(10) == ['J']
+        assert queue.buffer == [None] * 8
+        assert queue.is_empty()
@@ -0,0 +1,21 @@
+class BuildReport(object):
+
+    def __init__(self):
+        """Initialize an empty report of a bulk graph build"""
+        self.added = 0  # Number of items added to the graph
+        self.rejected = []  # (item, reason) for every item that was refused
+
+    def __repr__(self):
+        """Return a string representation of this report."""
+        return 'BuildReport(added={}, rejected={})'.format(self.added, len(self.rejected))
+
+    def reject(self, item, reason):
+        """Record that the given item was refused and why"""
+        self.rejected.append((item, reason))
+
+    def reasons(self):
+        """Return a dictionary of reason -> number of items rejected for it"""
+        counts = {}
+        for _, reason in self.rejected:
+            counts[reason] = counts.get(reason, 0) + 1
+        return counts
@@ -0,0 +1,171 @@
+import sys
+from array import array
+from collections import deque
+from itertools import islice
+
+"""
+Memory footprint of the graph classes
+
+Sizes come from sys.getsizeof, so they are what CPython allocates for every object,
+not counting the interpreter overhead of the allocator. Objects shared between
+structures are counted once: vertex key strings under 'keys', and neighbor or edge
+keys only when they are separate copies of the vertex key string.
+"""
+
+
+def sampled(items, count, sample):
+    """
+    Return (list of every step-th item, factor scaling a sum over them to all count items),
+    spreading sample picks over the whole iterable, or (items, 1.0) for sample None or >= count
+    Runtime: O(count) iteration, O(sample) items kept
+    """
+    if sample is None or sample >= count:
+        return items, 1.0
+
+    picked = list(islice(items, 0, None, max(count // max(sample, 1), 1)))
+    return picked, count / len(picked) if picked else 0.0
+
+
+def value_size(value):
+    """Return the size of a number stored in a structure, 0 for the small ints CPython shares"""
+    if type(value) is int and -5 <= value <= 256:
+        return 0
+
+    return sys.getsizeof(value)
+
+
+# Size of a dictionary by its number of keys, see dict_size
+_dict_sizes = {}
+
+
+def dict_size(count):
+    """
+    Return the size of a plain dictionary holding count keys.
+    Attribute dictionaries are built lazily and shared between instances on CPython 3.11+,
+    so sys.getsizeof of one changes from one call to the next; this doesn't.
+    """
+    size = _dict_sizes.get(count)
+    if size is None:
+        size = _dict_sizes[count] = sys.getsizeof(dict.fromkeys(range(count)))
+    return size
+
+
+def object_size(instance):
+    """Return the size of an instance with its attributes, counted as a plain dictionary"""
+    size = sys.getsizeof(instance)
+    attributes = getattr(instance, '__dict__', None)
+    return size + dict_size(len(attributes)) if attributes is not None else size
+
+
+def structure_size(instance):
+    """
+    Return the size of an instance with its attributes and the dict, list, set,
+    deque and array tables it holds directly, but not the items inside those tables,
+    or 0 for None
+    """
+    if instance is None:
+        return 0
+
+    size = object_size(instance)
+
+    for value in getattr(instance, '__dict__', {}).values():
+        if isinstance(value, (dict, list, set, deque, array)):
+            size += sys.getsizeof(value)
+
+    return size
+
+
+def adjacency_usage(vertices_dict, key_attribute, deep=True, sample=None):
+    """
+    Return a dictionary of structure -> bytes for a dictionary of key -> vertex objects,
+    each holding a dictionary of neighbor key -> weight in its neighbors attribute:
+        vertices_dict  the table of the dictionary of vertices
+        neighbors      the tables of the neighbor dictionaries
+    and with deep:
+        vertices       the vertex objects with their attributes
+        keys           the vertex key strings
+        neighbor_keys  the neighbor keys that are copies of the vertex key string
+        weights        the edge weights that aren't shared small ints
+    key_attribute: name of the vertex attribute holding its key, the string used in vertices_dict
+    sample: number of vertices to measure and scale up from, None to measure all of them
+    Runtime: O(V + E) or O(V + sample * d)
+    """
+    sizes = {'vertices_dict': sys.getsizeof(vertices_dict), 'neighbors': 0}
+    if deep:
+        sizes.update(vertices=0, keys=0, neighbor_keys=0, weights=0)
+
+    vertices, scale = sampled(iter(vertices_dict.values()), len(vertices_dict), sample)
+
+    for vertex in vertices:
+        sizes['neighbors'] += sys.getsizeof(vertex.neighbors)
+
+        if not deep:
+            continue
+
+        sizes['vertices'] += object_size(vertex)
+        sizes['keys'] += sys.getsizeof(getattr(vertex, key_attribute))
+
+        for neighbor, weight in vertex.neighbors.items():
+            if getattr(vertices_dict[neighbor], key_attribute) is not neighbor:
+                sizes['neighbor_keys'] += sys.getsizeof(neighbor)
+            sizes['weights'] += value_size(weight)
+
+    for name in sizes:
+        if name != 'vertices_dict':
+            sizes[name] = int(round(sizes[name] * scale))
+
+    return sizes
+
+
+def edge_index_usage(edge_index, vertices_dict, key_attribute, deep=True, sample=None):
+    """
+    Return a dictionary of structure -> bytes for an EdgeIndex of (from, to) -> cost:
+        edges_list       the table of the index
+    and with deep:
+        edge_tuples      the (from, to) tuples
+        edge_keys        the keys in the tuples that are copies of the vertex key string
+        edge_weights     the costs that aren't shared small ints
+    Runtime: O(E), where sampling only measures sample edges while skipping the rest
+    """
+    sizes = {'edges_list': structure_size(edge_index)}
+    if not deep:
+        return sizes
+
+    sizes.update(edge_tuples=0, edge_keys=0, edge_weights=0)
+    items, scale = sampled(iter(edge_index.costs.items()), len(edge_index.costs), sample)
+
+    for pair, cost in items:
+        sizes['edge_tuples'] += sys.getsizeof(pair)
+        sizes['edge_weights'] += value_size(cost)
+
+        for key in pair:
+            if getattr(vertices_dict[key], key_attribute) is not key:
+                sizes['edge_keys'] += sys.getsizeof(key)
+
+    for name in ('edge_tuples', 'edge_keys', 'edge_weights'):
+        sizes[name] = int(round(sizes[name] * scale))
+
+    return sizes
+
+
+def memory_report(sizes, num_vertices, num_edges, deep, sample):
+    """
+    Return the report memory_usage hands out:
+        structures  dictionary of structure -> bytes
+        total       bytes of all the structures
+        per_vertex  total / number of vertices, 0 for an empty graph
+        per_edge    total / number of edges, 0 without edges
+        deep        whether the objects inside the structures were measured
+        exact       False if a sample smaller than the vertices or edges was asked for,
+                    so some sizes may be scaled up from it
+    """
+    total = sum(sizes.values())
+
+    return {
+        'structures': sizes,
+        'total': total,
+        'per_vertex': total / num_vertices if num_vertices else 0.0,
+        'per_edge': total / num_edges if num_edges else 0.0,
+        'deep': deep,
+        'exact': sample is None or sample >= max(num_vertices, num_edges),
+    }
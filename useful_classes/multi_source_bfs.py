@@ -0,0 +1,61 @@
+def multi_source_bfs(sources, neighbors_of, visit, max_depth=None, stats=None):
+    """
+    Run one breadth first search per source at the same time (MS-BFS).
+    Every query owns one bit, so a vertex reached by many searches in the same
+    level is expanded once for all of them with a single mask operation.
+
+    sources: list of start vertices, query i starts at sources[i]
+    neighbors_of: function returning the neighbors of a vertex
+    visit: function called as visit(vertex, bits, parent, depth) for every vertex
+           newly reached by the queries in bits; it returns the bits of the queries
+           that are finished, which stop expanding from then on
+    max_depth: stop after this many levels, None to run until every query is done
+    stats: TraversalStats to count the expanded levels into, None to skip counting
+    Returns the number of vertices reached by any query
+    Runtime: O(V + E) per level set expansion, shared by all the queries
+    """
+    active = (1 << len(sources)) - 1  # Queries still expanding
+
+    seen = {}  # vertex -> bits of the queries that reached it
+    frontier = {}  # vertex -> bits of the queries it is in the current level of
+
+    for index, source in enumerate(sources):
+        bit = 1 << index
+        seen[source] = seen.get(source, 0) | bit
+        frontier[source] = frontier.get(source, 0) | bit
+
+    depth = 0
+
+    while frontier and active and (max_depth is None or depth < max_depth):
+        depth += 1
+        next_frontier = {}
+
+        if stats is not None:
+            stats.dequeued += len(frontier)
+            stats.edges_scanned += sum(len(neighbors_of(vertex)) for vertex in frontier)
+            stats.peak_frontier = max(stats.peak_frontier, len(frontier))
+
+        for vertex, bits in frontier.items():
+            bits &= active
+            if not bits:
+                continue
+
+            for neighbor in neighbors_of(vertex):
+                new_bits = bits & ~seen.get(neighbor, 0)
+
+                if new_bits:
+                    seen[neighbor] = seen.get(neighbor, 0) | new_bits
+                    next_frontier[neighbor] = next_frontier.get(neighbor, 0) | new_bits
+                    active &= ~visit(neighbor, new_bits, vertex, depth)
+
+        frontier = next_frontier
+
+    return len(seen)
+
+
+def query_indexes(bits):
+    """Generate the index of every query in the given bits, lowest first"""
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
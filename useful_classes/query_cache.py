@@ -0,0 +1,98 @@
+import sys
+import time
+from collections import OrderedDict
+
+
+class QueryCache(object):
+
+    def __init__(self, max_entries=1024, ttl=None, max_bytes=None, clock=time.monotonic):
+        """
+        Initialize a bounded least recently used cache of query results.
+        Every entry records the graph generation it was computed at, and is
+        only served while the graph is still at that generation.
+        max_entries: most results kept at once
+        ttl: seconds a result may be served for, None to keep it until evicted
+        max_bytes: budget for the estimated size of the kept results, None for no budget
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.clock = clock
+
+        self.entries = OrderedDict()  # key -> (generation, expires, size, value), least recent first
+        self.bytes = 0  # Estimated size of the kept results
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0  # Entries dropped to stay within max_entries or max_bytes
+        self.invalidations = 0  # Entries dropped because the graph changed or they expired
+
+    def __repr__(self):
+        """Return a string representation of this cache."""
+        return 'QueryCache({} entries, {} bytes, {})'.format(len(self.entries), self.bytes, self.stats())
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, generation):
+        """
+        Return (True, value) if a fresh result is cached for the key, or (False, None)
+        Runtime: O(1)
+        """
+        entry = self.entries.get(key)
+
+        if entry is not None:
+            entry_generation, expires, _, value = entry
+
+            if entry_generation == generation and (expires is None or self.clock() < expires):
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return True, value
+
+            # Never serve a result from an older graph or past its time to live
+            self._remove(key)
+            self.invalidations += 1
+
+        self.misses += 1
+        return False, None
+
+    def put(self, key, generation, value):
+        """
+        Cache the value computed for the key at the given graph generation,
+        evicting the least recently used results to stay within the limits
+        Runtime: O(1)* amortized over the evictions
+        """
+        if key in self.entries:
+            self._remove(key)
+
+        size = sys.getsizeof(key) + sys.getsizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return  # Too big to ever fit
+
+        expires = self.clock() + self.ttl if self.ttl is not None else None
+        self.entries[key] = (generation, expires, size, value)
+        self.bytes += size
+
+        while len(self.entries) > self.max_entries or (self.max_bytes is not None and self.bytes > self.max_bytes):
+            self._remove(next(iter(self.entries)))
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every cached result, keeping the statistics"""
+        self.entries.clear()
+        self.bytes = 0
+
+    def stats(self):
+        """Return a dictionary of the hit, miss, eviction and invalidation counts"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'entries': len(self.entries),
+            'bytes': self.bytes,
+        }
+
+    def _remove(self, key):
+        _, _, size, _ = self.entries.pop(key)
+        self.bytes -= size
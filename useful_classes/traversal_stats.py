@@ -0,0 +1,115 @@
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class TraversalStats(object):
+
+    def __init__(self, method):
+        """Initialize the counters of one traversal call of the named graph method"""
+        self.method = method
+        self.dequeued = 0  # Vertices taken off the queue, stack, heap or frontier and expanded
+        self.edges_scanned = 0  # Neighbors of the expanded vertices looked at
+        self.peak_frontier = 0  # Largest size of the queue, stack, heap or frontier
+        self.visited = 0  # Size of the visited map once the call is done
+        self.seconds = 0.0  # Wall time of the call
+        self.started = time.perf_counter()
+
+    def __repr__(self):
+        """Return a string representation of these statistics."""
+        return ('TraversalStats({}, dequeued={}, edges_scanned={}, peak_frontier={}, visited={}, '
+                'seconds={:.6f})'.format(self.method, self.dequeued, self.edges_scanned,
+                                         self.peak_frontier, self.visited, self.seconds))
+
+    def expand(self, neighbors, frontier_size):
+        """Count one expanded vertex with its neighbors while the frontier holds frontier_size items"""
+        self.dequeued += 1
+        self.edges_scanned += len(neighbors)
+        if frontier_size > self.peak_frontier:
+            self.peak_frontier = frontier_size
+
+    def as_dict(self):
+        """Return a dictionary of the statistics, ready for JSON"""
+        return {
+            'method': self.method,
+            'dequeued': self.dequeued,
+            'edges_scanned': self.edges_scanned,
+            'peak_frontier': self.peak_frontier,
+            'visited': self.visited,
+            'seconds': self.seconds,
+        }
+
+
+class TraversalRecorder(object):
+
+    def __init__(self, callback=None, keep=1000):
+        """
+        Initialize a recorder of the traversal calls of a graph.
+        The graph only counts while a recorder is attached, otherwise its loops skip the counting.
+        callback: function called with the TraversalStats of every finished call, None for none
+        keep: number of most recent calls kept in calls
+        """
+        self.callback = callback
+        self.calls = deque(maxlen=keep)  # TraversalStats of the most recent calls, oldest first
+        self.totals = {}  # method -> dictionary of the statistics summed over all of its calls
+
+    def __repr__(self):
+        """Return a string representation of this recorder."""
+        return 'TraversalRecorder({} calls)'.format(sum(total['calls'] for total in self.totals.values()))
+
+    def start(self, method):
+        """Return the statistics of a new call of the named method, its clock started"""
+        return TraversalStats(method)
+
+    def finish(self, stats, visited):
+        """
+        Stop the clock of the call, record it and pass it to the callback
+        visited: size of the visited map of the call
+        """
+        stats.seconds = time.perf_counter() - stats.started
+        stats.visited = visited
+        self.calls.append(stats)
+
+        total = self.totals.get(stats.method)
+        if total is None:
+            total = self.totals[stats.method] = {'calls': 0, 'dequeued': 0, 'edges_scanned': 0,
+                                                 'peak_frontier': 0, 'visited': 0, 'seconds': 0.0}
+
+        total['calls'] += 1
+        total['dequeued'] += stats.dequeued
+        total['edges_scanned'] += stats.edges_scanned
+        total['peak_frontier'] = max(total['peak_frontier'], stats.peak_frontier)  # Largest of any call
+        total['visited'] += stats.visited
+        total['seconds'] += stats.seconds
+
+        if self.callback is not None:
+            self.callback(stats)
+
+    def last(self):
+        """Return the statistics of the most recent call, or None if nothing was recorded"""
+        return self.calls[-1] if self.calls else None
+
+    def reset(self):
+        """Forget every recorded call"""
+        self.calls.clear()
+        self.totals = {}
+
+
+@contextmanager
+def instrument(graph, callback=None, keep=1000):
+    """
+    Record the traversals of the graph inside the with block, and give back
+    whatever recorder the graph had afterwards:
+
+        with instrument(graph) as recorder:
+            graph.find_path_bfs('A', 'B')
+        print(recorder.last())
+    """
+    previous = graph.traversal_stats
+    recorder = TraversalRecorder(callback, keep)
+    graph.traversal_stats = recorder
+
+    try:
+        yield recorder
+    finally:
+        graph.traversal_stats = previous
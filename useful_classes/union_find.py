@@ -0,0 +1,94 @@
+class UnionFind(object):
+    """
+    Disjoint sets of keys with union by rank and path compression,
+    so every operation runs in near constant amortized time.
+    """
+
+    def __init__(self, keys=()):
+        """Initialize a set of its own for every given key"""
+        self.parents = {}  # key -> parent key, roots are their own parent
+        self.ranks = {}  # root key -> upper bound of the height of its tree
+        self.sizes = {}  # root key -> number of keys in its set
+        self.num_components = 0
+
+        for key in keys:
+            self.add(key)
+
+    def __repr__(self):
+        """Return a string representation of this structure."""
+        return 'UnionFind({} keys, {} components)'.format(len(self.parents), self.num_components)
+
+    def __len__(self):
+        return len(self.parents)
+
+    def __contains__(self, key):
+        return key in self.parents
+
+    def add(self, key):
+        """
+        Add the key in a set of its own, return False if it is already there
+        Runtime: O(1)
+        """
+        if key in self.parents:
+            return False
+
+        self.parents[key] = key
+        self.ranks[key] = 0
+        self.sizes[key] = 1
+        self.num_components += 1
+        return True
+
+    def find(self, key):
+        """
+        Return the root key of the set the key is in, or raise KeyError if it was never added
+        Runtime: O(α(n)) amortized
+        """
+        parents = self.parents
+
+        root = key
+        while parents[root] != root:
+            root = parents[root]
+
+        # Point everything on the way straight at the root
+        while parents[key] != root:
+            parents[key], key = root, parents[key]
+
+        return root
+
+    def union(self, first, second):
+        """
+        Merge the sets of the two keys, return False if they were in the same set already
+        Runtime: O(α(n)) amortized
+        """
+        first_root, second_root = self.find(first), self.find(second)
+
+        if first_root == second_root:
+            return False
+
+        # Hang the shorter tree under the taller one
+        if self.ranks[first_root] < self.ranks[second_root]:
+            first_root, second_root = second_root, first_root
+
+        self.parents[second_root] = first_root
+        self.sizes[first_root] += self.sizes.pop(second_root)
+
+        if self.ranks[first_root] == self.ranks[second_root]:
+            self.ranks[first_root] += 1
+        del self.ranks[second_root]
+
+        self.num_components -= 1
+        return True
+
+    def connected(self, first, second):
+        """
+        Return True if the two keys are in the same set
+        Runtime: O(α(n)) amortized
+        """
+        return self.find(first) == self.find(second)
+
+    def component_sizes(self):
+        """
+        Return a dictionary of root key -> number of keys in its set
+        Runtime: O(c) where c is the number of sets
+        """
+        return dict(self.sizes)